@@ -0,0 +1,62 @@
+import { useEffect } from "react";
+import { getAccessToken } from "@/app/hooks/user.actions";
+
+// Subscribe to the server-sent change feed of a project and call `onChange`
+// whenever something in it changes (and once the stream is ready, so that
+// nothing between the last fetch and the subscription is missed).
+// EventSource cannot send the Authorization header, so the stream is read
+// with fetch instead. Reconnects after the delay the server asks for.
+export const useProjectEvents = (projectId: string | string[] | undefined, onChange: () => void) => {
+    useEffect(() => {
+        if (!projectId) return;
+        const baseURL = process.env.NEXT_PUBLIC_API_BASE_URL;
+        const controller = new AbortController();
+        let retry = 3000;
+        let timer: ReturnType<typeof setTimeout> | undefined;
+
+        const connect = async () => {
+            try {
+                const response = await fetch(`${baseURL}/projects/${projectId}/events/`, {
+                    headers: { Authorization: `Bearer ${getAccessToken()}` },
+                    signal: controller.signal,
+                });
+                // 401 (an expired token) is retried: the next SWR fetch refreshes it
+                if (!response.ok || !response.body) {
+                    if (response.status === 403 || response.status === 404) return;
+                    throw new Error(`Project events: ${response.status}`);
+                }
+                const reader = response.body.pipeThrough(new TextDecoderStream()).getReader();
+                let buffer = "";
+                while (true) {
+                    const { value, done } = await reader.read();
+                    if (done) break;
+                    buffer += value;
+                    let end;
+                    while ((end = buffer.indexOf("\n\n")) !== -1) {
+                        const frame = buffer.slice(0, end);
+                        buffer = buffer.slice(end + 2);
+                        for (const line of frame.split("\n")) {
+                            if (line.startsWith("retry: ")) retry = Number(line.slice(7)) || retry;
+                            if (line.startsWith("event: ")) {
+                                const event = line.slice(7);
+                                onChange();
+                                // The server closes the stream after these
+                                if (event === "revoked" || event === "project.deleted") return;
+                            }
+                        }
+                    }
+                }
+            } catch (error) {
+                if (controller.signal.aborted) return;
+                console.warn("Project events disconnected:", error);
+            }
+            if (!controller.signal.aborted) timer = setTimeout(connect, retry);
+        };
+
+        connect();
+        return () => {
+            controller.abort();
+            clearTimeout(timer);
+        };
+    }, [projectId, onChange]);
+};
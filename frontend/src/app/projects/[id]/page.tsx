@@ -4,6 +4,7 @@ import useSWR from "swr";
 import axiosService, { fetcher } from "@/app/fetcher";
 import { useRouter, useParams } from "next/navigation";
 import { useProjectActions } from "@/app/hooks/project.actions";
+import { useProjectEvents } from "@/app/hooks/project.events";
 import { useEffect, useState } from "react";
 import BackButton from "@/app/components/Button/BackButton";
 import Date from "@/app/components/Date";
@@ -14,10 +15,12 @@ export default function ProjectDetailsPage() {
   const router = useRouter();
   const { id } = useParams();
   const { deleteProject } = useProjectActions();
-  const { data: project, error, isLoading } = useSWR(
+  const { data: project, error, isLoading, mutate } = useSWR(
     `/projects/${id}/`,
     fetcher
   );
+  // Refetch (a cheap 304 when nothing changed) whenever the project changes
+  useProjectEvents(id, mutate);
   const [errorMessage, setErrorMessage] = useState<string | null>(null);
   const [activeTab, setActiveTab] = useState(0);
   const baseURL = process.env.NEXT_PUBLIC_API_BASE_URL;
@@ -9,7 +9,7 @@ import { PencilIcon } from "@heroicons/react/24/outline";
 
 export default function ProjectListPage() {
   const { data: projects, error } = useSWR(
-    "/projects/",
+    "/projects/?view=summary",
     fetcher
   );
   const router = useRouter();
@@ -68,7 +68,7 @@ export default function ProjectListPage() {
                   <td className="px-4 py-2 sticky left-0 bg-white text-light-text shadow-lg">
                     {project.name}
                   </td>
-                  <td className="px-4 py-2">{project.tasks.length}</td>
+                  <td className="px-4 py-2">{project.task_count}</td>
                   <td className="px-4 py-2">
                     <Date dateString={project.updated_at} />
                     <br />
@@ -0,0 +1,13 @@
+"""
+URL configuration for requests served by the ASGI application.
+
+The same routes as `task_management_system.urls`, with the async read
+views of `tasks.async_urls` matched first. Selected per request by
+`task_management_system.middleware.asgi_urlconf_middleware`.
+"""
+from django.urls import path, include
+from .urls import urlpatterns as sync_urlpatterns
+
+urlpatterns = [
+    path('api/v1/', include('tasks.async_urls')),
+] + sync_urlpatterns
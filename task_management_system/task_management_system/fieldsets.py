@@ -0,0 +1,100 @@
+"""
+Sparse fieldsets for the API serializers.
+
+`?fields=id,name,tasks.status` limits what is rendered, with dotted paths
+for the fields of nested objects. Relations named in a serializer's
+`Meta.expandable_fields` are then rendered as primary keys, unless expanded
+with `?expand=tags,tasks.assigned_to`. Without either parameter
+responses keep their full, nested shape.
+
+Fieldsets only shape responses to safe requests; the viewsets use the
+same Fieldset to trim their querysets to the requested columns and
+prefetches.
+"""
+from rest_framework import serializers
+from rest_framework.permissions import SAFE_METHODS
+
+
+def _parse(value):
+    tree = {}
+    for path in (value or '').split(','):
+        node = tree
+        for name in path.strip().split('.'):
+            if name:
+                node = node.setdefault(name, {})
+    return tree
+
+
+class Fieldset:
+    """
+    The fields and expansions requested for one level of a response.
+    `only` is None when all fields are wanted.
+    """
+    def __init__(self, only=None, expand=None):
+        self.only = only
+        self.expand = expand or {}
+
+    @classmethod
+    def from_request(cls, request):
+        """
+        The requested Fieldset, or None for a full response.
+        """
+        if request is None or request.method not in SAFE_METHODS:
+            return None
+        params = getattr(request, 'query_params', request.GET)
+        if 'fields' not in params and 'expand' not in params:
+            return None
+        return cls(_parse(params['fields']) if 'fields' in params else None, _parse(params.get('expand')))
+
+    def includes(self, name):
+        return self.only is None or name in self.only
+
+    def expands(self, name):
+        return name in self.expand
+
+    def nested(self, name):
+        only = self.only.get(name) if self.only is not None else None
+        return Fieldset(only or None, self.expand.get(name))
+
+    def columns(self, *names):
+        """
+        Those of `names` that are included, for `QuerySet.only()`.
+        """
+        return [name for name in names if self.includes(name)]
+
+
+class SparseFieldsMixin:
+    """
+    Serializer support for Fieldset. `Meta.expandable_fields` names the
+    nested relations that collapse to primary keys unless expanded.
+    """
+    def get_fieldset(self):
+        if hasattr(self, '_fieldset'):
+            return self._fieldset
+        parent = self.parent.parent if isinstance(self.parent, serializers.ListSerializer) else self.parent
+        if parent is not None:
+            # Nested serializers follow what their parent hands them
+            return None
+        return Fieldset.from_request(self.context.get('request'))
+
+    def get_fields(self):
+        fields = super().get_fields()
+        fieldset = self.get_fieldset()
+        if fieldset is None:
+            return fields
+
+        fields = {name: field for name, field in fields.items() if fieldset.includes(name)}
+        for name in getattr(self.Meta, 'expandable_fields', ()):
+            if name not in fields:
+                continue
+            field = fields[name]
+            many = isinstance(field, serializers.ListSerializer)
+            if fieldset.expands(name):
+                nested = field.child if many else field
+                if isinstance(nested, SparseFieldsMixin):
+                    nested._fieldset = fieldset.nested(name)
+            else:
+                fields[name] = serializers.PrimaryKeyRelatedField(
+                    source=field.source if field.source != name else None, many=many, read_only=True,
+                )
+        return fields
@@ -0,0 +1,134 @@
+"""
+Per-request query and latency metrics, collected by
+`middleware.instrumentation_middleware`.
+
+Every database connection gets `record_query` as an execute wrapper. It
+counts the statements of the request being measured, their total time and
+how often each one repeats (N+1 patterns show up as duplicates), and
+`timed()` adds sections such as rendering. The middleware reports the
+results as a `Server-Timing` header and a JSON log line, and sends
+`request_measured` for `query_budgets()` in tests.
+"""
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.dispatch import Signal, receiver
+
+# Sent with `request` and `metrics` once a response is ready
+request_measured = Signal()
+
+_metrics = ContextVar('request_metrics', default=None)
+
+
+class RequestMetrics:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.view = None
+        self.queries = 0
+        self.sql_time = 0.0
+        self.statements = Counter()
+        self.sections = defaultdict(float)
+
+    @property
+    def duplicates(self):
+        """
+        Statements run again with the same SQL, whatever their parameters.
+        """
+        return sum(count - 1 for count in self.statements.values() if count > 1)
+
+    def most_duplicated(self):
+        sql, count = self.statements.most_common(1)[0] if self.statements else (None, 0)
+        return (sql, count) if count > 1 else (None, 0)
+
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+
+def current_metrics():
+    return _metrics.get()
+
+
+@contextmanager
+def measure():
+    """
+    Collect the metrics of the code inside, in this context and in the
+    sync and async calls made from it.
+    """
+    metrics = RequestMetrics()
+    token = _metrics.set(metrics)
+    try:
+        yield metrics
+    finally:
+        _metrics.reset(token)
+
+
+@contextmanager
+def timed(section):
+    """
+    Add the time spent inside to `section` of the current metrics.
+    """
+    metrics = _metrics.get()
+    if metrics is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.sections[section] += time.perf_counter() - started
+
+
+def record_query(execute, sql, params, many, context):
+    metrics = _metrics.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.sql_time += time.perf_counter() - started
+        metrics.queries += 1
+        metrics.statements[sql] += 1
+
+
+def install(connection=None):
+    """
+    Add `record_query` to `connection`, or to the connections of the
+    current thread.
+    """
+    for wrapped in [connection] if connection is not None else connections.all():
+        if record_query not in wrapped.execute_wrappers:
+            wrapped.execute_wrappers.append(record_query)
+
+
+@receiver(connection_created)
+def install_on_new_connection(sender, connection, **kwargs):
+    # Connections are per thread (and per request under ASGI)
+    install(connection)
+
+
+@contextmanager
+def query_budgets(budgets):
+    """
+    For tests: fail when a request made inside runs more queries than the
+    budget of its view, e.g. `{'ProjectViewSet.list': 6}`.
+    """
+    over = []
+
+    def check(sender, request, metrics, **kwargs):
+        budget = budgets.get(metrics.view)
+        if budget is not None and metrics.queries > budget:
+            sql, count = metrics.most_duplicated()
+            repeated = f'; repeated {count} times: {sql}' if sql else ''
+            over.append(f'{metrics.view} ran {metrics.queries} queries, budget {budget}{repeated}')
+
+    request_measured.connect(check)
+    try:
+        yield
+    finally:
+        request_measured.disconnect(check)
+    if over:
+        raise AssertionError('Query budget exceeded:\n' + '\n'.join(over))
@@ -0,0 +1,184 @@
+import json
+import logging
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from django.middleware.gzip import GZipMiddleware
+from django.utils.decorators import sync_and_async_middleware
+from django.utils.text import compress_string
+from . import instrumentation
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+COMPRESSIBLE_TYPES = ('text/', 'application/json', 'application/javascript', 'application/xml')
+
+
+@sync_and_async_middleware
+def asgi_urlconf_middleware(get_response):
+    """
+    Resolve requests handled by the ASGI application (asgi.py) with
+    `ASGI_URLCONF`, so they reach the async views; WSGI requests keep
+    `ROOT_URLCONF`.
+    """
+    urlconf = getattr(settings, 'ASGI_URLCONF', None)
+    if not urlconf or not iscoroutinefunction(get_response):
+        # Served by WSGI, nothing to do
+        return get_response
+
+    async def middleware(request):
+        request.urlconf = urlconf
+        return await get_response(request)
+
+    return middleware
+
+
+def _view_name(request):
+    # `ProjectViewSet.list` for viewsets, the URL name otherwise
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return None
+    actions = getattr(match.func, 'actions', None) or {}
+    action = actions.get(request.method.lower())
+    if action:
+        return f'{match.func.cls.__name__}.{action}'
+    return match.view_name
+
+
+def report_metrics(request, response, metrics):
+    """
+    Add the `Server-Timing` header (when `SERVER_TIMING` is on), log the
+    metrics as one JSON line and send `request_measured`.
+    """
+    metrics.view = _view_name(request)
+    total = metrics.elapsed()
+    render = metrics.sections['render']
+    app = max(total - metrics.sql_time - render, 0)
+    duplicates = metrics.duplicates
+
+    if settings.SERVER_TIMING:
+        description = f'{metrics.queries} queries' + (f', {duplicates} duplicates' if duplicates else '')
+        response['Server-Timing'] = ', '.join([
+            f'db;dur={metrics.sql_time * 1000:.1f};desc="{description}"',
+            f'render;dur={render * 1000:.1f}',
+            # Time in the view, outside SQL: mostly serialization for reads
+            f'app;dur={app * 1000:.1f}',
+            f'total;dur={total * 1000:.1f}',
+        ])
+
+    record = {
+        'method': request.method,
+        'path': request.path,
+        'view': metrics.view,
+        'status': response.status_code,
+        'queries': metrics.queries,
+        'duplicates': duplicates,
+        'db_ms': round(metrics.sql_time * 1000, 2),
+        'render_ms': round(render * 1000, 2),
+        'app_ms': round(app * 1000, 2),
+        'total_ms': round(total * 1000, 2),
+    }
+    if duplicates:
+        record['most_duplicated'] = metrics.most_duplicated()[0][:200]
+    logger.info(json.dumps(record))
+    instrumentation.request_measured.send(sender=None, request=request, metrics=metrics)
+    return response
+
+
+@sync_and_async_middleware
+def instrumentation_middleware(get_response):
+    """
+    Measure each request with `instrumentation.measure()`, see
+    `report_metrics()`.
+    """
+    instrumentation.install()
+    if iscoroutinefunction(get_response):
+        async def middleware(request):
+            with instrumentation.measure() as metrics:
+                response = await get_response(request)
+            return report_metrics(request, response, metrics)
+    else:
+        def middleware(request):
+            # Connections opened before this module was loaded
+            instrumentation.install()
+            with instrumentation.measure() as metrics:
+                response = get_response(request)
+            return report_metrics(request, response, metrics)
+    return middleware
+
+
+def _accepted_encodings(header):
+    accepted = set()
+    for item in header.split(','):
+        coding, _, params = item.strip().partition(';')
+        quality = params.strip().removeprefix('q=')
+        try:
+            if float(quality or 1) > 0:
+                accepted.add(coding.strip().lower())
+        except ValueError:
+            pass
+    return accepted
+
+
+def compress_response(request, response):
+    """
+    Compress `response` with brotli (when installed) or gzip, if the client
+    accepts it and the body is at least `COMPRESSION_MIN_SIZE` bytes.
+    Streaming responses (exports, event streams) go out as they are
+    produced, uncompressed.
+
+    gzip is Django's, with the random filler GZipMiddleware adds against
+    BREACH. Brotli has no such padding, so responses under
+    `COMPRESSION_BROTLI_EXCLUDED_PATHS` (the auth endpoints, which return
+    tokens) are only ever gzipped.
+    """
+    if response.streaming or response.has_header('Content-Encoding'):
+        return response
+    content_type = response.get('Content-Type', '').split(';')[0].strip()
+    if not content_type.startswith(COMPRESSIBLE_TYPES):
+        return response
+    if len(response.content) < settings.COMPRESSION_MIN_SIZE:
+        return response
+
+    patch_vary_headers(response, ['Accept-Encoding'])
+    accepted = _accepted_encodings(request.headers.get('Accept-Encoding', ''))
+    if brotli is not None and 'br' in accepted and not _brotli_excluded(request):
+        encoding, content = 'br', brotli.compress(response.content, quality=settings.COMPRESSION_BROTLI_QUALITY)
+    elif 'gzip' in accepted:
+        encoding, content = 'gzip', compress_string(response.content,
+                                                    max_random_bytes=GZipMiddleware.max_random_bytes)
+    else:
+        return response
+    if len(content) >= len(response.content):
+        return response
+
+    response.content = content
+    response.headers['Content-Length'] = str(len(content))
+    response.headers['Content-Encoding'] = encoding
+    etag = response.get('ETag')
+    if etag and etag.startswith('"'):
+        # A strong ETag names the uncompressed bytes
+        response.headers['ETag'] = 'W/' + etag
+    return response
+
+
+def _brotli_excluded(request):
+    return request.path.startswith(tuple(settings.COMPRESSION_BROTLI_EXCLUDED_PATHS))
+
+
+@sync_and_async_middleware
+def compression_middleware(get_response):
+    """
+    Apply `compress_response()` to every response.
+    """
+    if iscoroutinefunction(get_response):
+        async def middleware(request):
+            return compress_response(request, await get_response(request))
+    else:
+        def middleware(request):
+            return compress_response(request, get_response(request))
+    return middleware
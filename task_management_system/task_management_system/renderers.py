@@ -0,0 +1,65 @@
+"""
+JSON renderer and parser backed by orjson when it is installed, with
+DRF's stdlib implementations as the fallback.
+
+The output is the same as JSONRenderer's with the default COMPACT_JSON
+and UNICODE_JSON settings: types orjson does not handle itself, and
+datetimes (which DRF truncates to milliseconds), go through DRF's
+JSONEncoder. Indented output, as requested by the browsable API or an
+`indent` media type parameter, stays with the stdlib.
+"""
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.settings import api_settings
+from rest_framework.utils.encoders import JSONEncoder
+from .instrumentation import timed
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+if orjson is not None:
+    _OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+    _default = JSONEncoder().default
+
+
+def dumps(data):
+    """
+    `data` as JSON bytes, in JSONRenderer's compact form.
+    """
+    if orjson is None:
+        return JSONRenderer().render(data)
+    try:
+        content = orjson.dumps(data, default=_default, option=_OPTIONS)
+    except orjson.JSONEncodeError:
+        # e.g. integers beyond 64 bits
+        return JSONRenderer().render(data)
+    # As JSONRenderer: keep the output a strict subset of JavaScript
+    return content.replace('\u2028'.encode(), b'\\u2028').replace('\u2029'.encode(), b'\\u2029')
+
+
+class FastJSONRenderer(JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        fast = orjson is not None and self.compact and not self.ensure_ascii
+        with timed('render'):
+            if not fast or self.get_indent(accepted_media_type, renderer_context or {}) is not None:
+                return super().render(data, accepted_media_type, renderer_context)
+            return dumps(data)
+
+
+class FastJSONParser(JSONParser):
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        encoding = (parser_context or {}).get('encoding', settings.DEFAULT_CHARSET)
+        if orjson is None or encoding.lower().replace('_', '-') != 'utf-8' or not api_settings.STRICT_JSON:
+            return super().parse(stream, media_type, parser_context)
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError('JSON parse error - %s' % str(exc))
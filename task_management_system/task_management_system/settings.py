@@ -11,6 +11,7 @@ https://docs.djangoproject.com/en/5.0/ref/settings/
 """
 
 import os
+import sys
 import environ
 from pathlib import Path
 from datetime import timedelta
@@ -55,6 +56,11 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'task_management_system.middleware.asgi_urlconf_middleware',
+    # Query counts and timings of each request (see task_management_system.instrumentation)
+    'task_management_system.middleware.instrumentation_middleware',
+    # Above the middleware that reads or changes response bodies
+    'task_management_system.middleware.compression_middleware',
     'django.middleware.security.SecurityMiddleware',
     'csp.middleware.CSPMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -90,6 +96,9 @@ CSP_CONNECT_SRC = (
 
 ROOT_URLCONF = 'task_management_system.urls'
 
+# Requests served through asgi.py also reach the async read views
+ASGI_URLCONF = 'task_management_system.asgi_urls'
+
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
@@ -120,6 +129,53 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.0/topics/cache/
+
+# Project membership (tasks.membership) and authenticated users
+# (users.authentication) are cached here and invalidated on writes, so every
+# process serving the API must share one cache: set CACHE_URL to a Redis or
+# Memcached URL (e.g. redis://localhost:6379/1) when running more than one
+# worker. The locmem default is private to each process and only safe for a
+# single one, such as development and tests.
+CACHES = {
+    'default': env.cache('CACHE_URL', default='locmemcache://'),
+}
+
+# Seconds a user's project membership stays cached (see tasks.membership)
+PROJECT_MEMBERSHIP_CACHE_TIMEOUT = 300
+
+# Seconds a serialized project stays cached (see tasks.project_cache)
+PROJECT_PAYLOAD_CACHE_TIMEOUT = 300
+
+# Seconds an authenticated user stays cached (see users.authentication)
+AUTH_USER_CACHE_TIMEOUT = 60
+
+# Seconds of changes every /sync/ response repeats, for writes that
+# committed after a later read (see tasks.sync)
+SYNC_CURSOR_OVERLAP = 5
+
+# Days deletions are kept for /sync/; older cursors get a full resync
+SYNC_TOMBSTONE_RETENTION_DAYS = 30
+
+# Responses smaller than this many bytes are sent uncompressed, and the
+# brotli quality used for the others (see task_management_system.middleware);
+# brotli is used when the package is installed and the client accepts it,
+# gzip otherwise
+COMPRESSION_MIN_SIZE = 1024
+COMPRESSION_BROTLI_QUALITY = 5
+# Responses that can carry secrets (tokens) are only gzipped, which is
+# padded against BREACH
+COMPRESSION_BROTLI_EXCLUDED_PATHS = ['/api/v1/auth/']
+
+# Send the per-request query count and timings as a Server-Timing header.
+# Off unless DEBUG: any client can read it, so production must opt in
+SERVER_TIMING = env.bool('SERVER_TIMING', default=DEBUG)
+
+# `manage.py test`, where the per-request metrics lines are only noise
+TESTING = sys.argv[1:2] == ['test']
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
 
@@ -204,6 +260,12 @@ LOGGING = {
             'level': 'DEBUG',
             'propagate': False,
         },
+        # One JSON line of metrics per request
+        'task_management_system': {
+            'handlers': ['file', 'console'],
+            'level': 'WARNING' if TESTING else 'INFO',
+            'propagate': False,
+        },
     },
 }
 
@@ -211,12 +273,25 @@ LOGGING = {
 AUTH_USER_MODEL = 'users.CustomUser'
 
 REST_FRAMEWORK = {
+    # orjson when installed, DRF's stdlib JSON otherwise
+    'DEFAULT_RENDERER_CLASSES': [
+        'task_management_system.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'task_management_system.renderers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'users.authentication.CachedJWTAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
+    'DEFAULT_PAGINATION_CLASS': 'tasks.pagination.KeysetPagination',
+    # Leave unset to paginate only when clients send `cursor` or `page_size`
+    'PAGE_SIZE': env.int('API_PAGE_SIZE', default=None),
     'DEFAULT_THROTTLE_CLASSES': [
         'rest_framework.throttling.AnonRateThrottle',
         'rest_framework.throttling.UserRateThrottle',
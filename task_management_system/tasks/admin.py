@@ -1,8 +1,9 @@
 from django.contrib import admin
-from .models import Project, Task, Comment, Tag
+from .models import Project, Task, Comment, Tag, Tombstone
 
 
 admin.site.register(Project)
 admin.site.register(Task)
 admin.site.register(Comment)
 admin.site.register(Tag)
+admin.site.register(Tombstone)
@@ -0,0 +1,14 @@
+from django.urls import path
+from . import async_views
+
+# Async GET handlers for the hottest routes of tasks.urls; every other
+# method and route is served by the DRF viewsets as before
+urlpatterns = [
+    path('projects/', async_views.project_list),
+    path('projects/<int:pk>/', async_views.project_detail),
+    path('projects/<int:project_pk>/tasks/', async_views.task_list),
+    path('projects/<int:project_pk>/tasks/<int:task_pk>/comments/', async_views.comment_list),
+    path('projects/<int:project_id>/check_permission/', async_views.check_permission),
+    # ASGI only, there is no sync counterpart
+    path('projects/<int:pk>/events/', async_views.project_events),
+]
@@ -0,0 +1,309 @@
+"""
+Async-native read paths for the ASGI deployment.
+
+DRF views are synchronous, so under an ASGI server each of them runs in the
+sync-to-async thread pool. The views below answer the hot GET endpoints on
+the event loop instead, with the async ORM, async cache and async JWT
+authentication, and render exactly what the DRF viewsets render. Any other
+method, and GETs asking for the browsable API or a sparse fieldset, are
+handed to the regular viewset. They are routed for ASGI requests only, see
+task_management_system.asgi_urls.
+
+`project_events` is ASGI-only altogether: a server-sent events stream of
+the changes to one project, which would hold a WSGI worker per client.
+"""
+import asyncio
+import contextlib
+import json
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse, StreamingHttpResponse
+from django.utils.cache import patch_vary_headers
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework import status
+from rest_framework.exceptions import APIException, MethodNotAllowed, NotAuthenticated, NotFound, Throttled
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+from task_management_system.renderers import dumps
+from users.authentication import CachedJWTAuthentication
+from . import project_cache
+from .events import get_event_backend, project_channel
+from .membership import aget_membership
+from .mixins import (
+    is_not_modified,
+    listing_etag,
+    next_due_aggregate,
+    patch_conditional_headers,
+    validator_aggregates,
+    validators_from,
+)
+from .models import Project, Task, Comment
+from .row_serializers import CommentRowSerializer, RowSerializer, TaskRowSerializer
+from .serializers import ProjectSerializer, ProjectSummarySerializer
+from .views import (
+    CommentViewSet,
+    ProjectViewSet,
+    TaskViewSet,
+    cacheable_permission_response,
+    check_permission as sync_check_permission,
+    permission_answer,
+)
+
+LIST_ROUTES = {'get': 'list', 'post': 'create'}
+DETAIL_ROUTES = {'get': 'retrieve', 'put': 'update', 'patch': 'partial_update', 'delete': 'destroy'}
+
+
+def json_response(data=None, status=status.HTTP_200_OK, headers=None):
+    response = HttpResponse(
+        b'' if data is None else dumps(data),
+        status=status,
+        content_type='application/json',
+        headers=headers,
+    )
+    patch_vary_headers(response, ['Accept'])
+    return response
+
+
+def async_read_view(viewset, fallback):
+    """
+    Turn `read(request, view)` into an async view for GET requests; other
+    requests go to the sync `fallback` view. `view` is an instance of
+    `viewset` set up for the request, for its filter backends, paginator
+    and throttles; only its synchronous, query-free parts may be used.
+    """
+    def decorator(read):
+        # CSRF is not enforced on DRF views either: clients authenticate
+        # with bearer tokens, not cookies
+        @csrf_exempt
+        async def view(request, *args, **kwargs):
+            if request.method != 'GET' or not _wants_json(request) or _is_sparse(request):
+                return await sync_to_async(fallback)(request, *args, **kwargs)
+            try:
+                view = await _initial(request, viewset, kwargs)
+                return await read(request, view, **kwargs)
+            except APIException as exc:
+                return _exception_response(exc)
+        return view
+    return decorator
+
+
+async def _initial(request, viewset, kwargs):
+    authenticator = CachedJWTAuthentication()
+    result = await authenticator.aauthenticate(request)
+    if result is None:
+        raise NotAuthenticated()
+    request.user, request.auth = result
+
+    drf_request = Request(request, authenticators=[])
+    drf_request.user, drf_request.auth = result
+    view = viewset()
+    view.request, view.args, view.kwargs = drf_request, (), kwargs
+    view.action, view.format_kwarg = 'list', None
+
+    # Throttles keep their state in the cache and have no async API, so
+    # they run in the thread pool rather than block the event loop
+    for throttle in view.get_throttles():
+        if not await sync_to_async(throttle.allow_request)(drf_request, view):
+            raise Throttled(throttle.wait())
+    return view
+
+
+def _wants_json(request):
+    # The browsable API stays with DRF
+    fmt = request.GET.get(api_settings.URL_FORMAT_OVERRIDE)
+    return fmt in (None, 'json') and 'text/html' not in request.headers.get('Accept', '')
+
+
+def _is_sparse(request):
+    # Sparse fieldsets trim the querysets of the DRF viewsets
+    return 'fields' in request.GET or 'expand' in request.GET
+
+
+def _exception_response(exc):
+    # As rest_framework.views.exception_handler
+    headers = {}
+    if isinstance(exc, NotAuthenticated):
+        headers['WWW-Authenticate'] = CachedJWTAuthentication().authenticate_header(None)
+    if getattr(exc, 'wait', None):
+        headers['Retry-After'] = str(int(exc.wait))
+    data = exc.detail if isinstance(exc.detail, (list, dict)) else {'detail': exc.detail}
+    return json_response(data, status=exc.status_code, headers=headers)
+
+
+def _not_modified(etag, last_modified=None):
+    response = json_response(status=status.HTTP_304_NOT_MODIFIED)
+    patch_conditional_headers(response, etag, last_modified)
+    return response
+
+
+async def _validators(queryset, parent_project_id=None, **extra):
+    queryset = queryset.order_by().prefetch_related(None)
+    return validators_from(await queryset.aaggregate(**validator_aggregates(parent_project_id), **extra))
+
+
+async def _render_list(request, view, queryset, serializer_class, etag, last_modified=None, load=None, save=None):
+    page = await view.paginator.apaginate_queryset(queryset, view.request, view=view)
+    rows = page if page is not None else [row async for row in queryset]
+    if load is not None:
+        await load(rows)
+    if issubclass(serializer_class, RowSerializer):
+        data = await serializer_class(rows).adata()
+    else:
+        data = serializer_class(rows, many=True, context={'request': request, 'view': view}).data
+    if save is not None:
+        await save(rows)
+    if page is not None:
+        data = view.paginator.get_paginated_response(data).data
+    response = json_response(data)
+    patch_conditional_headers(response, etag, last_modified)
+    return response
+
+
+@async_read_view(ProjectViewSet, ProjectViewSet.as_view(LIST_ROUTES))
+async def project_list(request, view):
+    membership = await aget_membership(request.user, request)
+    queryset = Project.objects.filter(pk__in=membership.visible)
+    summary = request.GET.get('view') == 'summary'
+    extra = {'next_due_date': next_due_aggregate(queryset.values('pk'))} if summary else {}
+    last_modified, count, *extra = await _validators(queryset, **extra)
+    etag = listing_etag(request, 'json', last_modified, count, *extra)
+    if is_not_modified(request, etag):
+        return _not_modified(etag)
+
+    if summary:
+        return await _render_list(request, view, queryset.with_summary(), ProjectSummarySerializer, etag)
+    return await _render_list(request, view, queryset.select_related('owner'), ProjectSerializer, etag,
+                              load=project_cache.aload_payloads, save=project_cache.asave_payloads)
+
+
+@async_read_view(ProjectViewSet, ProjectViewSet.as_view(DETAIL_ROUTES))
+async def project_detail(request, view, pk):
+    membership = await aget_membership(request.user, request)
+    queryset = Project.objects.filter(pk__in=membership.visible, pk=pk)
+    last_modified, count = await _validators(queryset)
+    if not count:
+        raise NotFound('No Project matches the given query.')
+    etag = listing_etag(request, 'json', last_modified, count)
+    if is_not_modified(request, etag, last_modified):
+        return _not_modified(etag, last_modified)
+
+    project = await queryset.select_related('owner').afirst()
+    if project is None:
+        raise NotFound('No Project matches the given query.')
+    await project_cache.aload_payloads([project])
+    response = json_response(ProjectSerializer(project, context={'request': request, 'view': view}).data)
+    await project_cache.asave_payloads([project])
+    patch_conditional_headers(response, etag, last_modified)
+    return response
+
+
+@async_read_view(TaskViewSet, TaskViewSet.as_view(LIST_ROUTES))
+async def task_list(request, view, project_pk):
+    membership = await aget_membership(request.user, request)
+    queryset = Task.objects.filter(project_id__in=membership.visible, project_id=project_pk)
+    queryset = view.filter_queryset(queryset)
+    last_modified, count = await _validators(queryset, parent_project_id=project_pk)
+    etag = listing_etag(request, 'json', last_modified, count)
+    if is_not_modified(request, etag, last_modified):
+        return _not_modified(etag, last_modified)
+    return await _render_list(request, view, TaskRowSerializer.values(queryset), TaskRowSerializer, etag,
+                              last_modified)
+
+
+@async_read_view(CommentViewSet, CommentViewSet.as_view(LIST_ROUTES))
+async def comment_list(request, view, project_pk, task_pk):
+    membership = await aget_membership(request.user, request)
+    queryset = Comment.objects.filter(task__project_id__in=membership.visible, task_id=task_pk)
+    queryset = view.filter_queryset(queryset)
+    last_modified, count = await _validators(queryset, parent_project_id=project_pk)
+    etag = listing_etag(request, 'json', last_modified, count)
+    if is_not_modified(request, etag, last_modified):
+        return _not_modified(etag, last_modified)
+    return await _render_list(request, view, CommentRowSerializer.values(queryset), CommentRowSerializer, etag,
+                              last_modified)
+
+
+class _PermissionCheckView:
+    # The settings-driven throttles of the @api_view `check_permission`
+    def get_throttles(self):
+        return [throttle() for throttle in api_settings.DEFAULT_THROTTLE_CLASSES]
+
+
+@async_read_view(_PermissionCheckView, sync_check_permission)
+async def check_permission(request, view, project_id):
+    owner_id = await Project.objects.filter(id=project_id).values_list('owner_id', flat=True).afirst()
+    data, status_code = permission_answer(request.user, owner_id)
+    return cacheable_permission_response(
+        request, data, status_code, request.user.pk, project_id, status_code,
+        response_class=json_response,
+    )
+
+
+# Seconds between keep-alive comments, so that proxies do not drop idle streams
+EVENTS_KEEPALIVE = 15
+# Milliseconds clients wait before reconnecting
+EVENTS_RETRY = 3000
+
+
+@csrf_exempt
+async def project_events(request, pk):
+    """
+    `text/event-stream` of the changes to project `pk` (see tasks.events),
+    open to its owner and members. The stream ends when the user loses
+    access to the project or it is deleted.
+    """
+    try:
+        if request.method != 'GET':
+            raise MethodNotAllowed(request.method)
+        await _initial(request, ProjectViewSet, {'pk': pk})
+        membership = await aget_membership(request.user, request)
+        if pk not in membership.visible:
+            raise NotFound('No Project matches the given query.')
+    except APIException as exc:
+        return _exception_response(exc)
+
+    response = StreamingHttpResponse(_event_stream(request.user, pk), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    # Stop nginx from buffering the stream
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+async def _event_stream(user, project_id):
+    events = get_event_backend().subscribe(project_channel(project_id))
+    next_event = None
+    try:
+        # Wait for the subscription before `ready`: clients refetch on
+        # `ready`, so every change after that refetch must be streamed
+        await anext(events)
+        yield f'retry: {EVENTS_RETRY}\n\n'
+        yield _frame(0, {'type': 'ready', 'project': project_id})
+
+        sequence = 0
+        next_event = asyncio.ensure_future(anext(events))
+        while True:
+            done, _ = await asyncio.wait({next_event}, timeout=EVENTS_KEEPALIVE)
+            if not done:
+                yield ': keep-alive\n\n'
+                continue
+            event = next_event.result()
+            next_event = asyncio.ensure_future(anext(events))
+            sequence += 1
+            yield _frame(sequence, event)
+
+            if event['type'] == 'project.deleted':
+                return
+            if event['type'] in ('project.members', 'project.updated'):
+                membership = await aget_membership(user)
+                if project_id not in membership.visible:
+                    yield _frame(sequence, {'type': 'revoked', 'project': project_id})
+                    return
+    finally:
+        if next_event is not None:
+            next_event.cancel()
+            with contextlib.suppress(asyncio.CancelledError, StopAsyncIteration):
+                await next_event
+        await events.aclose()
+
+
+def _frame(sequence, event):
+    return f'id: {sequence}\nevent: {event["type"]}\ndata: {json.dumps(event, separators=(",", ":"))}\n\n'
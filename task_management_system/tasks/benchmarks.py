@@ -0,0 +1,200 @@
+"""
+In-process benchmarks of the API, see `manage.py bench_api`.
+
+Each case is one viewset action requested with the test client as one
+user, against whatever the database holds (e.g. a `manage.py seed_bench`
+dataset). A first pass records latency and queries per request (from
+task_management_system.instrumentation), a second one, under tracemalloc,
+the peak memory allocated per request. Results are plain dicts, stored as
+JSON by the command and compared between commits with `compare()`.
+"""
+import logging
+import statistics
+import time
+import tracemalloc
+from collections import Counter
+from django.core.cache import cache
+from django.db.models import Count
+from django.test.utils import override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework.throttling import UserRateThrottle
+from rest_framework_simplejwt.tokens import RefreshToken
+from task_management_system.instrumentation import request_measured
+from users.models import CustomUser
+from .models import Project, ProjectMember, Task, Comment, Tag
+
+
+def choose_subject(max_tasks=5000):
+    """
+    The user who sees the most tasks, at most `max_tasks`, since the
+    project endpoints render every visible task; and their largest project.
+    """
+    sizes = dict(Task.objects.order_by().values_list('project_id').annotate(Count('pk')))
+    visible = {}
+    for project_id, owner_id in Project.objects.values_list('pk', 'owner_id'):
+        visible.setdefault(owner_id, []).append(project_id)
+    for project_id, user_id in ProjectMember.objects.values_list('project_id', 'customuser_id'):
+        visible.setdefault(user_id, []).append(project_id)
+
+    totals = {user_id: sum(sizes.get(pk, 0) for pk in project_ids) for user_id, project_ids in visible.items()}
+    candidates = [user_id for user_id, total in totals.items() if total <= max_tasks]
+    if not candidates:
+        return None, None
+    user_id = max(candidates, key=lambda pk: (totals[pk], -pk))
+    project_id = max(visible[user_id], key=lambda pk: (sizes.get(pk, 0), -pk))
+    return CustomUser.objects.get(pk=user_id), Project.objects.get(pk=project_id)
+
+
+def build_cases(project):
+    """
+    `(name, url)` pairs, one per viewset action and variant.
+    """
+    task = Task.objects.filter(project=project).annotate(comment_count=Count('comments')).order_by(
+        '-comment_count', 'pk').first()
+    word = Task.objects.filter(project=project).values_list('name', flat=True).first()
+    project_kwargs = {'pk': project.pk}
+    tasks_url = reverse('project-tasks-list', kwargs={'project_pk': project.pk})
+    cases = [
+        ('ProjectViewSet.list', reverse('project-list')),
+        ('ProjectViewSet.list?view=summary', reverse('project-list') + '?view=summary'),
+        ('ProjectViewSet.retrieve', reverse('project-detail', kwargs=project_kwargs)),
+        ('ProjectViewSet.stats', reverse('project-stats', kwargs=project_kwargs)),
+        ('TaskViewSet.list', tasks_url),
+        ('TaskViewSet.list?page_size=50', tasks_url + '?page_size=50'),
+        ('TaskViewSet.list?status=todo', tasks_url + '?status=todo'),
+        ('TaskViewSet.list?fields=id,name,status', tasks_url + '?fields=id,name,status'),
+        ('AllTagsViewSet.list', reverse('all-tags-list')),
+        ('check_permission', reverse('check-permission', kwargs={'project_id': project.pk})),
+        ('sync', reverse('sync')),
+    ]
+    if word:
+        cases.append(('TaskViewSet.list?search=', tasks_url + '?search=' + word.split()[0]))
+    if task is not None:
+        task_kwargs = {'project_pk': project.pk, 'task_pk': task.pk}
+        cases += [
+            ('TaskViewSet.retrieve', reverse('project-tasks-detail', kwargs={'project_pk': project.pk, 'pk': task.pk})),
+            ('CommentViewSet.list', reverse('task-comments-list', kwargs=task_kwargs)),
+            ('TagViewSet.list', reverse('task-tags-list', kwargs=task_kwargs)),
+        ]
+    return cases
+
+
+def _percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+class Benchmark:
+    """
+    Request each case `warmup` times unmeasured, `requests` times for
+    latency and queries and `memory_requests` times under tracemalloc.
+    With `cold`, the cache is cleared before every request.
+    """
+    def __init__(self, user, requests=50, memory_requests=5, warmup=3, cold=False):
+        self.user = user
+        self.requests = requests
+        self.memory_requests = memory_requests
+        self.warmup = warmup
+        self.cold = cold
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(user).access_token}')
+        self._throttle_key = UserRateThrottle.cache_format % {'scope': 'user', 'ident': user.pk}
+
+    def run(self, cases, progress=None):
+        results = {}
+        # Not one log line per request
+        request_log = logging.getLogger('task_management_system.middleware')
+        level = request_log.level
+        request_log.setLevel(logging.WARNING)
+        try:
+            with override_settings(ALLOWED_HOSTS=['testserver']):
+                for name, url in cases:
+                    results[name] = self.measure(url)
+                    if progress:
+                        progress(name, results[name])
+        finally:
+            request_log.setLevel(level)
+        return results
+
+    def _get(self, url):
+        if self.cold:
+            cache.clear()
+        else:
+            # Benchmarks would use up the daily request rate
+            cache.delete(self._throttle_key)
+        response = self.client.get(url)
+        if response.status_code != 200:
+            raise RuntimeError(f'GET {url} answered {response.status_code}')
+        return response
+
+    def measure(self, url):
+        for _ in range(self.warmup):
+            self._get(url)
+
+        queries, latencies = [], []
+
+        def collect(sender, metrics, **kwargs):
+            queries.append(metrics.queries)
+        request_measured.connect(collect)
+        try:
+            for _ in range(self.requests):
+                started = time.perf_counter()
+                response = self._get(url)
+                latencies.append(time.perf_counter() - started)
+        finally:
+            request_measured.disconnect(collect)
+
+        peaks = []
+        tracemalloc.start()
+        try:
+            for _ in range(self.memory_requests):
+                tracemalloc.reset_peak()
+                baseline = tracemalloc.get_traced_memory()[0]
+                self._get(url)
+                peaks.append(tracemalloc.get_traced_memory()[1] - baseline)
+        finally:
+            tracemalloc.stop()
+
+        return {
+            'url': url,
+            'requests': len(latencies),
+            'p50_ms': round(_percentile(latencies, 0.5) * 1000, 3),
+            'p95_ms': round(_percentile(latencies, 0.95) * 1000, 3),
+            'mean_ms': round(statistics.fmean(latencies) * 1000, 3),
+            'queries': Counter(queries).most_common(1)[0][0] if queries else None,
+            'peak_kb': round(statistics.median(peaks) / 1024, 1) if peaks else None,
+            'bytes': len(response.content),
+        }
+
+
+def dataset_counts():
+    return {
+        'users': CustomUser.objects.count(),
+        'projects': Project.objects.count(),
+        'tasks': Task.objects.count(),
+        'comments': Comment.objects.count(),
+        'tags': Tag.objects.count(),
+    }
+
+
+def compare(results, baseline, threshold=0.1):
+    """
+    Rows of `(case, metric, baseline value, value, change, regressed)` for
+    the cases in both, and whether any of them regressed: p95 latency or
+    peak memory up by more than `threshold`, or more queries.
+    """
+    rows, regressed = [], False
+    for name, current in results.items():
+        before = baseline.get(name)
+        if before is None:
+            continue
+        for metric in ('p50_ms', 'p95_ms', 'queries', 'peak_kb', 'bytes'):
+            old, new = before.get(metric), current.get(metric)
+            if old is None or new is None:
+                continue
+            change = (new - old) / old if old else 0.0
+            worse = (new > old) if metric == 'queries' else (metric in ('p95_ms', 'peak_kb') and change > threshold)
+            regressed = regressed or worse
+            rows.append((name, metric, old, new, change, worse))
+    return rows, regressed
@@ -0,0 +1,141 @@
+import asyncio
+import json
+import threading
+from collections import defaultdict
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import transaction
+from django.utils.module_loading import import_string
+from rest_framework.utils.encoders import JSONEncoder
+
+
+def project_channel(project_id):
+    return f'tasks:project:{project_id}'
+
+
+class BaseEventBackend:
+    """
+    Publish/subscribe transport for change events (see tasks.signals),
+    consumed by the server-sent events stream in tasks.async_views.
+    Events are JSON-serializable dicts with at least a `type`.
+    """
+    def publish(self, channel, event):
+        raise NotImplementedError
+
+    async def subscribe(self, channel):
+        """
+        Async iterator over the events published to `channel` from now on.
+        It first yields None, once the subscription is in place.
+        """
+        raise NotImplementedError
+        yield  # pragma: no cover
+
+
+class LocalEventBackend(BaseEventBackend):
+    """
+    In-process fan-out to one bounded queue per subscriber. Events only
+    reach subscribers of the same process, so this is the stand-in for a
+    single ASGI worker, development and tests.
+    """
+    max_queued = 100
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = defaultdict(set)
+
+    def publish(self, channel, event):
+        with self._lock:
+            subscribers = list(self._subscribers.get(channel, ()))
+        # Signals fire on whatever thread saved the row; queues belong to
+        # the event loop of their subscriber
+        for loop, queue in subscribers:
+            loop.call_soon_threadsafe(self._offer, queue, event)
+
+    async def subscribe(self, channel):
+        subscriber = (asyncio.get_running_loop(), asyncio.Queue(self.max_queued))
+        with self._lock:
+            self._subscribers[channel].add(subscriber)
+        try:
+            yield None
+            while True:
+                yield await subscriber[1].get()
+        finally:
+            with self._lock:
+                self._subscribers[channel].discard(subscriber)
+                if not self._subscribers[channel]:
+                    del self._subscribers[channel]
+
+    def _offer(self, queue, event):
+        if queue.full():
+            # A slow client lost events: replace the backlog with a request
+            # to refetch everything
+            while not queue.empty():
+                queue.get_nowait()
+            event = {'type': 'resync'}
+        queue.put_nowait(event)
+
+
+class RedisEventBackend(BaseEventBackend):
+    """
+    Redis pub/sub, so every ASGI worker sees the events of all processes.
+    Needs the `redis` package and `TASKS_EVENTS_REDIS_URL`.
+    """
+    def __init__(self):
+        try:
+            import redis
+            import redis.asyncio
+        except ImportError:
+            raise ImproperlyConfigured('RedisEventBackend requires the "redis" package.')
+        url = getattr(settings, 'TASKS_EVENTS_REDIS_URL', None)
+        if not url:
+            raise ImproperlyConfigured('RedisEventBackend requires TASKS_EVENTS_REDIS_URL.')
+        self._client = redis.Redis.from_url(url)
+        self._async_client = redis.asyncio.Redis.from_url(url)
+
+    def publish(self, channel, event):
+        self._client.publish(channel, json.dumps(event, cls=JSONEncoder))
+
+    async def subscribe(self, channel):
+        pubsub = self._async_client.pubsub()
+        await pubsub.subscribe(channel)
+        try:
+            yield None
+            async for message in pubsub.listen():
+                if message['type'] == 'message':
+                    yield json.loads(message['data'])
+        finally:
+            await pubsub.unsubscribe(channel)
+            await pubsub.reset()
+
+
+_backend = None
+
+
+def get_event_backend():
+    """
+    The configured `TASKS_EVENT_BACKEND`, by default the in-process one.
+    """
+    global _backend
+    if _backend is None:
+        path = getattr(settings, 'TASKS_EVENT_BACKEND', 'tasks.events.LocalEventBackend')
+        _backend = import_string(path)()
+    return _backend
+
+
+def publish_project_event(project_ids, event):
+    """
+    Publish `event` to the given projects once the current transaction
+    commits, so subscribers never see changes that are rolled back.
+    """
+    project_ids = {pk for pk in project_ids if pk is not None}
+    if not project_ids:
+        return
+    # Serialize now: the instances may change before the commit
+    event = json.loads(json.dumps(event, cls=JSONEncoder))
+
+    def publish():
+        backend = get_event_backend()
+        for project_id in project_ids:
+            backend.publish(project_channel(project_id), event)
+
+    transaction.on_commit(publish)
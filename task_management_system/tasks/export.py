@@ -0,0 +1,132 @@
+"""
+Streaming export of a project with its tasks and comments, as NDJSON (one
+JSON object per line, tagged with its `type`) or CSV (one row per object,
+with the columns of all types).
+
+Rows are read with `QuerySet.iterator()`, which runs the prefetches one
+chunk at a time, and written out a chunk at a time, so memory use does not
+grow with the project and the first bytes go out after the first chunk.
+Shared by `ProjectViewSet.export` and `manage.py export_project`.
+"""
+import csv
+import io
+import json
+from asgiref.sync import sync_to_async
+from django.db.models import Prefetch
+from rest_framework.utils.encoders import JSONEncoder
+from users.models import CustomUser
+from .models import Task, Comment, Tag
+
+EXPORT_FORMATS = ('ndjson', 'csv')
+CONTENT_TYPES = {'ndjson': 'application/x-ndjson', 'csv': 'text/csv'}
+CSV_COLUMNS = [
+    'type', 'id', 'project', 'task', 'name', 'description', 'status', 'due_date',
+    'tags', 'assigned_to', 'owner', 'author', 'content', 'created_at', 'updated_at',
+]
+DEFAULT_CHUNK_SIZE = 2000
+
+_encoder = JSONEncoder()
+
+
+def export_records(project, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    The project, then its tasks, then their comments, as plain dicts.
+    Users are named by email, their unique login; usernames can repeat.
+    """
+    yield {
+        'type': 'project',
+        'id': project.pk,
+        'name': project.name,
+        'description': project.description,
+        'owner': project.owner.email,
+        'created_at': project.created_at,
+        'updated_at': project.updated_at,
+    }
+
+    tasks = Task.objects.filter(project=project).order_by('pk').prefetch_related(
+        Prefetch('tags', queryset=Tag.objects.only('id', 'name')),
+        Prefetch('assigned_to', queryset=CustomUser.objects.only('id', 'email')),
+    )
+    for task in tasks.iterator(chunk_size=chunk_size):
+        yield {
+            'type': 'task',
+            'id': task.pk,
+            'project': task.project_id,
+            'name': task.name,
+            'description': task.description,
+            'status': task.status,
+            'due_date': task.due_date,
+            'tags': [tag.name for tag in task.tags.all()],
+            'assigned_to': [user.email for user in task.assigned_to.all()],
+            'created_at': task.created_at,
+            'updated_at': task.updated_at,
+        }
+
+    comments = Comment.objects.filter(task__project=project).select_related('author').only(
+        'task_id', 'content', 'created_at', 'updated_at', 'author__email',
+    ).order_by('task_id', 'created_at', 'pk')
+    for comment in comments.iterator(chunk_size=chunk_size):
+        yield {
+            'type': 'comment',
+            'id': comment.pk,
+            'task': comment.task_id,
+            'author': comment.author.email,
+            'content': comment.content,
+            'created_at': comment.created_at,
+            'updated_at': comment.updated_at,
+        }
+
+
+def export_project(project, format='ndjson', chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Text chunks of the export of `project` in `format`, one per
+    `chunk_size` records.
+    """
+    if format not in EXPORT_FORMATS:
+        raise ValueError(f'Unknown export format: {format}')
+    write = _csv_writer() if format == 'csv' else _ndjson_line
+    lines = []
+    for record in export_records(project, chunk_size):
+        lines.append(write(record))
+        if len(lines) >= chunk_size:
+            yield ''.join(lines)
+            lines = []
+    if lines:
+        yield ''.join(lines)
+
+
+async def aiter_chunks(chunks):
+    """
+    Serve `export_project()` chunks to an ASGI response one at a time.
+    Django would consume a synchronous iterator whole before sending it.
+    """
+    done = object()
+    while (chunk := await sync_to_async(next)(chunks, done)) is not done:
+        yield chunk
+
+
+def _ndjson_line(record):
+    return json.dumps(record, cls=JSONEncoder, ensure_ascii=False) + '\n'
+
+
+def _csv_writer():
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=CSV_COLUMNS)
+    writer.writeheader()
+    header = [buffer.getvalue()]
+
+    def write(record):
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerow({key: _csv_value(value) for key, value in record.items()})
+        return header.pop() + buffer.getvalue() if header else buffer.getvalue()
+    return write
+
+
+def _csv_value(value):
+    if isinstance(value, list):
+        return ';'.join(value)
+    if hasattr(value, 'isoformat'):
+        # The same text as in the JSON formats
+        return _encoder.default(value)
+    return value
@@ -0,0 +1,118 @@
+from datetime import datetime, time
+from django.db.models import Exists, OuterRef, Q
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import BaseFilterBackend
+from .models import Task, TaskTag
+from .search import get_search_backend
+
+MIN_ID, MAX_ID = -2 ** 63, 2 ** 63 - 1
+
+
+class TaskFilter(BaseFilterBackend):
+    """
+    Filter tasks by query parameters:
+
+    - `status`: one or more comma separated statuses
+    - `tag`: one or more comma separated tag ids (any of)
+    - `assigned_to`: one or more comma separated user ids, or `me`
+    - `due_before` / `due_after`: ISO 8601 date or datetime
+    - `overdue`: `true` for open tasks past their due date, `false` for the rest
+    """
+    true_values = ('1', 'true', 'yes')
+    false_values = ('0', 'false', 'no')
+
+    def filter_queryset(self, request, queryset, view):
+        params = request.query_params
+
+        statuses = self._split(params.get('status'))
+        if statuses:
+            valid = {status for status, _ in Task.STATUS_CHOICES}
+            unknown = [status for status in statuses if status not in valid]
+            if unknown:
+                raise ValidationError({'status': [f'"{status}" is not a valid choice.' for status in unknown]})
+            queryset = queryset.filter(status__in=statuses)
+
+        tag_ids = self._ids(params, 'tag')
+        if tag_ids:
+            # EXISTS rather than a join so tasks never come back duplicated
+            tagged = TaskTag.objects.filter(task_id=OuterRef('pk'), tag_id__in=tag_ids)
+            queryset = queryset.filter(Exists(tagged))
+
+        user_ids = self._ids(params, 'assigned_to', me=request.user.pk)
+        if user_ids:
+            assigned = Task.assigned_to.through.objects.filter(
+                task_id=OuterRef('pk'), customuser_id__in=user_ids
+            )
+            queryset = queryset.filter(Exists(assigned))
+
+        due_before = self._datetime(params, 'due_before', end_of_day=True)
+        if due_before:
+            queryset = queryset.filter(due_date__lte=due_before)
+
+        due_after = self._datetime(params, 'due_after')
+        if due_after:
+            queryset = queryset.filter(due_date__gte=due_after)
+
+        overdue = params.get('overdue', '').lower()
+        overdue_q = Q(due_date__lt=timezone.now()) & ~Q(status='completed')
+        if overdue in self.true_values:
+            queryset = queryset.filter(overdue_q)
+        elif overdue in self.false_values:
+            queryset = queryset.exclude(overdue_q)
+        elif overdue:
+            raise ValidationError({'overdue': ['Must be true or false.']})
+
+        return queryset
+
+    def _split(self, value):
+        return [item.strip() for item in (value or '').split(',') if item.strip()]
+
+    def _ids(self, params, name, me=None):
+        ids = []
+        for item in self._split(params.get(name)):
+            if item == 'me' and me is not None:
+                ids.append(me)
+                continue
+            try:
+                value = int(item)
+            except ValueError:
+                value = None
+            # Ids are 64-bit integers; larger values overflow in the database
+            if value is None or not MIN_ID <= value <= MAX_ID:
+                raise ValidationError({name: [f'"{item}" is not a valid id.']})
+            ids.append(value)
+        return ids
+
+    def _datetime(self, params, name, end_of_day=False):
+        value = params.get(name)
+        if not value:
+            return None
+        try:
+            parsed = parse_datetime(value)
+            if parsed is None:
+                day = parse_date(value)
+                if day is not None:
+                    parsed = datetime.combine(day, time.max if end_of_day else time.min)
+        except ValueError:
+            parsed = None
+        if parsed is None:
+            raise ValidationError({name: ['Enter a valid date or datetime.']})
+        if timezone.is_naive(parsed):
+            parsed = timezone.make_aware(parsed)
+        return parsed
+
+
+class TaskSearchFilter(BaseFilterBackend):
+    """
+    Full-text search over task names, descriptions and comments with the
+    configured search backend (see tasks.search).
+    """
+    search_param = 'search'
+
+    def filter_queryset(self, request, queryset, view):
+        text = request.query_params.get(self.search_param, '').strip()
+        if not text:
+            return queryset
+        return get_search_backend().search(queryset, text)
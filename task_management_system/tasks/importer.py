@@ -0,0 +1,334 @@
+"""
+Bulk import of projects, tasks and comments in the formats written by
+tasks.export (NDJSON, or CSV with the export's columns).
+
+Records are read one at a time and written a chunk at a time, each chunk
+in its own transaction with `bulk_create()` on the tasks, comments, tags
+and through tables. Users and tags are resolved through in-memory maps,
+and the ids in the file (`project` of a task, `task` of a comment) through
+maps of the rows created so far, so files can be of any size. Users are
+named by email, as tasks.export writes them. Records of an unknown type,
+with fields of the wrong type or with references to unknown rows are
+skipped and listed in the report; the rest of the file is still imported.
+
+`bulk_create()` sends no signals, so each chunk also updates the search
+index, statistics, project timestamps and change feed itself.
+
+With a checkpoint file, every committed chunk appends its position in the
+input and the ids it created; a later run with the same checkpoint skips
+what was imported and carries on. A crash between the commit of a chunk
+and the write of its checkpoint line imports that chunk twice.
+"""
+import csv
+import json
+import time
+from collections import Counter
+from django.db import transaction
+from django.utils.dateparse import parse_datetime
+from users.models import CustomUser
+from .events import publish_project_event
+from .membership import invalidate_membership
+from .models import Project, ProjectStats, Task, Comment, Tag, TaskTag
+from .search import get_search_backend
+from .stats import rebuild_project_stats, update_stats
+from .timestamps import touch_projects
+
+IMPORT_FORMATS = ('ndjson', 'csv')
+DEFAULT_CHUNK_SIZE = 5000
+STATUSES = {status for status, _ in Task.STATUS_CHOICES}
+# JSON types of the fields read from each record type; `list` is a list of strings
+RECORD_FIELDS = {
+    'project': {'id': int, 'name': str, 'description': str, 'owner': str},
+    'task': {'id': int, 'project': int, 'name': str, 'description': str, 'status': str, 'due_date': str,
+             'tags': list, 'assigned_to': list},
+    'comment': {'id': int, 'task': int, 'author': str, 'content': str},
+}
+TYPE_NAMES = {int: 'an integer', str: 'a string', list: 'a list of strings'}
+# Errors kept in the report; the rest are only counted
+MAX_REPORTED_ERRORS = 20
+
+
+def read_records(lines, format='ndjson'):
+    """
+    Records from an iterable of text lines (e.g. an open file).
+    """
+    if format not in IMPORT_FORMATS:
+        raise ValueError(f'Unknown import format: {format}')
+    if format == 'csv':
+        for row in csv.DictReader(lines):
+            yield {key: _csv_value(key, value) for key, value in row.items() if value != ''}
+        return
+    for number, line in enumerate(lines, 1):
+        if line.strip():
+            record = json.loads(line)
+            if not isinstance(record, dict):
+                raise ValueError(f'Line {number} is not a JSON object.')
+            yield record
+
+
+def _csv_value(key, value):
+    if key in ('tags', 'assigned_to'):
+        return value.split(';')
+    if key in ('id', 'project', 'task'):
+        # Left as text when it is not a number, to be reported with its row
+        try:
+            return int(value)
+        except ValueError:
+            return value
+    return value
+
+
+def record_error(record):
+    """
+    Why `record` cannot be imported, or None. Valid `due_date` values are
+    replaced by the datetime they parse to.
+    """
+    kind = record.get('type')
+    if not isinstance(kind, str) or kind not in RECORD_FIELDS:
+        return f'Unknown record type: {kind!r}'
+    for field, expected in RECORD_FIELDS[kind].items():
+        value = record.get(field)
+        if value is None:
+            continue
+        if expected is int:
+            valid = isinstance(value, int) and not isinstance(value, bool)
+        elif expected is list:
+            valid = isinstance(value, list) and all(isinstance(item, str) for item in value)
+        else:
+            valid = isinstance(value, expected)
+        if not valid:
+            return f'{field} must be {TYPE_NAMES[expected]}.'
+    if record.get('due_date'):
+        try:
+            due_date = parse_datetime(record['due_date'])
+        except ValueError:
+            due_date = None
+        if due_date is None:
+            return f'Invalid due_date: {record["due_date"]!r}'
+        record['due_date'] = due_date
+    return None
+
+
+class Checkpoint:
+    """
+    Append-only log of committed chunks: one JSON line each with the
+    position reached and the `{source id: new id}` pairs created.
+    """
+    def __init__(self, path):
+        self.path = path
+
+    def load(self):
+        position, projects, tasks = 0, {}, {}
+        try:
+            with open(self.path, encoding='utf-8') as lines:
+                for line in lines:
+                    entry = json.loads(line)
+                    position = entry['position']
+                    projects.update((int(k), v) for k, v in entry['projects'].items())
+                    tasks.update((int(k), v) for k, v in entry['tasks'].items())
+        except FileNotFoundError:
+            pass
+        return position, projects, tasks
+
+    def save(self, position, projects, tasks):
+        with open(self.path, 'a', encoding='utf-8') as log:
+            log.write(json.dumps({'position': position, 'projects': projects, 'tasks': tasks}) + '\n')
+
+
+class TaskImporter:
+    """
+    Import records into `project`, or into the projects created from the
+    `project` records of the input when it is None. Unknown comment
+    authors and project owners fall back to `default_user`. With `author`,
+    every comment is written by that user whatever the input names, as
+    for uploads, where the input is not trusted.
+    """
+    def __init__(self, default_user, project=None, chunk_size=DEFAULT_CHUNK_SIZE, checkpoint=None, progress=None,
+                 author=None):
+        self.default_user = default_user
+        self.project = project
+        self.author = author
+        self.chunk_size = chunk_size
+        self.checkpoint = checkpoint
+        self.progress = progress
+
+    def run(self, records):
+        position, self.projects, self.tasks = self.checkpoint.load() if self.checkpoint else (0, {}, {})
+        self.users = dict(CustomUser.objects.values_list('email', 'pk'))
+        self.tags = dict(Tag.objects.values_list('name', 'pk'))
+        self.counts = Counter()
+        self.errors = []
+        started = time.monotonic()
+
+        chunk, index = [], -1
+        for index, record in enumerate(records):
+            if index < position:
+                continue
+            chunk.append(record)
+            if len(chunk) >= self.chunk_size:
+                self._import_chunk(chunk, index + 1, started)
+                chunk = []
+        if chunk:
+            self._import_chunk(chunk, index + 1, started)
+
+        seconds = time.monotonic() - started
+        return {
+            **{key: self.counts[key] for key in ('rows', 'projects', 'tasks', 'comments', 'tags', 'skipped')},
+            'resumed_at': position,
+            'seconds': round(seconds, 3),
+            'rows_per_second': round(self.counts['rows'] / seconds) if seconds else 0,
+            'errors': self.errors,
+        }
+
+    def _import_chunk(self, records, position, started):
+        new_projects, new_tasks = {}, {}
+        with transaction.atomic():
+            touched = self._write(records, new_projects, new_tasks)
+            touch_projects(touched)
+            publish_project_event(touched, {'type': 'resync'})
+        self.projects.update(new_projects)
+        self.tasks.update(new_tasks)
+        self.counts['rows'] += len(records)
+        if self.checkpoint:
+            self.checkpoint.save(position, new_projects, new_tasks)
+        if self.progress:
+            seconds = time.monotonic() - started
+            self.progress(self.counts['rows'], self.counts['rows'] / seconds if seconds else 0)
+
+    def _write(self, records, new_projects, new_tasks):
+        by_type = {'project': [], 'task': [], 'comment': []}
+        for record in records:
+            error = record_error(record)
+            if error is None:
+                by_type[record['type']].append(record)
+            else:
+                self._skip(record.get('id'), error)
+
+        if self.project is None:
+            self._create_projects(by_type['project'], new_projects)
+        tasks = self._create_tasks(by_type['task'], new_projects, new_tasks)
+        comments = self._create_comments(by_type['comment'], new_tasks)
+
+        search = get_search_backend()
+        search.index_tasks([task for task, _ in tasks])
+        search.index_comments(comments)
+        self._count(tasks)
+        touched = {task.project_id for task, _ in tasks} | set(new_projects.values())
+        commented = {comment.task_id for comment in comments}
+        return touched | set(Task.objects.filter(pk__in=commented).values_list('project_id', flat=True).distinct())
+
+    def _create_projects(self, records, new_projects):
+        projects = [
+            Project(
+                name=(record.get('name') or '')[:100],
+                description=record.get('description') or '',
+                owner_id=self.users.get(record.get('owner'), self.default_user.pk),
+            )
+            for record in records
+        ]
+        Project.objects.bulk_create(projects)
+        invalidate_membership(*{project.owner_id for project in projects})
+        for record, project in zip(records, projects):
+            if 'id' in record:
+                new_projects[record['id']] = project.pk
+        self.counts['projects'] += len(projects)
+
+    def _project_id(self, record, new_projects):
+        if self.project is not None:
+            return self.project.pk
+        source = record.get('project')
+        return new_projects.get(source) or self.projects.get(source)
+
+    def _create_tasks(self, records, new_projects, new_tasks):
+        tasks = []
+        for record in records:
+            project_id = self._project_id(record, new_projects)
+            status = record.get('status', 'todo')
+            if project_id is None:
+                self._skip(record.get('id'), f'Unknown project: {record.get("project")!r}')
+            elif status not in STATUSES:
+                self._skip(record.get('id'), f'Unknown status: {status!r}')
+            elif not record.get('name'):
+                self._skip(record.get('id'), 'Missing name')
+            else:
+                record['tags'] = [name[:30] for name in record.get('tags') or ()]
+                tasks.append((Task(
+                    project_id=project_id,
+                    name=record['name'][:100],
+                    description=record.get('description') or '',
+                    status=status,
+                    due_date=record.get('due_date') or None,
+                ), record))
+
+        Task.objects.bulk_create([task for task, _ in tasks], batch_size=1000)
+        self._create_tags({name for _, record in tasks for name in record['tags']})
+        TaskTag.objects.bulk_create([
+            TaskTag(task_id=task.pk, tag_id=self.tags[name])
+            for task, record in tasks for name in dict.fromkeys(record['tags'])
+        ], batch_size=1000)
+        assignments = Task.assigned_to.through
+        assignments.objects.bulk_create([
+            assignments(task_id=task.pk, customuser_id=user_id)
+            for task, record in tasks for user_id in self._assignees(record)
+        ], batch_size=1000)
+
+        for task, record in tasks:
+            if 'id' in record:
+                new_tasks[record['id']] = task.pk
+        self.counts['tasks'] += len(tasks)
+        return tasks
+
+    def _create_tags(self, names):
+        names -= self.tags.keys()
+        if names:
+            Tag.objects.bulk_create([Tag(name=name[:30]) for name in names], ignore_conflicts=True)
+            self.tags.update(Tag.objects.filter(name__in=names).values_list('name', 'pk'))
+            self.counts['tags'] += len(names)
+
+    def _create_comments(self, records, new_tasks):
+        comments = []
+        for record in records:
+            task_id = new_tasks.get(record.get('task')) or self.tasks.get(record.get('task'))
+            if task_id is None:
+                self._skip(record.get('id'), f'Unknown task: {record.get("task")!r}')
+            else:
+                comments.append(Comment(
+                    task_id=task_id,
+                    author_id=self._author_id(record),
+                    content=record.get('content') or '',
+                ))
+        Comment.objects.bulk_create(comments, batch_size=1000)
+        self.counts['comments'] += len(comments)
+        return comments
+
+    def _author_id(self, record):
+        if self.author is not None:
+            return self.author.pk
+        return self.users.get(record.get('author'), self.default_user.pk)
+
+    def _assignees(self, record):
+        emails = dict.fromkeys(record.get('assigned_to') or ())
+        return [self.users[email] for email in emails if email in self.users]
+
+    def _count(self, tasks):
+        # As the signal handlers would have, one update per project and status
+        project_ids = {task.project_id for task, _ in tasks}
+        counted = set(ProjectStats.objects.filter(project_id__in=project_ids).values_list('project_id', flat=True))
+        # Projects without statistics yet are counted whole, this chunk included
+        rebuild_project_stats(project_ids - counted)
+
+        project_deltas, assignee_deltas = Counter(), Counter()
+        for task, record in tasks:
+            if task.project_id in counted:
+                project_deltas[task.project_id, task.status] += 1
+                for user_id in self._assignees(record):
+                    assignee_deltas[task.project_id, task.status, user_id] += 1
+        for (project_id, status), count in project_deltas.items():
+            update_stats(project_id, {status: count})
+        for (project_id, status, user_id), count in assignee_deltas.items():
+            update_stats(project_id, {status: count}, user_ids=[user_id])
+
+    def _skip(self, source_id, message):
+        self.counts['skipped'] += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({'id': source_id, 'error': message})
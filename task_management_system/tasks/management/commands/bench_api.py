@@ -0,0 +1,108 @@
+import json
+import subprocess
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Count
+from django.utils import timezone
+from tasks.benchmarks import Benchmark, build_cases, choose_subject, compare, dataset_counts
+from tasks.models import Project
+from users.models import CustomUser
+
+
+class Command(BaseCommand):
+    help = (
+        'Request each API endpoint in-process with the test client and report p50/p95 latency, queries '
+        'and peak memory per request. Results are written as JSON and can be compared with an earlier run.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', help='Username to request as; by default the one seeing the most tasks.')
+        parser.add_argument('--max-tasks', type=int, default=5000,
+                            help='Most tasks visible to the chosen user (project lists render all of them).')
+        parser.add_argument('--requests', type=int, default=50, help='Measured requests per endpoint.')
+        parser.add_argument('--memory-requests', type=int, default=5, help='Requests per endpoint under tracemalloc.')
+        parser.add_argument('--warmup', type=int, default=3)
+        parser.add_argument('--cold', action='store_true', help='Clear the cache before every request.')
+        parser.add_argument('--only', action='append', default=[], help='Run the cases starting with this name.')
+        parser.add_argument('--output', help='Results file; bench-<commit>.json by default.')
+        parser.add_argument('--compare', help='Results file of an earlier run to compare with.')
+        parser.add_argument('--threshold', type=float, default=0.1,
+                            help='Relative increase of p95 latency or memory reported as a regression.')
+        parser.add_argument('--fail-on-regression', action='store_true')
+
+    def handle(self, *args, **options):
+        if options['requests'] < 1:
+            raise CommandError('--requests must be positive.')
+        baseline = None
+        if options['compare']:
+            try:
+                with open(options['compare']) as file:
+                    baseline = json.load(file)
+            except (OSError, ValueError) as error:
+                raise CommandError(f'Cannot read {options["compare"]}: {error}')
+
+        if options['user']:
+            user = CustomUser.objects.filter(username=options['user']).first()
+            if user is None:
+                raise CommandError(f'User {options["user"]} does not exist.')
+            project = Project.objects.visible_to(user).annotate(size=Count('tasks')).order_by('-size', 'pk').first()
+        else:
+            user, project = choose_subject(options['max_tasks'])
+        if user is None or project is None:
+            raise CommandError('No user with a project to benchmark; run seed_bench first.')
+
+        cases = build_cases(project)
+        if options['only']:
+            cases = [(name, url) for name, url in cases if name.startswith(tuple(options['only']))]
+        self.stdout.write(f'{user.username}, project {project.pk}: {len(cases)} cases')
+
+        benchmark = Benchmark(user, requests=options['requests'], memory_requests=options['memory_requests'],
+                              warmup=options['warmup'], cold=options['cold'])
+        results = benchmark.run(cases, progress=self._print)
+
+        commit = self._commit()
+        report = {
+            'commit': commit,
+            'timestamp': timezone.now().isoformat(),
+            'database': connection.vendor,
+            'dataset': dataset_counts(),
+            'parameters': {
+                'user': user.username,
+                'project': project.pk,
+                **{key: options[key] for key in ('requests', 'memory_requests', 'warmup', 'cold')},
+            },
+            'results': results,
+        }
+        output = options['output'] or f'bench-{(commit or "unknown")[:12]}.json'
+        with open(output, 'w') as file:
+            json.dump(report, file, indent=2)
+        self.stdout.write(self.style.SUCCESS(f'Wrote {output}'))
+
+        if baseline is not None:
+            rows, regressed = compare(results, baseline.get('results', {}), options['threshold'])
+            self.stdout.write(f'Compared with {baseline.get("commit") or options["compare"]}:')
+            for name, metric, old, new, change, worse in rows:
+                if old != new:
+                    flag = '  REGRESSION' if worse else ''
+                    self.stdout.write(f'  {name:<40} {metric:<8} {old:>10} -> {new:<10} {change:+.1%}{flag}')
+            if regressed and options['fail_on_regression']:
+                raise CommandError('Performance regressed.')
+
+    def _print(self, name, result):
+        def metric(key, width, kind=''):
+            # Queries are not counted without instrumentation, nor memory with --memory-requests 0
+            value = result.get(key)
+            return '-'.rjust(width) if value is None else format(value, f'>{width}{kind}')
+
+        self.stdout.write(
+            f'{name:<40} p50 {metric("p50_ms", 8, ".2f")} ms  p95 {metric("p95_ms", 8, ".2f")} ms  '
+            f'{metric("queries", 3)} queries  {metric("peak_kb", 9, ".1f")} KB  {metric("bytes", 9)} bytes'
+        )
+
+    def _commit(self):
+        try:
+            return subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=settings.BASE_DIR, capture_output=True,
+                                  text=True, check=True).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
@@ -0,0 +1,55 @@
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.middleware.gzip import GZipMiddleware
+from django.utils.text import compress_string
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+from task_management_system.middleware import brotli
+from task_management_system.renderers import FastJSONRenderer, orjson
+from tasks.models import Project
+from tasks.serializers import ProjectSerializer
+
+
+class Command(BaseCommand):
+    help = ('Compare the encode time of the stdlib and fast JSON renderers on the ProjectSerializer '
+            'payload of a project, and its size uncompressed, gzipped and brotli compressed.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('project', type=int, help='Project id')
+        parser.add_argument('--repeat', type=int, default=5, help='Runs per renderer; the best one counts.')
+
+    def handle(self, *args, **options):
+        project = Project.objects.filter(pk=options['project']).with_task_tree().first()
+        if project is None:
+            raise CommandError(f'Project {options["project"]} does not exist.')
+        request = Request(APIRequestFactory().get('/'))
+        request.user = project.owner
+        data = ProjectSerializer(project, context={'request': request}).data
+        self.stdout.write(f'Project {project.pk}: {len(data["tasks"])} tasks')
+
+        renderers = [('json', JSONRenderer())]
+        if orjson is not None:
+            renderers.append(('orjson', FastJSONRenderer()))
+        for name, renderer in renderers:
+            content, seconds = self._best(lambda: renderer.render(data), options['repeat'])
+            self.stdout.write(f'encode  {name:<8} {seconds * 1000:>9.1f} ms')
+
+        sizes = [('identity', lambda: content)]
+        # As compression_middleware sends it, padding included
+        sizes.append(('gzip', lambda: compress_string(content, max_random_bytes=GZipMiddleware.max_random_bytes)))
+        if brotli is not None:
+            sizes.append(('br', lambda: brotli.compress(content, quality=settings.COMPRESSION_BROTLI_QUALITY)))
+        for name, compress in sizes:
+            compressed, seconds = self._best(compress, options['repeat'])
+            self.stdout.write(f'bytes   {name:<8} {len(compressed):>12} ({seconds * 1000:.1f} ms)')
+
+    def _best(self, run, repeat):
+        best = None
+        for _ in range(max(repeat, 1)):
+            started = time.perf_counter()
+            result = run()
+            seconds = time.perf_counter() - started
+            best = seconds if best is None else min(best, seconds)
+        return result, best
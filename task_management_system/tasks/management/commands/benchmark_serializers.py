@@ -0,0 +1,49 @@
+import time
+from django.core.management.base import BaseCommand, CommandError
+from tasks.models import Project, Task, Comment
+from tasks.row_serializers import CommentRowSerializer, TaskRowSerializer
+from tasks.serializers import CommentSerializer, TaskSerializer
+
+
+class Command(BaseCommand):
+    help = ('Compare the rows per second of the task and comment list serializers with the '
+            'values() based ones of tasks.row_serializers, queries included.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--project', type=int, help='Project id (default: all projects)')
+        parser.add_argument('--repeat', type=int, default=5, help='Runs per serializer; the best one counts.')
+
+    def handle(self, *args, **options):
+        tasks = Task.objects.order_by('due_date', 'name', 'pk')
+        comments = Comment.objects.order_by('created_at', 'pk')
+        if options['project'] is not None:
+            if not Project.objects.filter(pk=options['project']).exists():
+                raise CommandError(f'Project {options["project"]} does not exist.')
+            tasks = tasks.filter(project_id=options['project'])
+            comments = comments.filter(task__project_id=options['project'])
+
+        cases = [
+            ('tasks', 'TaskSerializer', lambda: TaskSerializer(tasks.with_relations(), many=True).data),
+            ('tasks', 'TaskRowSerializer', lambda: TaskRowSerializer(TaskRowSerializer.values(tasks)).data),
+            ('comments', 'CommentSerializer',
+             lambda: CommentSerializer(comments.select_related('author'), many=True).data),
+            ('comments', 'CommentRowSerializer',
+             lambda: CommentRowSerializer(CommentRowSerializer.values(comments)).data),
+        ]
+        baseline = {}
+        for kind, name, render in cases:
+            rows, seconds = self._best(render, options['repeat'])
+            rate = rows / seconds if seconds else 0
+            speedup = f' ({rate / baseline[kind]:.1f}x)' if baseline.get(kind) else ''
+            baseline.setdefault(kind, rate)
+            self.stdout.write(f'{name:<22} {rows:>8} {kind:<8} {seconds * 1000:>9.1f} ms '
+                              f'{rate:>10.0f} rows/s{speedup}')
+
+    def _best(self, render, repeat):
+        best = None
+        for _ in range(max(repeat, 1)):
+            started = time.perf_counter()
+            rows = len(render())
+            seconds = time.perf_counter() - started
+            best = seconds if best is None else min(best, seconds)
+        return rows, best
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand, CommandError
+from tasks.export import DEFAULT_CHUNK_SIZE, EXPORT_FORMATS, export_project
+from tasks.models import Project
+
+
+class Command(BaseCommand):
+    help = 'Export a project with its tasks and comments as NDJSON or CSV.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('project_id', type=int)
+        parser.add_argument('--format', choices=EXPORT_FORMATS, default='ndjson')
+        parser.add_argument('--output', help='File to write to; standard output by default.')
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        try:
+            project = Project.objects.select_related('owner').get(pk=options['project_id'])
+        except Project.DoesNotExist:
+            raise CommandError(f'Project {options["project_id"]} does not exist.')
+
+        chunks = export_project(project, options['format'], options['chunk_size'])
+        if options['output']:
+            # newline='' leaves the CSV line endings alone
+            with open(options['output'], 'w', encoding='utf-8', newline='') as output:
+                output.writelines(chunks)
+            self.stderr.write(self.style.SUCCESS(f'Exported project {project.pk} to {options["output"]}.'))
+        else:
+            for chunk in chunks:
+                self.stdout.write(chunk, ending='')
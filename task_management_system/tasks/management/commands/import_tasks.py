@@ -0,0 +1,60 @@
+import os
+from django.core.management.base import BaseCommand, CommandError
+from tasks.importer import DEFAULT_CHUNK_SIZE, IMPORT_FORMATS, Checkpoint, TaskImporter, read_records
+from tasks.models import Project
+from users.models import CustomUser
+
+
+class Command(BaseCommand):
+    help = (
+        'Import projects, tasks and comments from NDJSON or CSV (the formats of export_project). '
+        'Interrupted imports resume from the checkpoint file.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--format', choices=IMPORT_FORMATS,
+                            help='Input format; by default from the file extension.')
+        parser.add_argument('--project', type=int,
+                            help='Import every task into this project instead of creating the input\'s projects.')
+        parser.add_argument('--user', help='Email of the user for unknown owners and authors; the project owner by default.')
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+        parser.add_argument('--checkpoint', help='Checkpoint file; PATH.checkpoint by default.')
+        parser.add_argument('--no-checkpoint', action='store_true')
+
+    def handle(self, *args, **options):
+        project = None
+        if options['project'] is not None:
+            project = Project.objects.select_related('owner').filter(pk=options['project']).first()
+            if project is None:
+                raise CommandError(f'Project {options["project"]} does not exist.')
+        if options['user']:
+            user = CustomUser.objects.filter(email=options['user']).first()
+            if user is None:
+                raise CommandError(f'User {options["user"]} does not exist.')
+        elif project is not None:
+            user = project.owner
+        else:
+            raise CommandError('--user is required without --project.')
+
+        checkpoint = None
+        if not options['no_checkpoint']:
+            checkpoint = Checkpoint(options['checkpoint'] or f'{options["path"]}.checkpoint')
+        fmt = options['format'] or ('csv' if options['path'].endswith('.csv') else 'ndjson')
+        importer = TaskImporter(user, project, options['chunk_size'], checkpoint, progress=self._progress)
+
+        with open(options['path'], encoding='utf-8', newline='') as lines:
+            report = importer.run(read_records(lines, fmt))
+
+        for error in report['errors']:
+            self.stderr.write(f'Skipped {error["id"]}: {error["error"]}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Imported {report["rows"]} rows ({report["projects"]} projects, {report["tasks"]} tasks, '
+            f'{report["comments"]} comments, {report["tags"]} new tags, {report["skipped"]} skipped) '
+            f'in {report["seconds"]}s, {report["rows_per_second"]} rows/s.'
+        ))
+        if checkpoint is not None and report['resumed_at']:
+            self.stdout.write(f'Resumed after row {report["resumed_at"]} of {os.path.basename(options["path"])}.')
+
+    def _progress(self, rows, rate):
+        self.stdout.write(f'{rows} rows, {rate:.0f} rows/s')
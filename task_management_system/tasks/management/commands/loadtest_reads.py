@@ -0,0 +1,52 @@
+import statistics
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = ('Load test the read endpoints of a running deployment, e.g. the ASGI app '
+            '(uvicorn task_management_system.asgi:application) against the WSGI one '
+            '(gunicorn task_management_system.wsgi) on the same machine.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('base_url', help='e.g. http://127.0.0.1:8000/api/v1')
+        parser.add_argument('--token', required=True, help='JWT access token')
+        parser.add_argument('--path', action='append', dest='paths',
+                            help='Path below base_url to request, repeatable (default: projects/)')
+        parser.add_argument('--concurrency', type=int, default=50)
+        parser.add_argument('--requests', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        base_url = options['base_url'].rstrip('/')
+        urls = [f'{base_url}/{path.lstrip("/")}' for path in options['paths'] or ['projects/']]
+        headers = {'Authorization': f'Bearer {options["token"]}', 'Accept': 'application/json'}
+        total = options['requests']
+
+        def fetch(index):
+            request = urllib.request.Request(urls[index % len(urls)], headers=headers)
+            started = time.perf_counter()
+            try:
+                with urllib.request.urlopen(request) as response:
+                    response.read()
+                    ok = response.status == 200
+            except (urllib.error.URLError, ConnectionError):
+                ok = False
+            return ok, time.perf_counter() - started
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options['concurrency']) as pool:
+            results = list(pool.map(fetch, range(total)))
+        elapsed = time.perf_counter() - started
+
+        latencies = sorted(latency for _, latency in results)
+        errors = sum(1 for ok, _ in results if not ok)
+        self.stdout.write(
+            f'{total} requests, concurrency {options["concurrency"]}: '
+            f'{total / elapsed:.0f} req/s, '
+            f'p50 {statistics.median(latencies) * 1000:.1f} ms, '
+            f'p95 {latencies[int(len(latencies) * 0.95) - 1] * 1000:.1f} ms, '
+            f'{errors} errors'
+        )
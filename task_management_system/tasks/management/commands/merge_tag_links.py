@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from tasks.models import TaskTag
+
+LEGACY_TABLE = 'tasks_tag_tasks'
+
+
+class Command(BaseCommand):
+    help = (
+        'Merge task/tag links from the legacy Tag.tasks table into the '
+        'canonical TaskTag table, optionally dropping the legacy table.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--drop-legacy', action='store_true', help='Drop the legacy table once merged.')
+
+    def handle(self, *args, **options):
+        if LEGACY_TABLE not in connection.introspection.table_names():
+            self.stdout.write(f'No {LEGACY_TABLE} table, nothing to merge.')
+            return
+
+        batch_size = options['batch_size']
+        merged = 0
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                cursor.execute(f'SELECT task_id, tag_id FROM {LEGACY_TABLE} ORDER BY id')
+                while True:
+                    rows = cursor.fetchmany(batch_size)
+                    if not rows:
+                        break
+                    # Links present in both tables are skipped by the unique constraint
+                    TaskTag.objects.bulk_create(
+                        [TaskTag(task_id=task_id, tag_id=tag_id) for task_id, tag_id in rows],
+                        ignore_conflicts=True,
+                    )
+                    merged += len(rows)
+
+            if options['drop_legacy']:
+                with connection.cursor() as cursor:
+                    cursor.execute(f'DROP TABLE {connection.ops.quote_name(LEGACY_TABLE)}')
+
+        self.stdout.write(self.style.SUCCESS(f'Merged {merged} legacy tag links.'))
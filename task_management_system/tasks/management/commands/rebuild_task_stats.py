@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+from tasks.models import Project
+from tasks.stats import rebuild_project_stats
+
+
+class Command(BaseCommand):
+    help = 'Recount the per-project and per-assignee task statistics from the tasks.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500,
+                            help='Projects recounted per transaction.')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        project_ids = list(Project.objects.order_by('pk').values_list('pk', flat=True))
+        for start in range(0, len(project_ids), batch_size):
+            rebuild_project_stats(project_ids[start:start + batch_size])
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt task statistics of {len(project_ids)} projects.'))
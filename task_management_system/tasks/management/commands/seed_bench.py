@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand, CommandError
+from tasks.seed import seed
+from users.models import CustomUser
+
+
+class Command(BaseCommand):
+    help = (
+        'Generate a synthetic dataset for benchmarks: users, projects with skewed member counts, tasks, '
+        'tags and comments, written with bulk inserts.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--projects', type=int, default=200)
+        parser.add_argument('--tasks', type=int, default=100000)
+        parser.add_argument('--tags', type=int, default=200)
+        parser.add_argument('--comments-per-task', type=float, default=1.0, help='Average comments per task.')
+        parser.add_argument('--prefix', default='bench', help='Prefix of the usernames; also their password.')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed; the same one gives the same data.')
+        parser.add_argument('--batch-size', type=int, default=5000, help='Tasks per transaction.')
+        parser.add_argument('--skip-search-index', action='store_true',
+                            help='Do not rebuild the search index at the end.')
+
+    def handle(self, *args, **options):
+        if options['users'] < 1 or options['projects'] < 1 or options['batch_size'] < 1:
+            raise CommandError('--users, --projects and --batch-size must be positive.')
+        if CustomUser.objects.filter(username__startswith=options['prefix']).exists():
+            raise CommandError(f'Users named {options["prefix"]}* already exist; use another --prefix.')
+
+        def progress(created):
+            self.stdout.write(f'{created}/{options["tasks"]} tasks')
+
+        counts = seed(
+            users=options['users'],
+            projects=options['projects'],
+            tasks=options['tasks'],
+            tags=options['tags'],
+            comments_per_task=options['comments_per_task'],
+            prefix=options['prefix'],
+            seed=options['seed'],
+            batch_size=options['batch_size'],
+            search_index=not options['skip_search_index'],
+            progress=progress if options['verbosity'] > 1 else None,
+        )
+        self.stdout.write(self.style.SUCCESS(', '.join(f'{count} {name}' for name, count in counts.items())))
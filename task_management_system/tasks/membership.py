@@ -0,0 +1,108 @@
+import time
+from collections import namedtuple
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from .models import Project
+
+
+ProjectMembership = namedtuple('ProjectMembership', ['owned', 'visible'])
+_RequestMemo = namedtuple('_RequestMemo', ['user_id', 'value'])
+
+# Attribute used to memoize the membership on the current request
+REQUEST_ATTR = '_project_membership'
+
+
+def _version_key(user_id):
+    return f'tasks:membership-version:{user_id}'
+
+
+def _membership_key(user_id, version):
+    return f'tasks:membership:{user_id}:{version}'
+
+
+def get_membership(user, request=None):
+    """
+    Return the ids of the projects the user owns and can see (owns or is a
+    member of).
+
+    The result is memoized on the request and stored in the Django cache
+    under a per-user version, which `invalidate_membership()` bumps
+    whenever ownership or membership changes.
+    """
+    if request is not None:
+        membership = getattr(request, REQUEST_ATTR, None)
+        if membership is not None and membership.user_id == user.pk:
+            return membership.value
+
+    # Seed versions from the clock so an evicted version key can never
+    # resurrect an entry cached under an older version
+    version = cache.get_or_set(_version_key(user.pk), time.time_ns, timeout=None)
+    key = _membership_key(user.pk, version)
+    membership = cache.get(key)
+    if membership is None:
+        membership = _build_membership(user, _membership_rows(user))
+        cache.set(key, membership, timeout=_timeout())
+
+    if request is not None:
+        setattr(request, REQUEST_ATTR, _RequestMemo(user.pk, membership))
+    return membership
+
+
+async def aget_membership(user, request=None):
+    """
+    Async counterpart of `get_membership()`, sharing its cache entries.
+    """
+    if request is not None:
+        membership = getattr(request, REQUEST_ATTR, None)
+        if membership is not None and membership.user_id == user.pk:
+            return membership.value
+
+    version = await cache.aget_or_set(_version_key(user.pk), time.time_ns, timeout=None)
+    key = _membership_key(user.pk, version)
+    membership = await cache.aget(key)
+    if membership is None:
+        rows = [row async for row in _membership_rows(user)]
+        membership = _build_membership(user, rows)
+        await cache.aset(key, membership, timeout=_timeout())
+
+    if request is not None:
+        setattr(request, REQUEST_ATTR, _RequestMemo(user.pk, membership))
+    return membership
+
+
+def _membership_rows(user):
+    return Project.objects.visible_to(user).order_by().values_list('pk', 'owner_id')
+
+
+def _build_membership(user, rows):
+    return ProjectMembership(
+        owned=frozenset(pk for pk, owner_id in rows if owner_id == user.pk),
+        visible=frozenset(pk for pk, _ in rows),
+    )
+
+
+def _timeout():
+    return getattr(settings, 'PROJECT_MEMBERSHIP_CACHE_TIMEOUT', 300)
+
+
+def invalidate_membership(*user_ids):
+    """
+    Bump the cache version of each user so their next lookup is rebuilt.
+
+    The bump waits for the current transaction to commit: bumped earlier,
+    a concurrent lookup could still read the old rows and cache them under
+    the new version.
+    """
+    user_ids = {user_id for user_id in user_ids if user_id is not None}
+    if user_ids:
+        transaction.on_commit(lambda: _bump_versions(user_ids))
+
+
+def _bump_versions(user_ids):
+    for user_id in user_ids:
+        try:
+            cache.incr(_version_key(user_id))
+        except ValueError:
+            # No version stored yet, nothing cached to invalidate
+            pass
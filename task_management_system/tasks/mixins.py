@@ -0,0 +1,176 @@
+import hashlib
+from django.db.models import Count, Func, Max, Subquery
+from django.utils import timezone
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.http import http_date, parse_etags, parse_http_date_safe
+from rest_framework import status
+from rest_framework.response import Response
+from task_management_system.fieldsets import Fieldset
+from .models import Project, Task
+
+
+class ConditionalGetMixin:
+    """
+    Answer `list` and `retrieve` with a weak ETag (and Last-Modified where
+    it is reliable), and reply 304 Not Modified before anything is
+    serialized when the client copy is current.
+
+    Validators come from one `MAX(updated_at)`/`COUNT(*)` aggregate over
+    `get_conditional_queryset()`. Changes below a project bump the project's
+    `updated_at` (see tasks.signals), so nested lists and objects also take
+    the parent project into account; it is also how they learn that a user
+    shown in them was renamed.
+    """
+    conditional_actions = ('list', 'retrieve')
+
+    def list(self, request, *args, **kwargs):
+        return self._conditional_response(request, super().list, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self._conditional_response(request, super().retrieve, *args, **kwargs)
+
+    def get_conditional_queryset(self):
+        queryset = self.filter_queryset(self.get_queryset())
+        if self.action == 'retrieve':
+            lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+            queryset = queryset.filter(**{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+        return queryset
+
+    def get_conditional_aggregates(self, queryset):
+        """
+        Extra aggregates whose values go into the ETag, for responses that
+        can change without any row changing.
+        """
+        return {}
+
+    def get_conditional_validators(self):
+        """
+        Return `(last_modified, count, *extra)` for the current request.
+        """
+        parent_id = self.kwargs.get('project_pk')
+        # Only the validators are needed: no ordering, joins or prefetching
+        queryset = self.get_conditional_queryset().order_by().prefetch_related(None)
+        return validators_from(queryset.aggregate(
+            **validator_aggregates(parent_id), **self.get_conditional_aggregates(queryset),
+        ))
+
+    def uses_last_modified(self):
+        # A deletion leaves MAX(updated_at) untouched, so Last-Modified is
+        # only trusted for single objects and lists under a project
+        return self.action == 'retrieve' or self.kwargs.get('project_pk') is not None
+
+    def _conditional_response(self, request, handler, *args, **kwargs):
+        if self.action not in self.conditional_actions:
+            return handler(request, *args, **kwargs)
+
+        last_modified, count, *extra = self.get_conditional_validators()
+        if self.action == 'retrieve' and not count:
+            # Let the regular path raise 404
+            return handler(request, *args, **kwargs)
+
+        etag = listing_etag(request, request.accepted_renderer.format, last_modified, count, *extra)
+        last_modified = last_modified if self.uses_last_modified() else None
+
+        if is_not_modified(request, etag, last_modified):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = handler(request, *args, **kwargs)
+            if response.status_code != status.HTTP_200_OK:
+                return response
+        patch_conditional_headers(response, etag, last_modified)
+        return response
+
+
+class ValuesListMixin:
+    """
+    Render `list` with `list_row_serializer_class` (see tasks.row_serializers)
+    from `values()` rows instead of model instances. Sparse fieldsets are
+    left to the regular serializer.
+    """
+    list_row_serializer_class = None
+
+    def list(self, request, *args, **kwargs):
+        if Fieldset.from_request(request) is not None:
+            return super().list(request, *args, **kwargs)
+
+        row_serializer_class = self.list_row_serializer_class
+        queryset = row_serializer_class.values(self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(row_serializer_class(page).data)
+        return Response(row_serializer_class(queryset).data)
+
+
+def validator_aggregates(parent_project_id=None):
+    """
+    Aggregates for `(last_modified, count)`, folding in the parent project's
+    `updated_at` for lists and objects nested under a project.
+    """
+    aggregates = {'last_modified': Max('updated_at'), 'count': Count('pk')}
+    if parent_project_id is not None:
+        parent = Project.objects.filter(pk=parent_project_id).values('updated_at')
+        aggregates['parent_modified'] = Max(Subquery(parent[:1]))
+    return aggregates
+
+
+def next_due_aggregate(project_ids):
+    """
+    The earliest upcoming due date of an open task in the projects. The
+    summary view's `next_due_date` moves on once it passes, though no row
+    changed, so its ETag includes this.
+    """
+    open_statuses = [status for status, _ in Task.STATUS_CHOICES if status != 'completed']
+    # MIN() as a plain function, not an aggregate, so the subquery is not grouped
+    upcoming = Task.objects.filter(
+        project_id__in=project_ids, status__in=open_statuses, due_date__gte=timezone.now(),
+    ).order_by().values(next_due_date=Func('due_date', function='MIN'))
+    return Max(Subquery(upcoming))
+
+
+def validators_from(values):
+    """
+    `(last_modified, count)` from the aggregates, followed by the values of
+    any extra aggregates.
+    """
+    last_modified = max(
+        (value for value in (values['last_modified'], values.get('parent_modified')) if value),
+        default=None,
+    )
+    extra = [value for key, value in values.items() if key not in ('last_modified', 'count', 'parent_modified')]
+    return last_modified, values['count'], *extra
+
+
+def weak_etag(*parts):
+    key = ':'.join(str(part) for part in parts)
+    return f'W/"{hashlib.md5(key.encode(), usedforsecurity=False).hexdigest()}"'
+
+
+def listing_etag(request, format, last_modified, count, *extra):
+    """
+    The ETag of a GET response built from `(last_modified, count, *extra)`
+    validators; shared by the sync viewsets and tasks.async_views.
+    """
+    return weak_etag(
+        request.get_full_path(), request.user.pk, format,
+        last_modified.isoformat() if last_modified else '', count, *extra,
+    )
+
+
+def is_not_modified(request, etag, last_modified=None):
+    if_none_match = request.headers.get('If-None-Match')
+    if if_none_match:
+        # Weak comparison, as required for GET (RFC 9110, 13.1.2)
+        etags = parse_etags(if_none_match)
+        return etag in etags or '*' in etags
+    if_modified_since = parse_http_date_safe(request.headers.get('If-Modified-Since', ''))
+    if last_modified and if_modified_since is not None:
+        return int(last_modified.timestamp()) <= if_modified_since
+    return False
+
+
+def patch_conditional_headers(response, etag, last_modified=None):
+    response['ETag'] = etag
+    if last_modified:
+        response['Last-Modified'] = http_date(last_modified.timestamp())
+    patch_cache_control(response, private=True, no_cache=True)
+    patch_vary_headers(response, ['Authorization'])
@@ -1,14 +1,129 @@
 from django.db import models
+from django.db.models import Count, IntegerField, Min, OuterRef, Prefetch, Q, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
 from users.models import CustomUser
 
 
+# Columns rendered by users.serializers.UserSerializer
+USER_SUMMARY_FIELDS = ('id', 'email', 'username', 'first_name', 'last_name')
+
+
+def task_tree_prefetches():
+    """
+    Prefetch lookups for the members and tasks rendered by ProjectSerializer,
+    usable with `prefetch_related()` or `prefetch_related_objects()`.
+    """
+    return [
+        Prefetch('members', queryset=CustomUser.objects.only(*USER_SUMMARY_FIELDS)),
+        Prefetch('tasks', queryset=Task.objects.with_relations()),
+    ]
+
+
+class ProjectQuerySet(models.QuerySet):
+    def visible_to(self, user):
+        """
+        Projects the user owns or is a member of. Membership is resolved
+        with a subquery on the members through-table so no DISTINCT is needed.
+        """
+        member_project_ids = Project.members.through.objects.filter(
+            customuser_id=user.pk
+        ).values('project_id')
+        return self.filter(Q(owner_id=user.pk) | Q(id__in=member_project_ids))
+
+    def with_task_tree(self):
+        """
+        Load everything ProjectSerializer renders in a fixed number of
+        queries, independent of the number of projects, tasks and tags.
+        """
+        return self.select_related('owner').prefetch_related(*task_tree_prefetches())
+
+    def with_summary(self):
+        """
+        Annotate per-project aggregates (task counts by status, next open
+        due date, member count) in a single grouped query.
+        """
+        now = timezone.now()
+        open_statuses = [status for status, _ in Task.STATUS_CHOICES if status != 'completed']
+        member_count = Project.members.through.objects.filter(
+            project_id=OuterRef('pk')
+        ).order_by().values('project_id').annotate(count=Count('*')).values('count')
+        status_counts = {
+            f'{status}_count': Count('tasks', filter=Q(tasks__status=status))
+            for status, _ in Task.STATUS_CHOICES
+        }
+        return self.select_related('owner').annotate(
+            task_count=Count('tasks'),
+            next_due_date=Min(
+                'tasks__due_date',
+                filter=Q(tasks__due_date__gte=now, tasks__status__in=open_statuses),
+            ),
+            member_count=Coalesce(Subquery(member_count, output_field=IntegerField()), 0),
+            **status_counts,
+        )
+
+    def with_fieldset(self, fieldset):
+        """
+        Load only what ProjectSerializer renders for a sparse `fieldset`
+        (see task_management_system.fieldsets): the requested columns, and
+        the members and tasks only when requested, as ids unless expanded.
+        """
+        columns = ['id', 'owner_id', *fieldset.columns('name', 'description', 'created_at', 'updated_at')]
+        queryset = self
+        if fieldset.includes('owner'):
+            queryset = queryset.select_related('owner')
+            columns.append('owner__username')
+        queryset = queryset.only(*columns)
+        prefetches = []
+        if fieldset.includes('members'):
+            members = fieldset.nested('members')
+            columns = members.columns(*USER_SUMMARY_FIELDS) if fieldset.expands('members') else []
+            prefetches.append(Prefetch('members', queryset=CustomUser.objects.only('id', *columns)))
+        if fieldset.includes('tasks'):
+            tasks = Task.objects.only('id', 'project_id')
+            if fieldset.expands('tasks'):
+                tasks = Task.objects.with_fieldset(fieldset.nested('tasks'))
+            prefetches.append(Prefetch('tasks', queryset=tasks))
+        return queryset.prefetch_related(*prefetches)
+
+
+class TaskQuerySet(models.QuerySet):
+    def with_relations(self):
+        """
+        Prefetch the tags and assignees rendered by TaskSerializer.
+        """
+        return self.prefetch_related(
+            Prefetch('tags', queryset=Tag.objects.only('id', 'name')),
+            Prefetch('assigned_to', queryset=CustomUser.objects.only(*USER_SUMMARY_FIELDS)),
+        )
+
+    def with_fieldset(self, fieldset, extra=()):
+        """
+        Load only what TaskSerializer renders for a sparse `fieldset`, plus
+        the `extra` columns the caller reads (e.g. for ordering).
+        """
+        columns = fieldset.columns('name', 'description', 'created_at', 'updated_at', 'due_date', 'status')
+        queryset = self.only('id', 'project_id', *columns, *extra)
+        prefetches = []
+        if fieldset.includes('tags'):
+            tags = fieldset.nested('tags').columns('name') if fieldset.expands('tags') else []
+            prefetches.append(Prefetch('tags', queryset=Tag.objects.only('id', *tags)))
+        if fieldset.includes('assigned_to'):
+            users = fieldset.nested('assigned_to')
+            columns = users.columns(*USER_SUMMARY_FIELDS) if fieldset.expands('assigned_to') else []
+            prefetches.append(Prefetch('assigned_to', queryset=CustomUser.objects.only('id', *columns)))
+        return queryset.prefetch_related(*prefetches)
+
+
 class Project(models.Model):
     name = models.CharField(max_length=100)
     description = models.TextField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     owner = models.ForeignKey(CustomUser, related_name='owner_projects', on_delete=models.CASCADE)
-    members = models.ManyToManyField(CustomUser, related_name='member_projects', blank=True)
+    members = models.ManyToManyField(CustomUser, through='ProjectMember', related_name='member_projects', blank=True)
+
+    objects = ProjectQuerySet.as_manager()
 
     class Meta:
         ordering = ('name',)
@@ -17,30 +132,62 @@ class Project(models.Model):
         return self.name
 
 
+class ProjectMember(models.Model):
+    """
+    The Project <-> member relation. Keeps the table and columns of the
+    former auto-created through model, and records when the member joined
+    so that `/sync/` can send the whole project to new members.
+    """
+    project = models.ForeignKey(Project, on_delete=models.CASCADE)
+    customuser = models.ForeignKey(CustomUser, on_delete=models.CASCADE)
+    joined_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'tasks_project_members'
+        constraints = [
+            models.UniqueConstraint(fields=['project', 'customuser'], name='projectmember_project_user_uniq'),
+        ]
+
+    def __str__(self):
+        return f'{self.project_id}:{self.customuser_id}'
+
+
 class Task(models.Model):
-    project = models.ForeignKey(Project, related_name='tasks', on_delete=models.CASCADE)
+    STATUS_CHOICES = [
+        ('todo', 'To Do'),
+        ('in_progress', 'In Progress'),
+        ('completed', 'Completed')
+    ]
+
+    # Indexed through the composite indexes in Meta, which all start with project
+    project = models.ForeignKey(Project, related_name='tasks', on_delete=models.CASCADE, db_index=False)
     name = models.CharField(max_length=100)
     description = models.TextField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     due_date = models.DateTimeField(blank=True, null=True)
     assigned_to = models.ManyToManyField(CustomUser, related_name='assigned_tasks', blank=True)
-    status = models.CharField(max_length=20, choices=[
-        ('todo', 'To Do'),
-        ('in_progress', 'In Progress'),
-        ('completed', 'Completed')
-    ], default='todo')
-    tags = models.ManyToManyField('Tag', related_name='tagged_tasks', blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='todo')
+    tags = models.ManyToManyField('Tag', through='TaskTag', related_name='tagged_tasks', blank=True)
+
+    objects = TaskQuerySet.as_manager()
 
     class Meta:
         ordering = ('due_date', 'name')
+        indexes = [
+            # Task lists and keyset pagination of a project's tasks
+            models.Index(fields=['project', 'due_date', 'name', 'id'], name='task_project_due_name_idx'),
+            # Status filters in list order, and covering for the per-status summary counts
+            models.Index(fields=['project', 'status', 'due_date', 'name'], name='task_project_status_idx'),
+        ]
 
     def __str__(self):
         return self.name
 
 
 class Comment(models.Model):
-    task = models.ForeignKey(Task, related_name='comments', on_delete=models.CASCADE)
+    # Indexed through the composite index in Meta, which starts with task
+    task = models.ForeignKey(Task, related_name='comments', on_delete=models.CASCADE, db_index=False)
     author = models.ForeignKey(CustomUser, related_name='user_comments', on_delete=models.CASCADE)
     content = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
@@ -48,6 +195,10 @@ class Comment(models.Model):
 
     class Meta:
         ordering = ('created_at',)
+        indexes = [
+            # Comment lists and keyset pagination of a task's comments
+            models.Index(fields=['task', 'created_at', 'id'], name='comment_task_created_idx'),
+        ]
 
     def __str__(self):
         return f'Comment by {self.author.username} on {self.task.name}'
@@ -55,10 +206,115 @@ class Comment(models.Model):
 
 class Tag(models.Model):
     name = models.CharField(max_length=30, unique=True)
-    tasks = models.ManyToManyField(Task, related_name='assigned_tags')
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ('name',)
 
     def __str__(self):
         return self.name
+
+
+class TaskTag(models.Model):
+    """
+    The single Task <-> Tag relation. Keeps the table of the former
+    auto-created `Task.tags` through model, so existing rows stay in place;
+    rows of the removed `Tag.tasks` relation are merged in with
+    `manage.py merge_tag_links`.
+    """
+    # Both columns are covered by the composite indexes below
+    task = models.ForeignKey(Task, on_delete=models.CASCADE, db_index=False)
+    tag = models.ForeignKey(Tag, on_delete=models.CASCADE, db_index=False)
+
+    class Meta:
+        db_table = 'tasks_task_tags'
+        constraints = [
+            models.UniqueConstraint(fields=['task', 'tag'], name='tasktag_task_tag_uniq'),
+        ]
+        indexes = [
+            # Tag -> tasks lookups (tag permissions, tag filters)
+            models.Index(fields=['tag', 'task'], name='tasktag_tag_task_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.task_id}:{self.tag_id}'
+
+
+class Tombstone(models.Model):
+    """
+    Deletion log read by the `/sync/` endpoint, see tasks.sync. Ids are
+    plain integers since the rows they point to are gone.
+
+    `object_id` is the deleted row, or the removed user for MEMBER. PROJECT
+    rows are written once per user the project was visible to (`user_id`),
+    since its membership is deleted along with it.
+    """
+    PROJECT, TASK, COMMENT, TAG, MEMBER = 'project', 'task', 'comment', 'tag', 'member'
+    KIND_CHOICES = [
+        (PROJECT, 'Project'),
+        (TASK, 'Task'),
+        (COMMENT, 'Comment'),
+        (TAG, 'Tag'),
+        (MEMBER, 'Project member'),
+    ]
+
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    object_id = models.PositiveBigIntegerField()
+    project_id = models.PositiveBigIntegerField(blank=True, null=True)
+    user_id = models.PositiveBigIntegerField(blank=True, null=True)
+    deleted_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        ordering = ('deleted_at',)
+        indexes = [
+            models.Index(fields=['deleted_at'], name='tombstone_deleted_at_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.kind} {self.object_id}'
+
+
+class StatusCounts(models.Model):
+    """
+    Task counts by status, kept up to date by tasks.stats.
+    """
+    todo_count = models.PositiveIntegerField(default=0)
+    in_progress_count = models.PositiveIntegerField(default=0)
+    completed_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        abstract = True
+
+    @staticmethod
+    def count_field(status):
+        return f'{status}_count'
+
+    def status_counts(self):
+        return {status: getattr(self, self.count_field(status)) for status, _ in Task.STATUS_CHOICES}
+
+
+class ProjectStats(StatusCounts):
+    """
+    Denormalized task counts of a project, so dashboards read one row
+    instead of every task.
+    """
+    project = models.OneToOneField(Project, related_name='stats', on_delete=models.CASCADE, primary_key=True)
+
+    def __str__(self):
+        return f'Stats of project {self.project_id}'
+
+
+class AssigneeStats(StatusCounts):
+    """
+    Denormalized counts of the tasks of a project assigned to one user.
+    """
+    project = models.ForeignKey(Project, related_name='assignee_stats', on_delete=models.CASCADE, db_index=False)
+    user = models.ForeignKey(CustomUser, related_name='assignee_stats', on_delete=models.CASCADE)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['project', 'user'], name='assigneestats_project_user_uniq'),
+        ]
+
+    def __str__(self):
+        return f'Stats of user {self.user_id} in project {self.project_id}'
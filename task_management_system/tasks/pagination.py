@@ -0,0 +1,191 @@
+import base64
+import json
+from collections import OrderedDict
+from django.core.exceptions import ValidationError
+from django.db import connections
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Keyset (seek) pagination over the model's `Meta.ordering` plus the
+    primary key as a tie-breaker.
+
+    The cursor holds the ordering values of the last row of the previous
+    page, so every page is a single indexed range scan and page 1000
+    costs the same as page one. NULLs keep the database's own order (first
+    ascending on SQLite and MySQL, last on PostgreSQL), the one its btree
+    indexes are built in, so the composite indexes on the orderings serve
+    the ORDER BY as well as the seek.
+
+    Pagination is opt-in for backwards compatibility: responses are only
+    paginated when `PAGE_SIZE` is configured or the client sends a
+    `cursor` or `page_size` query parameter.
+    """
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    page_size = api_settings.PAGE_SIZE
+    default_page_size = 50
+    max_page_size = 500
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        queryset = self._page_queryset(queryset, request, view)
+        if queryset is None:
+            return None
+        return self._set_page(list(queryset))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """
+        Async counterpart of `paginate_queryset()`, for tasks.async_views.
+        """
+        queryset = self._page_queryset(queryset, request, view)
+        if queryset is None:
+            return None
+        return self._set_page([row async for row in queryset])
+
+    def _page_queryset(self, queryset, request, view):
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+
+        queryset = queryset.order_by(*self.ordering)
+        cursor = self.decode_cursor(request)
+        if cursor is not None:
+            nulls_largest = connections[queryset.db].features.nulls_order_largest
+            queryset = queryset.filter(self._after(queryset.model, self.ordering, cursor, nulls_largest))
+
+        # Fetch one extra row to find out whether there is a next page
+        return queryset[:self.page_size + 1]
+
+    def _set_page(self, rows):
+        self.has_next = len(rows) > self.page_size
+        self.page = rows[:self.page_size]
+        return self.page
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('results', data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    def get_page_size(self, request):
+        requested = request.query_params.get(self.page_size_query_param)
+        if requested is not None:
+            try:
+                size = int(requested)
+            except ValueError:
+                size = 0
+            if size > 0:
+                return min(size, self.max_page_size)
+        if self.page_size:
+            return self.page_size
+        if requested is not None or self.cursor_query_param in request.query_params:
+            return self.default_page_size
+        return None
+
+    def get_ordering(self, request, queryset, view):
+        """
+        Ordering fields for the page: the view's OrderingFilter when it has
+        one (as DRF's CursorPagination does), else the model's `Meta.ordering`.
+        """
+        ordering = None
+        for backend in getattr(view, 'filter_backends', []):
+            if hasattr(backend, 'get_ordering'):
+                ordering = backend().get_ordering(request, queryset, view)
+                break
+        ordering = list(ordering or queryset.model._meta.ordering)
+        if not {'pk', 'id', '-pk', '-id'} & set(ordering):
+            ordering.append('pk')
+        return ordering
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        last = self.page[-1]
+        values = [self._value(last, name.lstrip('-')) for name in self.ordering]
+        return replace_query_param(self.base_url, self.cursor_query_param, self.encode_cursor(values))
+
+    def encode_cursor(self, values):
+        # Not DjangoJSONEncoder: it truncates datetimes to milliseconds
+        payload = json.dumps(values, default=self._encode_value, separators=(',', ':'))
+        return base64.urlsafe_b64encode(payload.encode()).decode()
+
+    def _encode_value(self, value):
+        if hasattr(value, 'isoformat'):
+            return value.isoformat()
+        return str(value)
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            values = json.loads(base64.urlsafe_b64decode(encoded.encode()).decode())
+        except (TypeError, ValueError, UnicodeDecodeError):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(values, list) or len(values) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        return values
+
+    def _value(self, instance, name):
+        if isinstance(instance, dict):
+            # A `values()` row (see tasks.row_serializers)
+            return instance['id' if name == 'pk' else name]
+        if name == 'pk':
+            return instance.pk
+        field = instance._meta.get_field(name)
+        return getattr(instance, field.attname)
+
+    def _after(self, model, ordering, values, nulls_largest=False):
+        """
+        Build `(a, b, pk) > (va, vb, vpk)` for mixed directions and
+        nullable columns, e.g. `a > va OR (a = va AND (b > vb OR ...))`.
+        `nulls_largest` tells where the database sorts NULLs.
+        """
+        condition = None
+        for name, raw in reversed(list(zip(ordering, values))):
+            descending = name.startswith('-')
+            nulls_first = descending == nulls_largest
+            name = name.lstrip('-')
+            field = model._meta.pk if name == 'pk' else model._meta.get_field(name)
+            try:
+                value = None if raw is None else field.to_python(raw)
+            except ValidationError:
+                raise NotFound(self.invalid_cursor_message)
+
+            if value is None:
+                equal = Q(**{f'{name}__isnull': True})
+                # Every non-NULL row follows NULLs that sort first
+                beyond = Q(**{f'{name}__isnull': False}) if nulls_first else None
+            else:
+                equal = Q(**{name: value})
+                beyond = Q(**{f'{name}__lt' if descending else f'{name}__gt': value})
+                if not nulls_first and field.null:
+                    beyond |= Q(**{f'{name}__isnull': True})
+
+            if condition is None:
+                condition = beyond if beyond is not None else Q(pk__in=[])
+            else:
+                tail = equal & condition
+                condition = tail | beyond if beyond is not None else tail
+        return condition
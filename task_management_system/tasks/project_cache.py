@@ -0,0 +1,167 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import aprefetch_related_objects, prefetch_related_objects
+from .models import task_tree_prefetches
+
+# Bump whenever ProjectSerializer renders differently, so payloads cached by
+# an older release are never served
+PAYLOAD_FORMAT = 1
+
+# Fields that depend on the requesting user and are never cached
+PER_USER_FIELDS = ('is_owner',)
+
+HITS_KEY = 'tasks:project-payload:hits'
+MISSES_KEY = 'tasks:project-payload:misses'
+
+# Attribute holding the payload found by `load_payloads()` on a project
+PAYLOAD_ATTR = '_cached_payload'
+# Set by `aload_payloads()` on misses: get_payload() leaves their cache
+# write to `asave_payloads()`, as it runs on the event loop
+DEFERRED_ATTR = '_deferred_payload'
+
+
+def _payload_key(project):
+    # `updated_at` is the version: tasks.signals bumps it on every change to
+    # the project, its members, tasks, tag links, assignees and users shown
+    return f'tasks:project-payload:{PAYLOAD_FORMAT}:{project.pk}:{project.updated_at.isoformat()}'
+
+
+def load_payloads(projects):
+    """
+    Look up the cached payloads of many projects in one cache round trip,
+    attaching hits to the instances, and prefetch the task tree of the
+    misses in a fixed number of queries.
+    """
+    projects = _not_loaded(projects)
+    if not projects:
+        return
+    keys = {project.pk: _payload_key(project) for project in projects}
+    missing = _attach(projects, keys, cache.get_many(list(keys.values())))
+    _count(hits=len(projects) - len(missing), misses=len(missing))
+    missing = _not_prefetched(missing)
+    if missing:
+        prefetch_related_objects(missing, *task_tree_prefetches())
+
+
+async def aload_payloads(projects):
+    """
+    Async counterpart of `load_payloads()`. Payloads rendered for the
+    misses are cached by `asave_payloads()` once serialized.
+    """
+    projects = _not_loaded(projects)
+    if not projects:
+        return
+    keys = {project.pk: _payload_key(project) for project in projects}
+    missing = _attach(projects, keys, await cache.aget_many(list(keys.values())))
+    await _acount(hits=len(projects) - len(missing), misses=len(missing))
+    for project in missing:
+        setattr(project, DEFERRED_ATTR, True)
+    missing = _not_prefetched(missing)
+    if missing:
+        await aprefetch_related_objects(missing, *task_tree_prefetches())
+
+
+def _not_loaded(projects):
+    return [project for project in projects
+            if project.updated_at is not None and not hasattr(project, PAYLOAD_ATTR)]
+
+
+def _not_prefetched(projects):
+    return [project for project in projects
+            if 'tasks' not in getattr(project, '_prefetched_objects_cache', {})]
+
+
+def _attach(projects, keys, cached):
+    missing = []
+    for project in projects:
+        payload = cached.get(keys[project.pk])
+        # None marks a miss, so get_payload() does not look it up again
+        setattr(project, PAYLOAD_ATTR, payload)
+        if payload is None:
+            missing.append(project)
+    return missing
+
+
+def get_payload(project, render):
+    """
+    Return the member-independent payload of `project`, calling
+    `render(project)` and caching its result on a miss.
+    """
+    payload = getattr(project, PAYLOAD_ATTR, None)
+    if payload is not None:
+        return payload
+    if project.updated_at is None:
+        return _shared_fields(render(project))
+
+    if not hasattr(project, PAYLOAD_ATTR):
+        # Not seen by load_payloads(), look it up on its own
+        payload = cache.get(_payload_key(project))
+        _count(hits=int(payload is not None), misses=int(payload is None))
+        if payload is not None:
+            return payload
+
+    if _not_prefetched([project]):
+        prefetch_related_objects([project], *task_tree_prefetches())
+    payload = _shared_fields(render(project))
+    setattr(project, PAYLOAD_ATTR, payload)
+    if not getattr(project, DEFERRED_ATTR, False):
+        cache.set(_payload_key(project), payload, timeout=_timeout())
+    return payload
+
+
+async def asave_payloads(projects):
+    """
+    Cache the payloads `get_payload()` rendered for the misses of
+    `aload_payloads()`, in one cache round trip.
+    """
+    payloads = {}
+    for project in projects:
+        payload = getattr(project, PAYLOAD_ATTR, None)
+        if getattr(project, DEFERRED_ATTR, False) and payload is not None:
+            payloads[_payload_key(project)] = payload
+            setattr(project, DEFERRED_ATTR, False)
+    if payloads:
+        await cache.aset_many(payloads, timeout=_timeout())
+
+
+def _timeout():
+    return getattr(settings, 'PROJECT_PAYLOAD_CACHE_TIMEOUT', 300)
+
+
+def cache_stats():
+    """
+    Hit and miss counters of the payload cache since they were last reset.
+    """
+    counts = cache.get_many([HITS_KEY, MISSES_KEY])
+    hits, misses = counts.get(HITS_KEY, 0), counts.get(MISSES_KEY, 0)
+    total = hits + misses
+    return {'hits': hits, 'misses': misses, 'hit_ratio': hits / total if total else None}
+
+
+def reset_cache_stats():
+    cache.delete_many([HITS_KEY, MISSES_KEY])
+
+
+def _shared_fields(data):
+    return {name: value for name, value in data.items() if name not in PER_USER_FIELDS}
+
+
+def _count(hits, misses):
+    for key, amount in ((HITS_KEY, hits), (MISSES_KEY, misses)):
+        if amount:
+            cache.add(key, 0, timeout=None)
+            try:
+                cache.incr(key, amount)
+            except ValueError:
+                # Evicted between add() and incr(), the count restarts
+                cache.set(key, amount, timeout=None)
+
+
+async def _acount(hits, misses):
+    for key, amount in ((HITS_KEY, hits), (MISSES_KEY, misses)):
+        if amount:
+            await cache.aadd(key, 0, timeout=None)
+            try:
+                await cache.aincr(key, amount)
+            except ValueError:
+                await cache.aset(key, amount, timeout=None)
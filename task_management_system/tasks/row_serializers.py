@@ -0,0 +1,116 @@
+"""
+Read-only list rendering from `values()` rows, for the list endpoints of
+TaskViewSet and CommentViewSet and their async counterparts.
+
+A ModelSerializer builds a model instance per row and walks its fields
+for every one of them; these serializers read plain dicts instead and
+stitch the many-to-many relations in from one flat query per relation on
+the through tables. The output is the same JSON as TaskSerializer and
+CommentSerializer, which tests/test_row_serializers.py holds them to.
+"""
+from collections import defaultdict
+from rest_framework import serializers
+from .models import USER_SUMMARY_FIELDS, Tag, Task
+
+# Formats datetimes (and None) the way the ModelSerializers do
+_datetime = serializers.DateTimeField().to_representation
+
+
+class RowSerializer:
+    """
+    Render `rows`, dicts from `values(*columns)`, as a list. `values()`
+    turns a queryset into such rows; the ordering and filtering done on
+    the queryset before are kept.
+    """
+    columns = ()
+
+    def __init__(self, rows):
+        self.rows = rows
+
+    @classmethod
+    def values(cls, queryset):
+        return queryset.prefetch_related(None).values(*cls.columns)
+
+    def related_querysets(self, ids):
+        """
+        Querysets of `(row id, ...)` tuples for the relations of the rows
+        with primary keys `ids`, by name.
+        """
+        return {}
+
+    def to_representation(self, row, related):
+        raise NotImplementedError
+
+    @property
+    def data(self):
+        rows = list(self.rows)
+        ids = [row['id'] for row in rows]
+        related = {name: _group(queryset) for name, queryset in self.related_querysets(ids).items()}
+        return [self.to_representation(row, related) for row in rows]
+
+    async def adata(self):
+        rows = self.rows if isinstance(self.rows, list) else [row async for row in self.rows]
+        ids = [row['id'] for row in rows]
+        related = {
+            name: _group([values async for values in queryset])
+            for name, queryset in self.related_querysets(ids).items()
+        }
+        return [self.to_representation(row, related) for row in rows]
+
+
+def _group(values):
+    grouped = defaultdict(list)
+    for row_id, *rest in values:
+        grouped[row_id].append(rest)
+    return grouped
+
+
+class TaskRowSerializer(RowSerializer):
+    """
+    The output of TaskSerializer, with nested tags and assignees.
+    """
+    columns = ('id', 'name', 'description', 'project', 'created_at', 'updated_at', 'due_date', 'status')
+
+    def related_querysets(self, ids):
+        # The queries of the `with_relations()` prefetches, in the same order:
+        # tags by name, assignees in the order of the through table's index
+        tags = Tag.objects.filter(tasktag__task_id__in=ids)
+        assignments = Task.assigned_to.through.objects.filter(task_id__in=ids).order_by('task_id', 'customuser_id')
+        return {
+            'tags': tags.values_list('tasktag__task_id', 'id', 'name'),
+            'assigned_to': assignments.values_list(
+                'task_id', *(f'customuser__{field}' for field in USER_SUMMARY_FIELDS),
+            ),
+        }
+
+    def to_representation(self, row, related):
+        task_id = row['id']
+        return {
+            'id': task_id,
+            'name': row['name'],
+            'description': row['description'],
+            'project': row['project'],
+            'created_at': _datetime(row['created_at']),
+            'updated_at': _datetime(row['updated_at']),
+            'due_date': _datetime(row['due_date']),
+            'assigned_to': [dict(zip(USER_SUMMARY_FIELDS, user)) for user in related['assigned_to'].get(task_id, ())],
+            'status': row['status'],
+            'tags': [{'id': tag_id, 'name': name} for tag_id, name in related['tags'].get(task_id, ())],
+        }
+
+
+class CommentRowSerializer(RowSerializer):
+    """
+    The output of CommentSerializer.
+    """
+    columns = ('id', 'task', 'author__username', 'content', 'created_at', 'updated_at')
+
+    def to_representation(self, row, related):
+        return {
+            'id': row['id'],
+            'task': row['task'],
+            'author': row['author__username'],
+            'content': row['content'],
+            'created_at': _datetime(row['created_at']),
+            'updated_at': _datetime(row['updated_at']),
+        }
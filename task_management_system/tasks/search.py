@@ -0,0 +1,205 @@
+import re
+from django.conf import settings
+from django.db import connection
+from django.db.models import BooleanField, Exists, F, Func, OuterRef, Q, TextField, Value
+from django.db.models.expressions import RawSQL
+from django.utils.module_loading import import_string
+from .models import Task, Comment
+
+
+class BaseSearchBackend:
+    """
+    Full-text search over `Task.name`, `Task.description` and
+    `Comment.content`. Backends that keep their own index are told about
+    changes through the `index_*`/`remove_*` hooks (see tasks.signals).
+    """
+    def setup(self):
+        """Create whatever index structures the backend needs."""
+
+    def index_tasks(self, tasks):
+        pass
+
+    def remove_tasks(self, task_ids):
+        pass
+
+    def index_comments(self, comments):
+        pass
+
+    def remove_comments(self, comment_ids):
+        pass
+
+    def rebuild(self, batch_size=2000):
+        pass
+
+    def search(self, queryset, text):
+        raise NotImplementedError
+
+
+class SimpleSearchBackend(BaseSearchBackend):
+    """
+    Unindexed `icontains` matching, for databases without a full-text engine.
+    """
+    def search(self, queryset, text):
+        comments = Comment.objects.filter(task=OuterRef('pk'), content__icontains=text)
+        return queryset.filter(
+            Q(name__icontains=text) | Q(description__icontains=text) | Exists(comments)
+        )
+
+
+class SQLiteFTSBackend(BaseSearchBackend):
+    """
+    SQLite FTS5 virtual tables keyed by rowid, one for tasks and one for
+    comments, so updates and deletes are rowid lookups.
+    """
+    task_table = 'tasks_task_fts'
+    comment_table = 'tasks_comment_fts'
+
+    def setup(self):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'CREATE VIRTUAL TABLE IF NOT EXISTS {self.task_table} '
+                'USING fts5(name, description)'
+            )
+            cursor.execute(
+                f'CREATE VIRTUAL TABLE IF NOT EXISTS {self.comment_table} '
+                'USING fts5(task_id UNINDEXED, content)'
+            )
+
+    def index_tasks(self, tasks):
+        rows = [(task.pk, task.name, task.description) for task in tasks]
+        self._replace(self.task_table, rows, '(rowid, name, description) VALUES (%s, %s, %s)')
+
+    def remove_tasks(self, task_ids):
+        with connection.cursor() as cursor:
+            self._delete(cursor, self.task_table, task_ids)
+
+    def index_comments(self, comments):
+        rows = [(comment.pk, comment.task_id, comment.content) for comment in comments]
+        self._replace(self.comment_table, rows, '(rowid, task_id, content) VALUES (%s, %s, %s)')
+
+    def remove_comments(self, comment_ids):
+        with connection.cursor() as cursor:
+            self._delete(cursor, self.comment_table, comment_ids)
+
+    def rebuild(self, batch_size=2000):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {self.task_table}')
+            cursor.execute(f'DELETE FROM {self.comment_table}')
+        fields = ('pk', 'name', 'description')
+        for batch in _batches(Task.objects.only(*fields).order_by().iterator(batch_size), batch_size):
+            self.index_tasks(batch)
+        fields = ('pk', 'task_id', 'content')
+        for batch in _batches(Comment.objects.only(*fields).order_by().iterator(batch_size), batch_size):
+            self.index_comments(batch)
+
+    def search(self, queryset, text):
+        match = self.to_match_query(text)
+        if not match:
+            return queryset
+        matching_ids = RawSQL(
+            f'SELECT rowid FROM {self.task_table} WHERE {self.task_table} MATCH %s '
+            f'UNION SELECT task_id FROM {self.comment_table} WHERE {self.comment_table} MATCH %s',
+            (match, match),
+        )
+        return queryset.filter(pk__in=matching_ids)
+
+    def to_match_query(self, text):
+        # Quote each word so user input can never be parsed as FTS5 syntax;
+        # the trailing `*` turns every word into a prefix match
+        return ' '.join(f'"{word}"*' for word in re.findall(r'\w+', text))
+
+    def _replace(self, table, rows, values):
+        if not rows:
+            return
+        with connection.cursor() as cursor:
+            self._delete(cursor, table, [row[0] for row in rows])
+            cursor.executemany(f'INSERT INTO {table} {values}', rows)
+
+    def _delete(self, cursor, table, ids):
+        ids = list(ids)
+        for start in range(0, len(ids), 500):
+            chunk = ids[start:start + 500]
+            placeholders = ', '.join(['%s'] * len(chunk))
+            cursor.execute(f'DELETE FROM {table} WHERE rowid IN ({placeholders})', chunk)
+
+
+class PostgresSearchBackend(BaseSearchBackend):
+    """
+    PostgreSQL `tsvector` search backed by GIN expression indexes, which the
+    database keeps up to date by itself.
+    """
+    config = 'english'
+
+    def setup(self):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'CREATE INDEX IF NOT EXISTS tasks_task_search_idx ON tasks_task USING GIN '
+                f"(to_tsvector('{self.config}', name || ' ' || description))"
+            )
+            cursor.execute(
+                'CREATE INDEX IF NOT EXISTS tasks_comment_search_idx ON tasks_comment USING GIN '
+                f"(to_tsvector('{self.config}', content))"
+            )
+
+    def search(self, queryset, text):
+        # Same expressions as the indexes above so the planner can use them.
+        # Columns go through F() so they follow the aliases of the query
+        # they end up in, such as U0 inside the Exists() subquery.
+        query = _WebSearchQuery(Value(text), config=self.config)
+        task_match = _Matches(_ToTsVector(F('name'), F('description'), config=self.config), query)
+        comment_match = _Matches(_ToTsVector(F('content'), config=self.config), query)
+        comments = Comment.objects.filter(comment_match, task=OuterRef('pk'))
+        return queryset.filter(Q(task_match) | Q(Exists(comments)))
+
+
+class _ToTsVector(Func):
+    # `a || ' ' || b`, as written in the index expressions
+    function = 'to_tsvector'
+    template = "%(function)s('%(config)s', %(expressions)s)"
+    arg_joiner = " || ' ' || "
+    output_field = TextField()
+
+
+class _WebSearchQuery(Func):
+    function = 'websearch_to_tsquery'
+    template = "%(function)s('%(config)s', %(expressions)s)"
+    output_field = TextField()
+
+
+class _Matches(Func):
+    template = '%(expressions)s'
+    arg_joiner = ' @@ '
+    output_field = BooleanField()
+
+
+def _batches(iterable, size):
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+_backend = None
+
+
+def get_search_backend():
+    """
+    The configured `TASKS_SEARCH_BACKEND`, or the best backend for the
+    default database when the setting is not defined.
+    """
+    global _backend
+    if _backend is None:
+        path = getattr(settings, 'TASKS_SEARCH_BACKEND', None)
+        if path:
+            _backend = import_string(path)()
+        elif connection.vendor == 'sqlite':
+            _backend = SQLiteFTSBackend()
+        elif connection.vendor == 'postgresql':
+            _backend = PostgresSearchBackend()
+        else:
+            _backend = SimpleSearchBackend()
+    return _backend
@@ -0,0 +1,128 @@
+"""
+Synthetic datasets for benchmarks, see `manage.py seed_bench`.
+
+Sizes follow heavy-tailed distributions, as real ones do: a few projects
+hold most of the tasks and members, a few tags are on most tagged tasks,
+and most tasks have few comments while some have many. Rows are written
+with `bulk_create()` a batch of tasks at a time, so millions of tasks take
+minutes and little memory; what the signals would have maintained (task
+statistics, the search index) is rebuilt at the end.
+"""
+import random
+from datetime import timedelta
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.utils import timezone
+from users.models import CustomUser
+from .models import Project, ProjectMember, Task, Comment, Tag, TaskTag
+from .search import get_search_backend
+from .stats import rebuild_project_stats
+
+WORDS = (
+    'api backend frontend database cache deploy release review design test bug fix feature refactor '
+    'docs login search export import billing invoice report dashboard mobile email queue worker index '
+    'migration security performance onboarding settings profile upload sync notification audit'
+).split()
+STATUS_WEIGHTS = {'todo': 5, 'in_progress': 2, 'completed': 3}
+MAX_MEMBERS = 500
+
+
+def _text(rng, low, high):
+    return ' '.join(rng.choices(WORDS, k=rng.randint(low, high)))
+
+
+def _skewed(rng, count, alpha):
+    # Pareto weights: the first few items get most of the picks
+    return [rng.paretovariate(alpha) for _ in range(count)]
+
+
+def seed(users=1000, projects=200, tasks=100000, tags=200, comments_per_task=1.0, prefix='bench', seed=0,
+         batch_size=5000, search_index=True, progress=None):
+    """
+    Create the dataset and return the number of rows created per table.
+    `progress(tasks_created)` is called after each batch of tasks.
+    """
+    rng = random.Random(seed)
+    now = timezone.now()
+    password = make_password(prefix)
+    counts = dict.fromkeys(['users', 'projects', 'members', 'tasks', 'tags', 'task_tags', 'assignments',
+                            'comments'], 0)
+
+    user_ids = [user.pk for user in CustomUser.objects.bulk_create([
+        CustomUser(username=f'{prefix}{index}', email=f'{prefix}{index}@example.com', password=password)
+        for index in range(users)
+    ], batch_size=1000)]
+    tag_ids = [tag.pk for tag in Tag.objects.bulk_create([
+        Tag(name=f'{prefix}-{word}-{index}'[:30]) for index, word in enumerate(rng.choices(WORDS, k=tags))
+    ], batch_size=1000)]
+    counts.update(users=len(user_ids), tags=len(tag_ids))
+
+    owners = rng.choices(user_ids, weights=_skewed(rng, len(user_ids), 1.5), k=projects)
+    project_list = Project.objects.bulk_create([
+        Project(name=f'{_text(rng, 1, 3).title()} {index}', description=_text(rng, 5, 30), owner_id=owner)
+        for index, owner in enumerate(owners)
+    ], batch_size=1000)
+    people = {}
+    members = []
+    for project in project_list:
+        size = min(len(user_ids) - 1, MAX_MEMBERS, int(2 * rng.paretovariate(1.2)) - 1)
+        chosen = set()
+        while len(chosen) < size:
+            chosen.add(rng.choice(user_ids))
+            chosen.discard(project.owner_id)
+        members += [ProjectMember(project_id=project.pk, customuser_id=pk) for pk in chosen]
+        people[project.pk] = [project.owner_id, *chosen]
+    ProjectMember.objects.bulk_create(members, batch_size=5000)
+    counts.update(projects=len(project_list), members=len(members))
+
+    project_ids = list(people)
+    project_weights = _skewed(rng, len(project_ids), 1.1)
+    tag_weights = _skewed(rng, len(tag_ids), 1.3)
+    statuses, status_weights = zip(*STATUS_WEIGHTS.items())
+    assignments = Task.assigned_to.through
+
+    created = 0
+    while created < tasks:
+        size = min(batch_size, tasks - created)
+        with transaction.atomic():
+            batch = Task.objects.bulk_create([
+                Task(
+                    project_id=project_id,
+                    name=f'{_text(rng, 2, 6).capitalize()} #{created + index}'[:100],
+                    description=_text(rng, 0, 40),
+                    status=status,
+                    due_date=now + timedelta(hours=rng.randint(-24 * 60, 24 * 90)) if rng.random() < 0.8 else None,
+                )
+                for index, (project_id, status) in enumerate(zip(
+                    rng.choices(project_ids, weights=project_weights, k=size),
+                    rng.choices(statuses, weights=status_weights, k=size),
+                ))
+            ])
+            task_tags, assigned, comments = [], [], []
+            for task in batch:
+                if tag_ids:
+                    for tag_id in set(rng.choices(tag_ids, weights=tag_weights, k=rng.choice((0, 0, 1, 1, 2, 3)))):
+                        task_tags.append(TaskTag(task_id=task.pk, tag_id=tag_id))
+                team = people[task.project_id]
+                for user_id in set(rng.choices(team, k=rng.choice((0, 1, 1, 2)))):
+                    assigned.append(assignments(task_id=task.pk, customuser_id=user_id))
+                for _ in range(int(rng.expovariate(1 / comments_per_task)) if comments_per_task else 0):
+                    comments.append(Comment(task_id=task.pk, author_id=rng.choice(team), content=_text(rng, 3, 50)))
+            TaskTag.objects.bulk_create(task_tags, batch_size=5000)
+            assignments.objects.bulk_create(assigned, batch_size=5000)
+            Comment.objects.bulk_create(comments, batch_size=5000)
+        created += size
+        counts['tasks'] += size
+        counts['task_tags'] += len(task_tags)
+        counts['assignments'] += len(assigned)
+        counts['comments'] += len(comments)
+        if progress:
+            progress(created)
+
+    for start in range(0, len(project_ids), 500):
+        rebuild_project_stats(project_ids[start:start + 500])
+    if search_index:
+        backend = get_search_backend()
+        backend.setup()
+        backend.rebuild()
+    return counts
@@ -1,49 +1,276 @@
+from collections import Counter
 from .models import CustomUser
+from django.db import transaction
+from django.utils import timezone
 from rest_framework import serializers
-from tasks.models import Project, Task, Comment, Tag
+from tasks.models import Project, ProjectMember, Task, Comment, Tag, TaskTag
+from tasks import project_cache
+from tasks.events import publish_project_event
+from tasks.search import get_search_backend
+from tasks.stats import rebuild_project_stats
+from tasks.timestamps import deferred_touches, touch_projects
+from task_management_system.fieldsets import SparseFieldsMixin
 from users.serializers import UserSerializer
 
 
-class TagSerializer(serializers.ModelSerializer):
+class PrimaryKeyListField(serializers.ListField):
+    """
+    A list of primary keys validated with a single `IN` query, unlike
+    `PrimaryKeyRelatedField(many=True)` which fetches each id on its own.
+    Validates to a de-duplicated list of ids.
+    """
+    default_error_messages = {
+        'does_not_exist': 'Invalid pk "{pk_value}" - object does not exist.',
+    }
+
+    def __init__(self, queryset, **kwargs):
+        self.queryset = queryset
+        kwargs.setdefault('child', serializers.IntegerField())
+        super().__init__(**kwargs)
+
+    def to_internal_value(self, data):
+        ids = list(dict.fromkeys(super().to_internal_value(data)))
+        found = set(self.queryset.filter(pk__in=ids).values_list('pk', flat=True))
+        missing = [pk for pk in ids if pk not in found]
+        if missing:
+            raise serializers.ValidationError(
+                [self.error_messages['does_not_exist'].format(pk_value=pk) for pk in missing]
+            )
+        return ids
+
+
+def sync_related(manager, ids):
+    """
+    Make a many-to-many manager hold exactly `ids`, touching only the rows
+    that changed. Goes through add()/remove() so m2m_changed still fires.
+    """
+    prefetched = getattr(manager.instance, '_prefetched_objects_cache', {})
+    if manager.prefetch_cache_name in prefetched:
+        current = {obj.pk for obj in prefetched[manager.prefetch_cache_name]}
+    else:
+        current = set(manager.values_list('pk', flat=True))
+    wanted = set(ids or [])
+    if current - wanted:
+        manager.remove(*(current - wanted))
+    if wanted - current:
+        manager.add(*(wanted - current))
+
+
+class TagSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Tag
         fields = ['id', 'name']
 
 
-class TaskSerializer(serializers.ModelSerializer):
+class TaskSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     tags = TagSerializer(many=True, read_only=True)
-    tag_ids = serializers.PrimaryKeyRelatedField(queryset=Tag.objects.all(), many=True, required=False, allow_null=True, write_only=True)
+    tag_ids = PrimaryKeyListField(queryset=Tag.objects.all(), required=False, allow_null=True, write_only=True)
     assigned_to = UserSerializer(many=True, read_only=True)  # Use UserSerializer for displaying members
-    assigned_to_ids = serializers.PrimaryKeyRelatedField(queryset=CustomUser.objects.all(), many=True, required=False, allow_null=True, write_only=True)
+    assigned_to_ids = PrimaryKeyListField(queryset=CustomUser.objects.all(), required=False, allow_null=True, write_only=True)
 
     class Meta:
         model = Task
         fields = ['id', 'name', 'description', 'project', 'created_at',
                   'updated_at', 'due_date', 'assigned_to', 'assigned_to_ids',
                   'status', 'tags', 'tag_ids']
+        expandable_fields = ['assigned_to', 'tags']
 
     def create(self, validated_data):
-        tag_ids = validated_data.pop('tag_ids', [])
-        assigned_to_ids = validated_data.pop('assigned_to_ids', [])
+        tag_ids = validated_data.pop('tag_ids', None) or []
+        assigned_to_ids = validated_data.pop('assigned_to_ids', None) or []
         task = Task.objects.create(**validated_data)
-        task.tags.set(tag_ids)
-        task.assigned_to.set(assigned_to_ids)
+        # A new task has no relations yet, so there is nothing to diff
+        if tag_ids:
+            task.tags.add(*tag_ids)
+        if assigned_to_ids:
+            task.assigned_to.add(*assigned_to_ids)
         return task
 
     def update(self, instance, validated_data):
-        tag_ids = validated_data.pop('tag_ids', [])
-        assigned_to_ids = validated_data.pop('assigned_to_ids', [])
+        # Relations are only rewritten when the request sends them
+        if 'tag_ids' in validated_data:
+            sync_related(instance.tags, validated_data.pop('tag_ids'))
+        if 'assigned_to_ids' in validated_data:
+            sync_related(instance.assigned_to, validated_data.pop('assigned_to_ids'))
         instance.name = validated_data.get('name', instance.name)
         instance.description = validated_data.get('description', instance.description)
         instance.due_date = validated_data.get('due_date', instance.due_date)
         instance.status = validated_data.get('status', instance.status)
         instance.save()
-        instance.tags.set(tag_ids)
-        instance.assigned_to.set(assigned_to_ids)
         return instance
 
 
-class CommentSerializer(serializers.ModelSerializer):
+class TaskChangeSerializer(serializers.ModelSerializer):
+    """
+    The scalar fields of a task, as pushed by the change feed (see
+    tasks.events); relations are sent as separate id diffs.
+    """
+    class Meta:
+        model = Task
+        fields = ['id', 'name', 'description', 'project', 'created_at',
+                  'updated_at', 'due_date', 'status']
+
+
+class TaskBulkItemSerializer(serializers.ModelSerializer):
+    """
+    One task of a bulk request. Related ids are plain integers here and
+    are checked for all items at once in `TaskBulkSerializer.validate`.
+    """
+    tag_ids = serializers.ListField(child=serializers.IntegerField(), required=False)
+    assigned_to_ids = serializers.ListField(child=serializers.IntegerField(), required=False)
+
+    class Meta:
+        model = Task
+        fields = ['name', 'description', 'due_date', 'status', 'tag_ids', 'assigned_to_ids']
+
+
+class TaskBulkUpdateItemSerializer(TaskBulkItemSerializer):
+    id = serializers.IntegerField()
+
+    class Meta(TaskBulkItemSerializer.Meta):
+        fields = ['id'] + TaskBulkItemSerializer.Meta.fields
+        extra_kwargs = {'name': {'required': False}}
+
+
+class TaskBulkSerializer(serializers.Serializer):
+    """
+    Create, update and delete many tasks of one project in a single
+    transaction, using bulk inserts/updates for tasks and their M2M rows.
+    Expects the project in `context['project']`.
+    """
+    MAX_ITEMS = 5000
+
+    def get_fields(self):
+        # Declared here because the field names clash with create()/update()
+        return {
+            'create': TaskBulkItemSerializer(many=True, required=False, max_length=self.MAX_ITEMS),
+            'update': TaskBulkUpdateItemSerializer(many=True, required=False, max_length=self.MAX_ITEMS),
+            'delete': serializers.ListField(
+                child=serializers.IntegerField(), required=False, max_length=self.MAX_ITEMS
+            ),
+        }
+
+    def validate(self, attrs):
+        project = self.context['project']
+        items = attrs.get('create', []) + attrs.get('update', [])
+        known_tags = set(Tag.objects.filter(
+            pk__in={pk for item in items for pk in item.get('tag_ids', [])}
+        ).values_list('pk', flat=True))
+        known_users = set(CustomUser.objects.filter(
+            pk__in={pk for item in items for pk in item.get('assigned_to_ids', [])}
+        ).values_list('pk', flat=True))
+        known_tasks = set(Task.objects.filter(
+            project=project,
+            pk__in={item['id'] for item in attrs.get('update', [])} | set(attrs.get('delete', [])),
+        ).values_list('pk', flat=True))
+
+        errors = {}
+        for key in ('create', 'update'):
+            item_errors = [self._item_errors(item, known_tags, known_users, known_tasks)
+                           for item in attrs.get(key, [])]
+            if any(item_errors):
+                errors[key] = item_errors
+        missing = [pk for pk in attrs.get('delete', []) if pk not in known_tasks]
+        if missing:
+            errors['delete'] = [f'Invalid pk "{pk}" - object does not exist.' for pk in missing]
+        update_ids = Counter(item['id'] for item in attrs.get('update', []))
+        duplicated = [pk for pk, count in update_ids.items() if count > 1]
+        if duplicated:
+            errors.setdefault('non_field_errors', []).extend(
+                f'Task {pk} is updated more than once.' for pk in sorted(duplicated)
+            )
+        conflicting = set(update_ids) & set(attrs.get('delete', []))
+        if conflicting:
+            errors.setdefault('non_field_errors', []).extend(
+                f'Task {pk} cannot be both updated and deleted.' for pk in sorted(conflicting)
+            )
+        if errors:
+            raise serializers.ValidationError(errors)
+        return attrs
+
+    def _item_errors(self, item, known_tags, known_users, known_tasks):
+        errors = {}
+        if 'id' in item and item['id'] not in known_tasks:
+            errors['id'] = [f'Invalid pk "{item["id"]}" - object does not exist.']
+        for field, known in (('tag_ids', known_tags), ('assigned_to_ids', known_users)):
+            missing = [pk for pk in item.get(field, []) if pk not in known]
+            if missing:
+                errors[field] = [f'Invalid pk "{pk}" - object does not exist.' for pk in missing]
+        return errors
+
+    @transaction.atomic
+    def create(self, validated_data):
+        with deferred_touches():
+            return self._save(self.context['project'], validated_data)
+
+    def _save(self, project, validated_data):
+        creates = validated_data.get('create', [])
+        updates = validated_data.get('update', [])
+        delete_ids = validated_data.get('delete', [])
+
+        relations = []  # (task, item) pairs whose M2M rows must be (re)written
+
+        created = Task.objects.bulk_create([
+            Task(project=project, **self._task_fields(item)) for item in creates
+        ])
+        relations.extend(zip(created, creates))
+
+        tasks_by_id = Task.objects.in_bulk([item['id'] for item in updates])
+        changed_fields = {'updated_at'}
+        now = timezone.now()
+        for item in updates:
+            task = tasks_by_id[item['id']]
+            for field, value in self._task_fields(item).items():
+                setattr(task, field, value)
+                changed_fields.add(field)
+            task.updated_at = now  # bulk_update() does not apply auto_now
+            relations.append((task, item))
+        Task.objects.bulk_update(tasks_by_id.values(), sorted(changed_fields), batch_size=500)
+
+        self._write_relations(TaskTag, 'tag_id', 'tag_ids', relations)
+        self._write_relations(Task.assigned_to.through, 'customuser_id', 'assigned_to_ids', relations)
+
+        # bulk_create()/bulk_update() send no signals, so index explicitly
+        get_search_backend().index_tasks([task for task, _ in relations])
+
+        Task.objects.filter(project=project, pk__in=delete_ids).delete()
+        touch_projects([project.pk])
+        # Nor are statuses and assignments counted; recount the project
+        rebuild_project_stats([project.pk])
+        publish_project_event([project.pk], {
+            'type': 'tasks.bulk',
+            'created': [task.pk for task in created],
+            'updated': [item['id'] for item in updates],
+            'deleted': list(delete_ids),
+        })
+
+        saved_ids = [task.pk for task, _ in relations]
+        saved = Task.objects.filter(pk__in=saved_ids).prefetch_related('tags', 'assigned_to').in_bulk()
+        return {
+            'created': [saved[task.pk] for task in created],
+            'updated': [saved[item['id']] for item in updates],
+            'deleted': list(delete_ids),
+        }
+
+    def _task_fields(self, item):
+        return {field: value for field, value in item.items()
+                if field not in ('id', 'tag_ids', 'assigned_to_ids')}
+
+    def _write_relations(self, through, column, field, relations):
+        # Replace the rows of tasks that sent this field; others are left as is
+        task_ids = [task.pk for task, item in relations if field in item]
+        if not task_ids:
+            return
+        through.objects.filter(task_id__in=task_ids).delete()
+        pairs = dict.fromkeys(
+            (task.pk, pk) for task, item in relations if field in item for pk in item[field]
+        )
+        through.objects.bulk_create([
+            through(task_id=task_id, **{column: pk}) for task_id, pk in pairs
+        ], batch_size=1000)
+
+
+class CommentSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     task = serializers.PrimaryKeyRelatedField(queryset=Task.objects.all())
     author = serializers.ReadOnlyField(source='author.username')
 
@@ -52,32 +279,126 @@ class CommentSerializer(serializers.ModelSerializer):
         fields = ['id', 'task', 'author', 'content', 'created_at', 'updated_at']
 
 
-class ProjectSerializer(serializers.ModelSerializer):
+class ProjectListSerializer(serializers.ListSerializer):
+    """
+    Fetch the cached payloads of all projects at once before rendering them.
+    """
+    def to_representation(self, data):
+        projects = list(data.all() if hasattr(data, 'all') else data)
+        if self.child.get_fieldset() is None:
+            project_cache.load_payloads(projects)
+        return super().to_representation(projects)
+
+
+class ProjectSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     tasks = TaskSerializer(many=True, read_only=True)
     owner = serializers.ReadOnlyField(source='owner.username')
     members = UserSerializer(many=True, read_only=True)  # Use UserSerializer for displaying members
-    member_ids = serializers.PrimaryKeyRelatedField(queryset=CustomUser.objects.all(), many=True, write_only=True)  # For creating/ updating members
+    member_ids = PrimaryKeyListField(queryset=CustomUser.objects.all(), write_only=True)  # For creating/ updating members
     is_owner = serializers.SerializerMethodField()
 
     class Meta:
         model = Project
         fields = ['id', 'name', 'description', 'owner', 'created_at',
                   'updated_at', 'members', 'member_ids', 'tasks', 'is_owner']
+        list_serializer_class = ProjectListSerializer
+        expandable_fields = ['members', 'tasks']
+
+    def to_representation(self, instance):
+        if self.get_fieldset() is not None:
+            # Sparse fieldsets are rendered as requested, not cached
+            return super().to_representation(instance)
+        # The payload is shared by every member, only `is_owner` is per user
+        payload = project_cache.get_payload(instance, super().to_representation)
+        return {**payload, 'is_owner': self.get_is_owner(instance)}
 
     def get_is_owner(self, obj):
         request = self.context.get('request')
-        return obj.owner == request.user
+        return obj.owner_id == request.user.pk
 
     def create(self, validated_data):
         member_ids = validated_data.pop('member_ids', [])  # Default to empty list if 'members' not provided
         project = Project.objects.create(**validated_data)
-        project.members.set(member_ids)
+        if member_ids:
+            project.members.add(*member_ids)
         return project
 
     def update(self, instance, validated_data):
-        member_ids = validated_data.pop('member_ids', [])  # Default to empty list if 'members' not provided
+        # Partial updates without 'member_ids' leave the members untouched
+        if 'member_ids' in validated_data:
+            sync_related(instance.members, validated_data.pop('member_ids'))
         instance.name = validated_data.get('name', instance.name)
         instance.description = validated_data.get('description', instance.description)
         instance.save()
-        instance.members.set(member_ids)
         return instance
+
+
+class ProjectSummarySerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    """
+    Read-only project representation for list pages. Reads the aggregates
+    annotated by `ProjectQuerySet.with_summary()` instead of nesting tasks.
+    """
+    owner = serializers.ReadOnlyField(source='owner.username')
+    is_owner = serializers.SerializerMethodField()
+    member_count = serializers.IntegerField(read_only=True)
+    task_count = serializers.IntegerField(read_only=True)
+    task_status_counts = serializers.SerializerMethodField()
+    next_due_date = serializers.DateTimeField(read_only=True)
+
+    class Meta:
+        model = Project
+        fields = ['id', 'name', 'description', 'owner', 'created_at',
+                  'updated_at', 'is_owner', 'member_count', 'task_count',
+                  'task_status_counts', 'next_due_date']
+        read_only_fields = fields
+
+    def get_is_owner(self, obj):
+        request = self.context.get('request')
+        return obj.owner_id == request.user.pk
+
+    def get_task_status_counts(self, obj):
+        return {status: getattr(obj, f'{status}_count') for status, _ in Task.STATUS_CHOICES}
+
+
+class ProjectSyncSerializer(serializers.ModelSerializer):
+    """
+    A project without its tasks and members, which `/sync/` sends as
+    separate rows (see tasks.sync).
+    """
+    owner = serializers.ReadOnlyField(source='owner.username')
+    is_owner = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Project
+        fields = ['id', 'name', 'description', 'owner', 'created_at', 'updated_at', 'is_owner']
+        read_only_fields = fields
+
+    def get_is_owner(self, obj):
+        request = self.context.get('request')
+        return obj.owner_id == request.user.pk
+
+
+class ProjectMemberSerializer(serializers.ModelSerializer):
+    user = UserSerializer(source='customuser', read_only=True)
+
+    class Meta:
+        model = ProjectMember
+        fields = ['project', 'user', 'joined_at']
+        read_only_fields = fields
+
+
+class AssigneeStatsSerializer(serializers.Serializer):
+    user = UserSerializer(read_only=True)
+    status_counts = serializers.DictField(child=serializers.IntegerField(), read_only=True)
+    open_count = serializers.IntegerField(read_only=True)
+
+
+class ProjectStatsSerializer(serializers.Serializer):
+    """
+    Renders `tasks.stats.get_project_stats()`.
+    """
+    project = serializers.IntegerField(read_only=True)
+    task_count = serializers.IntegerField(read_only=True)
+    status_counts = serializers.DictField(child=serializers.IntegerField(), read_only=True)
+    overdue_count = serializers.IntegerField(read_only=True)
+    assignees = AssigneeStatsSerializer(many=True, read_only=True)
@@ -0,0 +1,394 @@
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_migrate,
+    post_save,
+    pre_delete,
+    pre_save,
+)
+from django.dispatch import receiver
+from users.models import CustomUser
+from .events import publish_project_event
+from .membership import invalidate_membership
+from .models import USER_SUMMARY_FIELDS, Project, ProjectMember, Task, Comment, Tag, Tombstone
+from .search import get_search_backend
+from .serializers import CommentSerializer, TaskChangeSerializer
+from .stats import update_assignment_stats, update_stats
+from .timestamps import touch_projects, touch_tasks
+
+
+@receiver(pre_save, sender=Project)
+def remember_previous_owner(sender, instance, **kwargs):
+    # Ownership transfers must invalidate the previous owner as well
+    if instance.pk is None:
+        instance._previous_owner_id = None
+    else:
+        instance._previous_owner_id = (
+            Project.objects.filter(pk=instance.pk).values_list('owner_id', flat=True).first()
+        )
+
+
+@receiver(post_save, sender=Project)
+def invalidate_project_owner(sender, instance, **kwargs):
+    invalidate_membership(instance.owner_id, getattr(instance, '_previous_owner_id', None))
+
+
+@receiver(pre_delete, sender=Project)
+def invalidate_deleted_project(sender, instance, **kwargs):
+    member_ids = instance.members.values_list('pk', flat=True)
+    invalidate_membership(instance.owner_id, *member_ids)
+
+
+@receiver(m2m_changed, sender=Project.members.through)
+def invalidate_project_members(sender, instance, action, reverse, pk_set, **kwargs):
+    if reverse:
+        # `user.member_projects.add(...)`: only that user's projects changed
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            invalidate_membership(instance.pk)
+        return
+
+    if action == 'pre_clear':
+        instance._cleared_member_ids = list(instance.members.values_list('pk', flat=True))
+    elif action == 'post_clear':
+        invalidate_membership(*getattr(instance, '_cleared_member_ids', []))
+    elif action in ('post_add', 'post_remove'):
+        invalidate_membership(*pk_set)
+
+
+@receiver(post_migrate)
+def setup_search_index(sender, **kwargs):
+    if sender.name == 'tasks':
+        get_search_backend().setup()
+
+
+@receiver(post_save, sender=Task)
+def index_task(sender, instance, **kwargs):
+    get_search_backend().index_tasks([instance])
+
+
+@receiver(post_delete, sender=Task)
+def unindex_task(sender, instance, **kwargs):
+    get_search_backend().remove_tasks([instance.pk])
+
+
+@receiver(post_save, sender=Comment)
+def index_comment(sender, instance, **kwargs):
+    get_search_backend().index_comments([instance])
+
+
+@receiver(post_delete, sender=Comment)
+def unindex_comment(sender, instance, **kwargs):
+    get_search_backend().remove_comments([instance.pk])
+
+
+@receiver(pre_delete, sender=Project)
+@receiver(pre_delete, sender=Task)
+def remember_deleted_parent(sender, instance, origin=None, **kwargs):
+    # Every pre_delete of a cascade is sent before the first post_delete
+    if origin is not None:
+        if not hasattr(origin, '_deleted_parents'):
+            origin._deleted_parents = set()
+        origin._deleted_parents.add((sender, instance.pk))
+
+
+def _is_cascade(instance, origin):
+    # Rows deleted in cascade from their own task or project: whoever
+    # deleted the parent already touched what needs touching. Other
+    # cascades, such as the comments of a deleted user, are not covered.
+    parents = getattr(origin, '_deleted_parents', ())
+    if isinstance(instance, Comment):
+        return (Task, instance.task_id) in parents
+    return (Project, instance.project_id) in parents
+
+
+def _project_of_comment(comment):
+    if Comment.task.is_cached(comment):
+        return [comment.task.project_id]
+    return Task.objects.filter(pk=comment.task_id).values_list('project_id', flat=True)
+
+
+@receiver(post_save, sender=Task)
+def touch_project_of_saved_task(sender, instance, **kwargs):
+    touch_projects([instance.project_id])
+
+
+@receiver(post_delete, sender=Task)
+def touch_project_of_deleted_task(sender, instance, origin=None, **kwargs):
+    if not _is_cascade(instance, origin):
+        touch_projects([instance.project_id])
+
+
+@receiver(post_save, sender=Comment)
+def touch_project_of_saved_comment(sender, instance, **kwargs):
+    touch_projects(_project_of_comment(instance))
+
+
+@receiver(post_delete, sender=Comment)
+def touch_project_of_deleted_comment(sender, instance, origin=None, **kwargs):
+    if not _is_cascade(instance, origin):
+        touch_projects(_project_of_comment(instance))
+
+
+@receiver(m2m_changed, sender=Task.tags.through)
+@receiver(m2m_changed, sender=Task.assigned_to.through)
+def touch_retagged_tasks(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        touch_tasks([instance.pk])
+    elif pk_set:
+        touch_tasks(pk_set)
+
+
+@receiver(m2m_changed, sender=Project.members.through)
+def touch_project_with_new_members(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        touch_projects([instance.pk])
+    elif pk_set:
+        touch_projects(pk_set)
+
+
+@receiver(post_save, sender=Tag)
+def touch_tasks_of_renamed_tag(sender, instance, created, **kwargs):
+    if not created:
+        touch_tasks(instance.tagged_tasks.values_list('pk', flat=True))
+
+
+@receiver(pre_delete, sender=Tag)
+def touch_tasks_of_deleted_tag(sender, instance, **kwargs):
+    touch_tasks(instance.tagged_tasks.values_list('pk', flat=True))
+
+
+@receiver(post_save, sender=CustomUser)
+def touch_projects_showing_user(sender, instance, created, update_fields=None, **kwargs):
+    # Users are rendered inside project payloads as owner, member and
+    # assignee, and inside tasks and comments as assignee and author, whose
+    # validators include their project's updated_at
+    if created or (update_fields is not None and not set(update_fields) & set(USER_SUMMARY_FIELDS)):
+        return
+    # One small indexed lookup per relation, deduplicated by the UNION,
+    # rather than a join across every task and comment of the projects
+    project_ids = Project.objects.filter(owner=instance).values_list('pk').order_by().union(
+        ProjectMember.objects.filter(customuser=instance).values_list('project_id').order_by(),
+        Task.assigned_to.through.objects.filter(customuser=instance).values_list('task__project_id').order_by(),
+        Comment.objects.filter(author=instance).values_list('task__project_id').order_by(),
+    )
+    touch_projects({project_id for project_id, in project_ids})
+
+
+# Deletion log for /sync/, see tasks.sync
+
+@receiver(pre_delete, sender=Project)
+def log_deleted_project(sender, instance, **kwargs):
+    user_ids = {instance.owner_id, *instance.members.values_list('pk', flat=True)}
+    Tombstone.objects.bulk_create([
+        Tombstone(kind=Tombstone.PROJECT, object_id=instance.pk, project_id=instance.pk, user_id=user_id)
+        for user_id in user_ids
+    ])
+
+
+@receiver(post_delete, sender=ProjectMember)
+def log_removed_member(sender, instance, origin=None, **kwargs):
+    # Covered by the PROJECT tombstones when the whole project goes
+    if not _is_cascade(instance, origin):
+        Tombstone.objects.create(kind=Tombstone.MEMBER, object_id=instance.customuser_id,
+                                 project_id=instance.project_id)
+
+
+@receiver(post_delete, sender=Task)
+def log_deleted_task(sender, instance, origin=None, **kwargs):
+    if not _is_cascade(instance, origin):
+        Tombstone.objects.create(kind=Tombstone.TASK, object_id=instance.pk, project_id=instance.project_id)
+
+
+@receiver(post_delete, sender=Comment)
+def log_deleted_comment(sender, instance, origin=None, **kwargs):
+    if not _is_cascade(instance, origin):
+        Tombstone.objects.create(kind=Tombstone.COMMENT, object_id=instance.pk,
+                                 project_id=next(iter(_project_of_comment(instance)), None))
+
+
+@receiver(post_delete, sender=Tag)
+def log_deleted_tag(sender, instance, **kwargs):
+    Tombstone.objects.create(kind=Tombstone.TAG, object_id=instance.pk)
+
+
+# Task statistics, see tasks.stats
+
+@receiver(pre_save, sender=Task)
+def remember_counted_state(sender, instance, **kwargs):
+    if instance.pk is None:
+        instance._counted_as = None
+    else:
+        instance._counted_as = Task.objects.filter(pk=instance.pk).values_list('project_id', 'status').first()
+
+
+@receiver(post_save, sender=Task)
+def count_saved_task(sender, instance, created, **kwargs):
+    before = getattr(instance, '_counted_as', None)
+    after = (instance.project_id, instance.status)
+    if before == after:
+        return
+    if before is None:
+        # A new task has no assignees yet, see count_assignments
+        update_stats(instance.project_id, {instance.status: 1})
+        return
+    user_ids = list(instance.assigned_to.values_list('pk', flat=True))
+    for project_id, deltas in _moved(before, after).items():
+        update_stats(project_id, deltas)
+        if user_ids:
+            update_stats(project_id, deltas, user_ids=user_ids)
+
+
+def _moved(before, after):
+    deltas = {}
+    for (project_id, status), delta in ((before, -1), (after, 1)):
+        project_deltas = deltas.setdefault(project_id, {})
+        project_deltas[status] = project_deltas.get(status, 0) + delta
+    return deltas
+
+
+@receiver(pre_delete, sender=Task)
+def remember_assignees(sender, instance, origin=None, **kwargs):
+    # The assignments are deleted before the task
+    if not _is_cascade(instance, origin):
+        instance._counted_assignees = list(instance.assigned_to.values_list('pk', flat=True))
+
+
+@receiver(post_delete, sender=Task)
+def count_deleted_task(sender, instance, origin=None, **kwargs):
+    # Statistics of a deleted project go with it
+    if _is_cascade(instance, origin):
+        return
+    update_stats(instance.project_id, {instance.status: -1})
+    user_ids = getattr(instance, '_counted_assignees', None)
+    if user_ids:
+        update_stats(instance.project_id, {instance.status: -1}, user_ids=user_ids)
+
+
+@receiver(m2m_changed, sender=Task.assigned_to.through)
+def count_assignments(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if action == 'post_clear':
+        # Stashed on pre_clear by publish_task_relations
+        pk_set = getattr(instance, '_cleared_relation_ids', set())
+    if not pk_set:
+        return
+    delta = 1 if action == 'post_add' else -1
+    if reverse:
+        update_assignment_stats(pk_set, instance.pk, delta)
+    else:
+        update_stats(instance.project_id, {instance.status: delta}, user_ids=pk_set)
+
+
+# Change feed, see tasks.events. Events are compact: scalar fields of the
+# changed row, or the ids that were added to or removed from a relation.
+
+@receiver(post_save, sender=Project)
+def publish_saved_project(sender, instance, created, **kwargs):
+    if not created:
+        publish_project_event([instance.pk], {
+            'type': 'project.updated',
+            'project': {'id': instance.pk, 'name': instance.name, 'description': instance.description,
+                        'owner': instance.owner_id, 'updated_at': instance.updated_at},
+        })
+
+
+@receiver(post_delete, sender=Project)
+def publish_deleted_project(sender, instance, **kwargs):
+    publish_project_event([instance.pk], {'type': 'project.deleted', 'id': instance.pk})
+
+
+@receiver(m2m_changed, sender=Project.members.through)
+def publish_project_members(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    change = {'post_add': 'added', 'post_remove': 'removed', 'post_clear': 'removed'}[action]
+    if reverse:
+        # `user.member_projects.add(...)`: one user, many projects
+        for project_id in pk_set or ():
+            publish_project_event([project_id], {'type': 'project.members', change: [instance.pk]})
+        return
+    if action == 'post_clear':
+        pk_set = getattr(instance, '_cleared_member_ids', [])
+    if pk_set:
+        publish_project_event([instance.pk], {'type': 'project.members', change: sorted(pk_set)})
+
+
+@receiver(post_save, sender=Task)
+def publish_saved_task(sender, instance, created, **kwargs):
+    publish_project_event([instance.project_id], {
+        'type': 'task.created' if created else 'task.updated',
+        'task': TaskChangeSerializer(instance).data,
+    })
+
+
+@receiver(post_delete, sender=Task)
+def publish_deleted_task(sender, instance, origin=None, **kwargs):
+    if not _is_cascade(instance, origin):
+        publish_project_event([instance.project_id], {'type': 'task.deleted', 'id': instance.pk})
+
+
+@receiver(m2m_changed, sender=Task.tags.through)
+@receiver(m2m_changed, sender=Task.assigned_to.through)
+def publish_task_relations(sender, instance, action, reverse, pk_set, **kwargs):
+    field = 'tags' if sender is Task.tags.through else 'assigned_to'
+    if action == 'pre_clear':
+        manager = getattr(instance, 'tagged_tasks' if field == 'tags' else 'assigned_tasks') if reverse \
+            else getattr(instance, field)
+        instance._cleared_relation_ids = set(manager.values_list('pk', flat=True))
+        return
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if action == 'post_clear':
+        pk_set = getattr(instance, '_cleared_relation_ids', set())
+    if not pk_set:
+        return
+    change = 'added' if action == 'post_add' else 'removed'
+
+    if not reverse:
+        publish_project_event([instance.project_id], {
+            'type': 'task.relations', 'id': instance.pk, 'field': field, change: sorted(pk_set),
+        })
+        return
+    # `tag.tagged_tasks.add(...)`: one related row, many tasks
+    for task_id, project_id in Task.objects.filter(pk__in=pk_set).values_list('pk', 'project_id'):
+        publish_project_event([project_id], {
+            'type': 'task.relations', 'id': task_id, 'field': field, change: [instance.pk],
+        })
+
+
+@receiver(post_save, sender=Comment)
+def publish_saved_comment(sender, instance, created, **kwargs):
+    publish_project_event(_project_of_comment(instance), {
+        'type': 'comment.created' if created else 'comment.updated',
+        'comment': CommentSerializer(instance).data,
+    })
+
+
+@receiver(post_delete, sender=Comment)
+def publish_deleted_comment(sender, instance, origin=None, **kwargs):
+    if not _is_cascade(instance, origin):
+        publish_project_event(_project_of_comment(instance), {
+            'type': 'comment.deleted', 'id': instance.pk, 'task': instance.task_id,
+        })
+
+
+def _projects_using_tag(tag):
+    return Task.objects.filter(tags=tag).order_by().values_list('project_id', flat=True).distinct()
+
+
+@receiver(post_save, sender=Tag)
+def publish_saved_tag(sender, instance, created, **kwargs):
+    if not created:
+        publish_project_event(_projects_using_tag(instance), {
+            'type': 'tag.updated', 'tag': {'id': instance.pk, 'name': instance.name},
+        })
+
+
+@receiver(pre_delete, sender=Tag)
+def publish_deleted_tag(sender, instance, **kwargs):
+    publish_project_event(_projects_using_tag(instance), {'type': 'tag.deleted', 'id': instance.pk})
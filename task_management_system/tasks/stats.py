@@ -0,0 +1,122 @@
+"""
+Denormalized task statistics: counts by status per project and per
+assignee, adjusted by the signals in tasks.signals as tasks are saved,
+deleted and (un)assigned, so reading them does not touch the task table.
+
+Rows are created on demand: adjusting the counts of a project without
+stats rebuilds them from its tasks, as `manage.py rebuild_task_stats`
+does for every project.
+"""
+from collections import Counter
+from django.db import transaction
+from django.db.models import Count, F
+from django.utils import timezone
+from .models import AssigneeStats, Project, ProjectStats, StatusCounts, Task
+
+
+def update_stats(project_id, deltas, user_ids=None):
+    """
+    Apply `deltas` ({status: change in count}) to the counts of the
+    project, or to those of the assignees `user_ids` in that project.
+    Call it after the change has been written.
+    """
+    changes = {
+        StatusCounts.count_field(status): F(StatusCounts.count_field(status)) + delta
+        for status, delta in deltas.items() if delta
+    }
+    if not changes or project_id is None:
+        return
+    if user_ids is None:
+        if not ProjectStats.objects.filter(project_id=project_id).update(**changes):
+            rebuild_project_stats([project_id])
+        return
+
+    user_ids = set(user_ids)
+    rows = AssigneeStats.objects.filter(project_id=project_id, user_id__in=user_ids)
+    missing = user_ids - set(rows.values_list('user_id', flat=True))
+    if missing and any(delta < 0 for delta in deltas.values()):
+        # Out of step: counting again is the only way back
+        rebuild_project_stats([project_id])
+        return
+    rows.update(**changes)
+    AssigneeStats.objects.bulk_create([
+        AssigneeStats(project_id=project_id, user_id=user_id, **{
+            StatusCounts.count_field(status): delta for status, delta in deltas.items()
+        })
+        for user_id in missing
+    ])
+
+
+def update_assignment_stats(task_ids, user_id, delta):
+    """
+    Count `user_id` as (un)assigned to the given tasks, which may belong to
+    different projects (`user.assigned_tasks.add(...)`).
+    """
+    groups = Counter(Task.objects.filter(pk__in=task_ids).values_list('project_id', 'status'))
+    for (project_id, status), count in groups.items():
+        update_stats(project_id, {status: delta * count}, user_ids=[user_id])
+
+
+def rebuild_project_stats(project_ids=None):
+    """
+    Recount the statistics of the given projects (all projects with None)
+    from their tasks, with one grouped query per table.
+    """
+    projects = Project.objects.all()
+    tasks = Task.objects.all()
+    assignments = Task.assigned_to.through.objects.all()
+    if project_ids is not None:
+        projects = projects.filter(pk__in=project_ids)
+        tasks = tasks.filter(project_id__in=project_ids)
+        assignments = assignments.filter(task__project_id__in=project_ids)
+
+    project_counts = {pk: {} for pk in projects.values_list('pk', flat=True)}
+    for project_id, status, count in tasks.order_by().values_list('project_id', 'status').annotate(Count('pk')):
+        project_counts[project_id][StatusCounts.count_field(status)] = count
+    assignee_counts = {}
+    rows = assignments.order_by().values_list('task__project_id', 'customuser_id', 'task__status')
+    for project_id, user_id, status, count in rows.annotate(Count('pk')):
+        assignee_counts.setdefault((project_id, user_id), {})[StatusCounts.count_field(status)] = count
+
+    with transaction.atomic():
+        ProjectStats.objects.filter(project_id__in=project_counts).delete()
+        AssigneeStats.objects.filter(project_id__in=project_counts).delete()
+        ProjectStats.objects.bulk_create([
+            ProjectStats(project_id=project_id, **counts) for project_id, counts in project_counts.items()
+        ], batch_size=1000)
+        AssigneeStats.objects.bulk_create([
+            AssigneeStats(project_id=project_id, user_id=user_id, **counts)
+            for (project_id, user_id), counts in assignee_counts.items()
+        ], batch_size=1000)
+    return len(project_counts)
+
+
+def get_project_stats(project):
+    """
+    Task counts of a project: by status, overdue, and per assignee.
+
+    Being overdue depends on the clock, so that count is not stored; it is
+    an index-only range count on `task_project_status_idx` instead.
+    """
+    stats = ProjectStats.objects.filter(project=project).first()
+    if stats is None:
+        rebuild_project_stats([project.pk])
+        stats = ProjectStats.objects.get(project=project)
+    open_statuses = [status for status, _ in Task.STATUS_CHOICES if status != 'completed']
+    assignees = AssigneeStats.objects.filter(project=project).select_related('user').order_by('user_id')
+
+    status_counts = stats.status_counts()
+    return {
+        'project': project.pk,
+        'task_count': sum(status_counts.values()),
+        'status_counts': status_counts,
+        'overdue_count': Task.objects.filter(
+            project=project, status__in=open_statuses, due_date__lt=timezone.now(),
+        ).count(),
+        'assignees': [
+            {'user': row.user, 'status_counts': counts, 'open_count': sum(counts[s] for s in open_statuses)}
+            for row in assignees
+            for counts in [row.status_counts()]
+            if any(counts.values())
+        ],
+    }
@@ -0,0 +1,116 @@
+"""
+Incremental sync: everything that changed for a user since a cursor.
+
+Rows are found through their `updated_at` columns, which the signals in
+tasks.signals keep bumped up the tree: any change below a project moves
+the project's `updated_at`, so only changed projects are searched for
+changed tasks and comments. Deletions come from the Tombstone log.
+
+A cursor is the time of the previous sync minus `SYNC_CURSOR_OVERLAP`:
+`updated_at` is set before the transaction commits, so a row may become
+visible after a sync that started later than its timestamp. Responses
+therefore repeat the last few seconds of changes, and clients apply them
+as upserts, deletions first.
+"""
+import base64
+from datetime import datetime, timedelta
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+from .membership import get_membership
+from .models import USER_SUMMARY_FIELDS, Project, ProjectMember, Task, Comment, Tag, Tombstone
+from .serializers import (
+    CommentSerializer,
+    ProjectMemberSerializer,
+    ProjectSyncSerializer,
+    TagSerializer,
+    TaskSerializer,
+)
+
+invalid_cursor_message = 'Invalid cursor.'
+
+
+def encode_cursor(moment):
+    return base64.urlsafe_b64encode(moment.isoformat().encode()).decode()
+
+
+def decode_cursor(encoded):
+    try:
+        moment = datetime.fromisoformat(base64.urlsafe_b64decode(encoded.encode()).decode())
+    except (TypeError, ValueError, UnicodeDecodeError):
+        raise ValidationError({'since': [invalid_cursor_message]})
+    if timezone.is_naive(moment):
+        raise ValidationError({'since': [invalid_cursor_message]})
+    return moment
+
+
+def get_changes(request, since=None):
+    """
+    The rows visible to `request.user` that changed at or after `since`,
+    and the ids deleted since then. Without `since`, or when it is older
+    than the deletion log, everything visible is returned with `reset`
+    set: the client replaces its state instead of applying a delta.
+    """
+    now = timezone.now()
+    user = request.user
+    reset = since is None or since < now - timedelta(days=settings.SYNC_TOMBSTONE_RETENTION_DAYS)
+    visible = get_membership(user, request).visible
+
+    projects = Project.objects.filter(pk__in=visible).select_related('owner')
+    if not reset:
+        projects = projects.filter(updated_at__gte=since)
+    projects = list(projects)
+    changed_ids = [project.pk for project in projects]
+
+    tasks = Task.objects.filter(project_id__in=changed_ids)
+    comments = Comment.objects.filter(task__project_id__in=changed_ids)
+    tags = Tag.objects.all()
+    if not reset:
+        # Projects the user only just gained access to are sent whole
+        new_ids = {project.pk for project in projects if project.owner_id == user.pk and project.created_at >= since}
+        new_ids.update(ProjectMember.objects.filter(
+            customuser=user, project_id__in=changed_ids, joined_at__gte=since,
+        ).values_list('project_id', flat=True))
+        tasks = tasks.filter(Q(updated_at__gte=since) | Q(project_id__in=new_ids))
+        comments = comments.filter(Q(updated_at__gte=since) | Q(task__project_id__in=new_ids))
+        tags = tags.filter(updated_at__gte=since)
+
+    # Members are few, so changed projects carry their whole member list
+    members = ProjectMember.objects.filter(project_id__in=changed_ids).select_related('customuser').only(
+        'project_id', 'joined_at', *(f'customuser__{field}' for field in USER_SUMMARY_FIELDS),
+    ).order_by('project_id', 'joined_at')
+
+    context = {'request': request}
+    return {
+        'cursor': encode_cursor(now - timedelta(seconds=settings.SYNC_CURSOR_OVERLAP)),
+        'reset': reset,
+        'deleted': {} if reset else _deletions(user, visible, since),
+        'projects': ProjectSyncSerializer(projects, many=True, context=context).data,
+        'members': ProjectMemberSerializer(members, many=True, context=context).data,
+        'tasks': TaskSerializer(tasks.with_relations().order_by('pk'), many=True, context=context).data,
+        'comments': CommentSerializer(comments.select_related('author').order_by('pk'), many=True,
+                                      context=context).data,
+        'tags': TagSerializer(tags.order_by('pk'), many=True, context=context).data,
+    }
+
+
+def _deletions(user, visible, since):
+    in_visible_projects = Q(kind__in=[Tombstone.TASK, Tombstone.COMMENT, Tombstone.MEMBER], project_id__in=visible)
+    # Removed from a project, or the project deleted: the client drops it
+    lost_projects = Q(kind=Tombstone.MEMBER, object_id=user.pk) | Q(kind=Tombstone.PROJECT, user_id=user.pk)
+    rows = Tombstone.objects.filter(
+        in_visible_projects | lost_projects | Q(kind=Tombstone.TAG), deleted_at__gte=since,
+    ).values_list('kind', 'object_id', 'project_id')
+
+    deleted = {'projects': set(), 'members': [], 'tasks': set(), 'comments': set(), 'tags': set()}
+    for kind, object_id, project_id in rows:
+        if kind == Tombstone.MEMBER:
+            deleted['members'].append({'project': project_id, 'user': object_id})
+            if object_id == user.pk and project_id not in visible:
+                deleted['projects'].add(project_id)
+        elif kind == Tombstone.PROJECT:
+            deleted['projects'].add(project_id)
+        else:
+            deleted[f'{kind}s'].add(object_id)
+    return {key: sorted(ids) if isinstance(ids, set) else ids for key, ids in deleted.items()}
@@ -0,0 +1,87 @@
+# tasks/tests/test_async_events.py
+import asyncio
+import json
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.test import TransactionTestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+from users.models import CustomUser
+from tasks.models import Project, Task
+
+
+class ProjectEventsTest(TransactionTestCase):
+    # Events are published on commit, so the writes have to really commit
+    def setUp(self):
+        cache.clear()
+        self.user = CustomUser.objects.create_user(
+            username='testuser',
+            password='testpassword',
+            email='testuser@example.com',
+        )
+        self.other = CustomUser.objects.create_user(
+            username='otheruser',
+            password='otherpassword',
+            email='otheruser@example.com',
+        )
+        self.stranger = CustomUser.objects.create_user(
+            username='stranger',
+            password='strangerpassword',
+            email='stranger@example.com',
+        )
+        self.project = Project.objects.create(owner=self.other, name="Project 1")
+        self.project.members.add(self.user)
+        self.url = f'/api/v1/projects/{self.project.pk}/events/'
+        self.auth = {'Authorization': f'Bearer {RefreshToken.for_user(self.user).access_token}'}
+        self.stranger_auth = {'Authorization': f'Bearer {RefreshToken.for_user(self.stranger).access_token}'}
+
+    async def _frames(self, response):
+        buffer = ''
+        async for chunk in response.streaming_content:
+            buffer += chunk.decode()
+            while '\n\n' in buffer:
+                frame, buffer = buffer.split('\n\n', 1)
+                if frame.startswith('event:') or frame.startswith('id:'):
+                    fields = dict(line.split(': ', 1) for line in frame.split('\n'))
+                    yield fields['event'], json.loads(fields['data'])
+
+    async def _next(self, frames):
+        return await asyncio.wait_for(anext(frames), timeout=5)
+
+    async def test_streams_changes_to_the_project(self):
+        response = await self.async_client.get(self.url, headers=self.auth)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        frames = self._frames(response)
+        self.assertEqual(await self._next(frames), ('ready', {'type': 'ready', 'project': self.project.pk}))
+
+        task = await Task.objects.acreate(project=self.project, name="Task 1")
+        event, data = await self._next(frames)
+        self.assertEqual(event, 'task.created')
+        self.assertEqual(data['task']['name'], "Task 1")
+
+        await sync_to_async(task.tags.create)(name="urgent")
+        event, data = await self._next(frames)
+        self.assertEqual((event, data['id'], data['field']), ('task.relations', task.pk, 'tags'))
+
+        task_id = task.pk
+        await task.adelete()
+        self.assertEqual(await self._next(frames), ('task.deleted', {'type': 'task.deleted', 'id': task_id}))
+        await frames.aclose()
+
+    async def test_stream_ends_when_access_is_revoked(self):
+        response = await self.async_client.get(self.url, headers=self.auth)
+        frames = self._frames(response)
+        await self._next(frames)
+
+        await sync_to_async(self.project.members.remove)(self.user)
+        self.assertEqual((await self._next(frames))[0], 'project.members')
+        self.assertEqual((await self._next(frames))[0], 'revoked')
+        with self.assertRaises(StopAsyncIteration):
+            await self._next(frames)
+
+    async def test_other_users_get_404(self):
+        response = await self.async_client.get(self.url, headers=self.stranger_auth)
+        self.assertEqual(response.status_code, 404)
+
+        response = await self.async_client.get(self.url)
+        self.assertEqual(response.status_code, 401)
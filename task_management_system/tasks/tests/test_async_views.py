@@ -0,0 +1,128 @@
+# tasks/tests/test_async_views.py
+import asyncio
+import json
+from unittest import mock
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+from users.models import CustomUser
+from tasks.models import Project, Task, Comment, Tag
+from tasks.project_cache import _payload_key
+
+
+class AsyncReadViewsTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = CustomUser.objects.create_user(
+            username='testuser',
+            password='testpassword',
+            email='testuser@example.com',
+        )
+        self.other = CustomUser.objects.create_user(
+            username='otheruser',
+            password='otherpassword',
+            email='otheruser@example.com',
+        )
+        token = RefreshToken.for_user(self.user).access_token
+        self.auth = {'Authorization': f'Bearer {token}'}
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+        self.project = Project.objects.create(owner=self.user, name="Project 1")
+        self.project.members.add(self.other)
+        self.shared = Project.objects.create(owner=self.other, name="Shared")
+        self.shared.members.add(self.user)
+        self.hidden = Project.objects.create(owner=self.other, name="Hidden")
+        tag = Tag.objects.create(name="urgent")
+        for index in range(3):
+            task = Task.objects.create(project=self.project, name=f"Task {index}",
+                                       status='completed' if index else 'todo')
+            task.tags.add(tag)
+            task.assigned_to.add(self.other)
+            Comment.objects.create(task=task, author=self.user, content=f"Comment {index}")
+        self.task = task
+
+    def _urls(self):
+        project_pk, task_pk = self.project.pk, self.task.pk
+        return [
+            reverse('project-list'),
+            reverse('project-list') + '?view=summary',
+            reverse('project-detail', kwargs={'pk': project_pk}),
+            reverse('project-detail', kwargs={'pk': self.shared.pk}),
+            reverse('project-tasks-list', kwargs={'project_pk': project_pk}),
+            reverse('project-tasks-list', kwargs={'project_pk': project_pk}) + '?status=completed&ordering=-name',
+            reverse('project-tasks-list', kwargs={'project_pk': project_pk}) + '?page_size=2',
+            reverse('task-comments-list', kwargs={'project_pk': project_pk, 'task_pk': task_pk}),
+            reverse('check-permission', kwargs={'project_id': project_pk}),
+            reverse('check-permission', kwargs={'project_id': self.shared.pk}),
+        ]
+
+    async def test_async_views_render_what_drf_renders(self):
+        for url in self._urls():
+            with self.subTest(url=url):
+                sync_response = await self._sync_get(url)
+                async_response = await self.async_client.get(url, headers=self.auth)
+                self.assertEqual(async_response.status_code, sync_response.status_code)
+                self.assertEqual(json.loads(async_response.content), json.loads(sync_response.content))
+                self.assertEqual(async_response['ETag'], sync_response['ETag'])
+
+    async def test_served_by_the_async_views(self):
+        url = reverse('project-tasks-list', kwargs={'project_pk': self.project.pk})
+        response = await self.async_client.get(url, headers=self.auth)
+        self.assertEqual(response.resolver_match.func.__module__, 'tasks.async_views')
+
+    async def test_revalidation(self):
+        url = reverse('project-detail', kwargs={'pk': self.project.pk})
+        response = await self.async_client.get(url, headers=self.auth)
+        response = await self.async_client.get(url, headers={**self.auth, 'If-None-Match': response['ETag']})
+        self.assertEqual(response.status_code, 304)
+
+    async def test_cache_is_not_blocking_the_event_loop(self):
+        def off_the_loop(method):
+            def wrapper(*args, **kwargs):
+                # The async cache API runs the sync one in a worker thread
+                with self.assertRaises(RuntimeError):
+                    asyncio.get_running_loop()
+                return method(*args, **kwargs)
+            return wrapper
+
+        urls = [reverse('project-list'), reverse('project-detail', kwargs={'pk': self.shared.pk})]
+        with mock.patch.object(cache, 'get', off_the_loop(cache.get)), \
+                mock.patch.object(cache, 'get_many', off_the_loop(cache.get_many)), \
+                mock.patch.object(cache, 'set', off_the_loop(cache.set)), \
+                mock.patch.object(cache, 'set_many', off_the_loop(cache.set_many)):
+            for url in urls:
+                response = await self.async_client.get(url, headers=self.auth)
+                self.assertEqual(response.status_code, 200)
+
+        # The payloads rendered on the misses were cached all the same
+        projects = [project async for project in Project.objects.filter(pk__in=[self.project.pk, self.shared.pk])]
+        cached = await cache.aget_many([_payload_key(project) for project in projects])
+        self.assertEqual(len(cached), 2)
+
+    async def test_errors(self):
+        url = reverse('project-detail', kwargs={'pk': self.project.pk})
+        response = await self.async_client.get(url)
+        self.assertEqual(response.status_code, 401)
+        self.assertIn('Bearer', response['WWW-Authenticate'])
+
+        url = reverse('project-detail', kwargs={'pk': self.hidden.pk})
+        response = await self.async_client.get(url, headers=self.auth)
+        self.assertEqual(response.status_code, 404)
+
+        url = reverse('project-tasks-list', kwargs={'project_pk': self.project.pk}) + '?status=nope'
+        response = await self.async_client.get(url, headers=self.auth)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('status', json.loads(response.content))
+
+    async def test_writes_fall_back_to_drf(self):
+        response = await self.async_client.post(
+            reverse('project-list'), {'name': 'Created', 'member_ids': []},
+            content_type='application/json', headers=self.auth,
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(await Project.objects.filter(name='Created', owner=self.user).acount(), 1)
+
+    async def _sync_get(self, url):
+        return await sync_to_async(self.client.get)(url)
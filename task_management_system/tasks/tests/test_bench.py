@@ -0,0 +1,101 @@
+# tasks/tests/test_bench.py
+import io
+import json
+import os
+import tempfile
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+from users.models import CustomUser
+from tasks.benchmarks import compare
+from tasks.models import Project, ProjectMember, Task, Comment, TaskTag, ProjectStats
+from tasks.seed import seed
+
+
+class SeedTest(TestCase):
+    def test_seed(self):
+        counts = seed(users=30, projects=6, tasks=300, tags=10, comments_per_task=2, batch_size=120)
+        self.assertEqual(CustomUser.objects.filter(username__startswith='bench').count(), 30)
+        self.assertEqual(Project.objects.count(), 6)
+        self.assertEqual(Task.objects.count(), 300)
+        self.assertEqual(counts['members'], ProjectMember.objects.count())
+        self.assertEqual(counts['comments'], Comment.objects.count())
+        self.assertEqual(counts['task_tags'], TaskTag.objects.count())
+        self.assertEqual(counts['assignments'], Task.assigned_to.through.objects.count())
+        self.assertGreater(counts['comments'], 0)
+
+        # Assignees and comment authors belong to the task's project
+        for task in Task.objects.prefetch_related('assigned_to', 'comments', 'project__members')[:50]:
+            team = {task.project.owner_id, *(member.pk for member in task.project.members.all())}
+            self.assertLessEqual({user.pk for user in task.assigned_to.all()}, team)
+            self.assertLessEqual({comment.author_id for comment in task.comments.all()}, team)
+        stats = ProjectStats.objects.get(project=Project.objects.order_by('pk').first())
+        self.assertEqual(stats.todo_count, Task.objects.filter(project=stats.project, status='todo').count())
+
+    def test_same_seed_same_data(self):
+        seed(users=10, projects=3, tasks=50, tags=5, prefix='first', search_index=False)
+        seed(users=10, projects=3, tasks=50, tags=5, prefix='second', search_index=False)
+        first, second = (
+            list(Task.objects.filter(project__owner__username__startswith=prefix).order_by('pk')
+                 .values_list('name', 'status'))
+            for prefix in ('first', 'second')
+        )
+        self.assertEqual(first, second)
+
+    def test_command_refuses_existing_prefix(self):
+        call_command('seed_bench', users=5, projects=2, tasks=10, tags=3, stdout=io.StringIO())
+        with self.assertRaisesMessage(CommandError, 'already exist'):
+            call_command('seed_bench', users=5, projects=2, tasks=10, tags=3, stdout=io.StringIO())
+
+
+class BenchApiTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        seed(users=20, projects=5, tasks=200, tags=8)
+        self.directory = tempfile.TemporaryDirectory()
+        self.output = os.path.join(self.directory.name, 'bench.json')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_results_file(self):
+        out = io.StringIO()
+        call_command('bench_api', requests=2, memory_requests=1, warmup=1, output=self.output, stdout=out)
+        with open(self.output) as file:
+            report = json.load(file)
+        self.assertEqual(report['dataset']['tasks'], 200)
+        self.assertEqual(report['database'], 'sqlite')
+        result = report['results']['TaskViewSet.list']
+        self.assertEqual(result['requests'], 2)
+        self.assertGreater(result['queries'], 0)
+        self.assertLessEqual(result['p50_ms'], result['p95_ms'])
+        self.assertGreater(result['peak_kb'], 0)
+        for name in ('ProjectViewSet.list', 'ProjectViewSet.stats', 'CommentViewSet.list', 'sync'):
+            self.assertIn(name, report['results'])
+
+        # Against itself, nothing regresses
+        call_command('bench_api', requests=2, memory_requests=1, warmup=1, only=['TagViewSet'],
+                     output=self.output, compare=self.output, threshold=100, fail_on_regression=True, stdout=out)
+        self.assertIn('Compared with', out.getvalue())
+
+    def test_missing_metrics_are_printed_as_dashes(self):
+        out = io.StringIO()
+        call_command('bench_api', requests=1, memory_requests=0, warmup=0, only=['TagViewSet.list'],
+                     output=self.output, stdout=out)
+        with open(self.output) as file:
+            result = json.load(file)['results']['TagViewSet.list']
+        self.assertIsNone(result['peak_kb'])
+        self.assertIn('        - KB', out.getvalue())
+
+        call_command('bench_api', requests=1, memory_requests=0, warmup=0, only=['TagViewSet.list'],
+                     output=self.output, compare=self.output, stdout=out)
+        self.assertIn('Compared with', out.getvalue())
+
+    def test_compare(self):
+        baseline = {'TaskViewSet.list': {'p95_ms': 10.0, 'queries': 4, 'peak_kb': 100.0}}
+        rows, regressed = compare({'TaskViewSet.list': {'p95_ms': 10.5, 'queries': 4, 'peak_kb': 90.0}}, baseline)
+        self.assertFalse(regressed)
+        self.assertEqual(len(rows), 3)
+        self.assertTrue(compare({'TaskViewSet.list': {'p95_ms': 10.0, 'queries': 5}}, baseline)[1])
+        self.assertTrue(compare({'TaskViewSet.list': {'p95_ms': 12.0, 'queries': 4}}, baseline)[1])
@@ -0,0 +1,97 @@
+# tasks/tests/test_bulk.py
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+from users.models import CustomUser
+from tasks.models import Project, Task, Tag
+
+
+class TaskBulkTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = CustomUser.objects.create_user(
+            username='testuser',
+            password='testpassword',
+            email='testuser@example.com',
+        )
+        self.member = CustomUser.objects.create_user(
+            username='member',
+            password='memberpassword',
+            email='member@example.com',
+        )
+        self._authenticate(self.user)
+        self.project = Project.objects.create(owner=self.user, name="Project 1")
+        self.project.members.add(self.member)
+        self.tag = Tag.objects.create(name='backend')
+        self.url = reverse('project-tasks-bulk', kwargs={'project_pk': self.project.pk})
+
+    def _authenticate(self, user):
+        refresh = RefreshToken.for_user(user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+
+    def test_bulk_create_update_and_delete(self):
+        to_update = Task.objects.create(project=self.project, name="Old name")
+        to_update.tags.add(self.tag)
+        to_delete = Task.objects.create(project=self.project, name="Obsolete")
+
+        response = self.client.post(self.url, {
+            'create': [
+                {'name': "New 1", 'tag_ids': [self.tag.pk], 'assigned_to_ids': [self.member.pk]},
+                {'name': "New 2", 'status': 'in_progress'},
+            ],
+            'update': [{'id': to_update.pk, 'name': "Renamed", 'tag_ids': []}],
+            'delete': [to_delete.pk],
+        }, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([task['name'] for task in response.data['created']], ["New 1", "New 2"])
+        self.assertEqual(response.data['created'][0]['tags'], [{'id': self.tag.pk, 'name': 'backend'}])
+        self.assertEqual(response.data['created'][0]['assigned_to'][0]['id'], self.member.pk)
+        self.assertEqual(response.data['updated'][0]['name'], "Renamed")
+        self.assertEqual(response.data['updated'][0]['tags'], [])
+        self.assertEqual(response.data['deleted'], [to_delete.pk])
+        self.assertFalse(Task.objects.filter(pk=to_delete.pk).exists())
+        self.assertEqual(Task.objects.filter(project=self.project).count(), 3)
+
+    def test_invalid_item_rejects_whole_request(self):
+        response = self.client.post(self.url, {
+            'create': [{'name': "Good"}, {'name': "Bad", 'tag_ids': [9999]}],
+        }, format='json')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['create'][0], {})
+        self.assertIn('tag_ids', response.data['create'][1])
+        self.assertFalse(Task.objects.exists())
+
+    def test_duplicate_update_ids_are_rejected(self):
+        task = Task.objects.create(project=self.project, name="Task")
+        response = self.client.post(self.url, {
+            'update': [{'id': task.pk, 'tag_ids': [self.tag.pk]}, {'id': task.pk, 'tag_ids': [self.tag.pk]}],
+        }, format='json')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['non_field_errors'], [f'Task {task.pk} is updated more than once.'])
+        self.assertFalse(task.tags.exists())
+
+    def test_query_count_does_not_grow_with_items(self):
+        def run(count):
+            payload = {'create': [
+                {'name': f"Task {index}", 'tag_ids': [self.tag.pk], 'assigned_to_ids': [self.user.pk]}
+                for index in range(count)
+            ]}
+            with CaptureQueriesContext(connection) as context:
+                response = self.client.post(self.url, payload, format='json')
+            self.assertEqual(response.status_code, 200)
+            return len(context.captured_queries)
+
+        run(1)  # Warm up the cached project membership
+        # Large payloads only add queries per database batch, never per item
+        self.assertEqual(run(3), run(60))
+
+    def test_members_cannot_bulk_edit(self):
+        self._authenticate(self.member)
+        response = self.client.post(self.url, {'create': [{'name': "Task"}]}, format='json')
+        self.assertEqual(response.status_code, 403)
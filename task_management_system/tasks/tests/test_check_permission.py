@@ -0,0 +1,69 @@
+# tasks/tests/test_check_permission.py
+from django.core.cache import cache
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+from users.models import CustomUser
+from tasks.models import Project
+
+
+class CheckPermissionTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = CustomUser.objects.create_user(
+            username='testuser',
+            password='testpassword',
+            email='testuser@example.com',
+        )
+        self.other = CustomUser.objects.create_user(
+            username='otheruser',
+            password='otherpassword',
+            email='otheruser@example.com',
+        )
+        refresh = RefreshToken.for_user(self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+        self.owned = Project.objects.create(owner=self.user, name="Owned")
+        self.shared = Project.objects.create(owner=self.other, name="Shared")
+        self.shared.members.add(self.user)
+
+    def _url(self, project_id):
+        return reverse('check-permission', kwargs={'project_id': project_id})
+
+    def test_single_check_statuses(self):
+        self.assertEqual(self.client.get(self._url(self.owned.pk)).status_code, 200)
+        self.assertEqual(self.client.get(self._url(self.shared.pk)).status_code, 403)
+        self.assertEqual(self.client.get(self._url(9999)).status_code, 404)
+
+    def test_single_check_is_cacheable(self):
+        with self.assertNumQueries(2):  # The user and one primary key lookup
+            response = self.client.get(self._url(self.owned.pk))
+        self.assertIn('private', response['Cache-Control'])
+        self.assertTrue(response['ETag'].startswith('W/'))
+
+        response = self.client.get(self._url(self.owned.pk), HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+
+    def test_batch_check(self):
+        response = self.client.post(reverse('project-check-permissions'), {
+            'project_ids': [self.owned.pk, self.shared.pk, 9999],
+            'actions': ['view', 'edit'],
+        }, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data, {
+            str(self.owned.pk): {'view': True, 'edit': True},
+            str(self.shared.pk): {'view': True, 'edit': False},
+            '9999': {'view': False, 'edit': False},
+        })
+
+    def test_batch_check_rejects_unknown_actions(self):
+        response = self.client.post(reverse('project-check-permissions'), {
+            'project_ids': [self.owned.pk], 'actions': ['fly'],
+        }, format='json')
+        self.assertEqual(response.status_code, 400)
+
+    def test_project_permissions_are_still_enforced(self):
+        # Regression: the batch action once shadowed APIView.check_permissions()
+        url = reverse('project-detail', kwargs={'pk': self.shared.pk})
+        response = self.client.patch(url, {'name': 'Taken over'}, format='json')
+        self.assertEqual(response.status_code, 403)
@@ -0,0 +1,155 @@
+# tasks/tests/test_conditional.py
+from datetime import timedelta
+from unittest import mock
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+from users.models import CustomUser
+from tasks.models import Project, Task, Comment, Tag
+
+
+class ConditionalGetTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = CustomUser.objects.create_user(
+            username='testuser',
+            password='testpassword',
+            email='testuser@example.com',
+        )
+        refresh = RefreshToken.for_user(self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+        self.project = Project.objects.create(owner=self.user, name="Project 1")
+        self.task = Task.objects.create(project=self.project, name="Task 1")
+        self.comment = Comment.objects.create(task=self.task, author=self.user, content="First")
+        self.tasks_url = reverse('project-tasks-list', kwargs={'project_pk': self.project.pk})
+        self.comments_url = reverse('task-comments-list', kwargs={
+            'project_pk': self.project.pk, 'task_pk': self.task.pk,
+        })
+
+    def _etag(self, url, **params):
+        response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['ETag'].startswith('W/"'))
+        return response['ETag']
+
+    def _assert_not_modified(self, url, etag):
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+
+    def test_unchanged_list_returns_304_without_serializing(self):
+        etag = self._etag(self.tasks_url)
+        with CaptureQueriesContext(connection) as context:
+            self._assert_not_modified(self.tasks_url, etag)
+        # Only the aggregate; the user and membership come from the cache
+        self.assertEqual(len(context.captured_queries), 1)
+
+    def test_every_endpoint_revalidates(self):
+        urls = [
+            reverse('project-list'),
+            reverse('project-detail', kwargs={'pk': self.project.pk}),
+            self.tasks_url,
+            reverse('project-tasks-detail', kwargs={'project_pk': self.project.pk, 'pk': self.task.pk}),
+            self.comments_url,
+            reverse('task-comments-detail', kwargs={
+                'project_pk': self.project.pk, 'task_pk': self.task.pk, 'pk': self.comment.pk,
+            }),
+        ]
+        for url in urls:
+            with self.subTest(url=url):
+                self._assert_not_modified(url, self._etag(url))
+
+    def test_child_changes_bump_project_etag(self):
+        detail = reverse('project-detail', kwargs={'pk': self.project.pk})
+        etag = self._etag(detail)
+
+        Comment.objects.create(task=self.task, author=self.user, content="Second")
+        self.assertNotEqual(self._etag(detail), etag)
+        etag = self._etag(detail)
+
+        self.comment.delete()
+        self.assertNotEqual(self._etag(detail), etag)
+        etag = self._etag(detail)
+
+        tag = Tag.objects.create(name="urgent")
+        self.task.tags.add(tag)
+        self.assertNotEqual(self._etag(detail), etag)
+        etag = self._etag(detail)
+
+        tag.name = "later"
+        tag.save()
+        self.assertNotEqual(self._etag(detail), etag)
+
+    def test_renamed_users_change_task_and_comment_etags(self):
+        other = CustomUser.objects.create_user(
+            username='otheruser',
+            password='otherpassword',
+            email='otheruser@example.com',
+        )
+        self.task.assigned_to.add(self.user)
+        # A comment whose author is no longer in the project
+        comment = Comment.objects.create(task=self.task, author=other, content="Second")
+        task_url = reverse('project-tasks-detail', kwargs={'project_pk': self.project.pk, 'pk': self.task.pk})
+        comment_url = reverse('task-comments-detail', kwargs={
+            'project_pk': self.project.pk, 'task_pk': self.task.pk, 'pk': comment.pk,
+        })
+
+        for user, url in ((self.user, task_url), (other, comment_url)):
+            with self.subTest(url=url):
+                etag = self._etag(url)
+                user.username = f'{user.username}-renamed'
+                user.save()
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 200)
+                self.assertIn(user.username, response.content.decode())
+
+    def test_summary_etag_moves_when_next_due_date_passes(self):
+        due = timezone.now() + timedelta(hours=1)
+        self.task.due_date = due
+        self.task.save()
+        url = reverse('project-list') + '?view=summary'
+        etag = self._etag(url)
+        self._assert_not_modified(url, etag)
+
+        with mock.patch('django.utils.timezone.now', return_value=due + timedelta(minutes=1)):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNone(response.data[0]['next_due_date'])
+
+    def test_deletion_changes_list_etag(self):
+        Task.objects.create(project=self.project, name="Task 2")
+        etag = self._etag(self.tasks_url)
+        self.task.delete()
+        self.assertNotEqual(self._etag(self.tasks_url), etag)
+
+    def test_query_parameters_are_part_of_the_etag(self):
+        self.assertNotEqual(self._etag(self.tasks_url), self._etag(self.tasks_url, status='completed'))
+
+    def test_if_modified_since(self):
+        url = reverse('project-tasks-detail', kwargs={'project_pk': self.project.pk, 'pk': self.task.pk})
+        response = self.client.get(url)
+        last_modified = response['Last-Modified']
+
+        response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, 304)
+        response = self.client.get(url, HTTP_IF_MODIFIED_SINCE='Mon, 01 Jan 2001 00:00:00 GMT')
+        self.assertEqual(response.status_code, 200)
+
+    def test_project_list_has_no_last_modified(self):
+        # Losing access to a project leaves MAX(updated_at) as it was
+        response = self.client.get(reverse('project-list'))
+        self.assertNotIn('Last-Modified', response)
+
+    def test_invisible_object_is_still_404(self):
+        other = CustomUser.objects.create_user(
+            username='otheruser',
+            password='otherpassword',
+            email='otheruser@example.com',
+        )
+        hidden = Project.objects.create(owner=other, name="Hidden")
+        response = self.client.get(reverse('project-detail', kwargs={'pk': hidden.pk}), HTTP_IF_NONE_MATCH='*')
+        self.assertEqual(response.status_code, 404)
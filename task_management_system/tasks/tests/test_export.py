@@ -0,0 +1,88 @@
+# tasks/tests/test_export.py
+import csv
+import io
+import json
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+from users.models import CustomUser
+from tasks.export import export_project
+from tasks.models import Project, Task, Comment, Tag
+
+
+class ProjectExportTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = CustomUser.objects.create_user(
+            username='testuser',
+            password='testpassword',
+            email='testuser@example.com',
+        )
+        token = RefreshToken.for_user(self.user).access_token
+        self.auth = {'Authorization': f'Bearer {token}'}
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        self.project = Project.objects.create(owner=self.user, name="Project 1")
+        tag = Tag.objects.create(name="urgent")
+        for index in range(5):
+            task = Task.objects.create(project=self.project, name=f"Task {index}")
+            task.tags.add(tag)
+            task.assigned_to.add(self.user)
+            Comment.objects.create(task=task, author=self.user, content=f"Comment, \"{index}\"\nsecond line")
+        self.url = reverse('project-export', kwargs={'pk': self.project.pk})
+
+    def _body(self, response):
+        self.assertTrue(response.streaming)
+        return b''.join(response.streaming_content).decode()
+
+    def test_ndjson(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        records = [json.loads(line) for line in self._body(response).splitlines()]
+        self.assertEqual([record['type'] for record in records], ['project'] + ['task'] * 5 + ['comment'] * 5)
+        self.assertEqual(records[1]['tags'], ['urgent'])
+        self.assertEqual(records[1]['assigned_to'], ['testuser@example.com'])
+        self.assertEqual(records[-1]['content'], "Comment, \"4\"\nsecond line")
+
+    def test_csv(self):
+        response = self.client.get(self.url, {'format': 'csv'})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/csv'))
+        rows = list(csv.DictReader(io.StringIO(self._body(response))))
+        self.assertEqual(len(rows), 11)
+        self.assertEqual(rows[1]['tags'], 'urgent')
+        self.assertEqual(rows[-1]['content'], "Comment, \"4\"\nsecond line")
+
+    async def test_streams_under_asgi(self):
+        response = await self.async_client.get(self.url, headers=self.auth)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.is_async)
+        body = b''.join([chunk async for chunk in response.streaming_content]).decode()
+        self.assertEqual(len(body.splitlines()), 11)
+
+    def test_prefetches_run_per_chunk(self):
+        with CaptureQueriesContext(connection) as context:
+            chunks = list(export_project(self.project, chunk_size=2))
+        # Tasks, their tags and assignees for each of 3 chunks, comments
+        self.assertEqual(len(context.captured_queries), 1 + 3 * 2 + 1)
+        self.assertEqual(len(chunks), 6)
+
+    def test_others_cannot_export(self):
+        other = CustomUser.objects.create_user(
+            username='otheruser',
+            password='otherpassword',
+            email='otheruser@example.com',
+        )
+        hidden = Project.objects.create(owner=other, name="Hidden")
+        response = self.client.get(reverse('project-export', kwargs={'pk': hidden.pk}))
+        self.assertEqual(response.status_code, 404)
+
+    def test_command(self):
+        self.project.refresh_from_db()
+        out = io.StringIO()
+        call_command('export_project', self.project.pk, format='csv', stdout=out)
+        self.assertEqual(out.getvalue(), ''.join(export_project(self.project, 'csv')))
@@ -0,0 +1,92 @@
+# tasks/tests/test_fieldsets.py
+from django.core.cache import cache
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+from users.models import CustomUser
+from tasks.models import Project, Task, Comment, Tag
+
+
+class SparseFieldsetTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = CustomUser.objects.create_user(
+            username='testuser',
+            password='testpassword',
+            email='testuser@example.com',
+        )
+        refresh = RefreshToken.for_user(self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+        self.project = Project.objects.create(owner=self.user, name="Project 1", description="A long description")
+        self.project.members.add(self.user)
+        self.tag = Tag.objects.create(name="Tag 1")
+        self.task = Task.objects.create(project=self.project, name="Task 1", description="Details")
+        self.task.tags.add(self.tag)
+        self.task.assigned_to.add(self.user)
+        self.comment = Comment.objects.create(task=self.task, author=self.user, content="Comment 1")
+        self.tasks_url = reverse('project-tasks-list', kwargs={'project_pk': self.project.pk})
+
+    def test_fields_limit_the_response(self):
+        response = self.client.get(self.tasks_url, {'fields': 'id,name,status'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), [{'id': self.task.pk, 'name': 'Task 1', 'status': 'todo'}])
+
+    def test_relations_are_ids_unless_expanded(self):
+        response = self.client.get(self.tasks_url, {'fields': 'id,tags,assigned_to'})
+        self.assertEqual(response.json(), [{'id': self.task.pk, 'tags': [self.tag.pk], 'assigned_to': [self.user.pk]}])
+
+        response = self.client.get(self.tasks_url, {'fields': 'id,tags,assigned_to.username', 'expand': 'tags,assigned_to'})
+        self.assertEqual(response.json(), [{
+            'id': self.task.pk,
+            'tags': [{'id': self.tag.pk, 'name': 'Tag 1'}],
+            'assigned_to': [{'username': 'testuser'}],
+        }])
+
+    def test_dotted_paths_reach_nested_objects(self):
+        url = reverse('project-detail', kwargs={'pk': self.project.pk})
+        response = self.client.get(url, {'fields': 'id,tasks.name,tasks.tags', 'expand': 'tasks'})
+        self.assertEqual(response.json(), {'id': self.project.pk, 'tasks': [{'name': 'Task 1', 'tags': [self.tag.pk]}]})
+
+        response = self.client.get(url, {'fields': 'name,tasks.tags.name', 'expand': 'tasks.tags'})
+        self.assertEqual(response.json(), {'name': 'Project 1', 'tasks': [{'tags': [{'name': 'Tag 1'}]}]})
+
+    def test_default_response_is_unchanged(self):
+        default = self.client.get(self.tasks_url).json()
+        self.assertEqual(default[0]['tags'], [{'id': self.tag.pk, 'name': 'Tag 1'}])
+        self.assertEqual(default[0]['assigned_to'][0]['username'], 'testuser')
+        self.assertIn('description', default[0])
+
+        project = self.client.get(reverse('project-list')).json()[0]
+        self.assertEqual(project['tasks'][0]['name'], 'Task 1')
+        self.assertTrue(project['is_owner'])
+
+    def test_unrequested_relations_are_not_loaded(self):
+        self.client.get(self.tasks_url)  # Caches the user and membership
+        with self.assertNumQueries(4):  # Validators, tasks, tags, assignees
+            self.client.get(self.tasks_url)
+        with self.assertNumQueries(2):
+            response = self.client.get(self.tasks_url, {'fields': 'id,name'})
+        self.assertEqual(response.json(), [{'id': self.task.pk, 'name': 'Task 1'}])
+
+    def test_projects_skip_the_task_tree(self):
+        url = reverse('project-list')
+        self.client.get(url)
+        with self.assertNumQueries(2):  # Validators, projects with owners
+            response = self.client.get(url, {'fields': 'id,name,owner'})
+        self.assertEqual(response.json(), [{'id': self.project.pk, 'name': 'Project 1', 'owner': 'testuser'}])
+
+    def test_comments(self):
+        url = reverse('task-comments-list', kwargs={'project_pk': self.project.pk, 'task_pk': self.task.pk})
+        self.client.get(url)
+        with self.assertNumQueries(2):
+            response = self.client.get(url, {'fields': 'id,content'})
+        self.assertEqual(response.json(), [{'id': self.comment.pk, 'content': 'Comment 1'}])
+        response = self.client.get(url, {'fields': 'author'})
+        self.assertEqual(response.json(), [{'author': 'testuser'}])
+
+    def test_fields_do_not_apply_to_writes(self):
+        response = self.client.post(self.tasks_url + '?fields=id', {
+            'name': 'Task 2', 'project': self.project.pk,
+        }, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertIn('description', response.json())
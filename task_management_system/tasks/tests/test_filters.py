@@ -0,0 +1,97 @@
+# tasks/tests/test_filters.py
+from datetime import timedelta
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+from users.models import CustomUser
+from tasks.models import Project, Task, Comment, Tag
+from tasks.search import PostgresSearchBackend
+
+
+class TaskFilterTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = CustomUser.objects.create_user(
+            username='testuser',
+            password='testpassword',
+            email='testuser@example.com',
+        )
+        refresh = RefreshToken.for_user(self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+
+        self.project = Project.objects.create(owner=self.user, name="Project 1")
+        now = timezone.now()
+        self.late = Task.objects.create(
+            project=self.project, name="Write report", description="Quarterly numbers",
+            due_date=now - timedelta(days=2),
+        )
+        self.done = Task.objects.create(
+            project=self.project, name="Deploy", status='completed', due_date=now - timedelta(days=1),
+        )
+        self.next = Task.objects.create(
+            project=self.project, name="Plan sprint", status='in_progress', due_date=now + timedelta(days=3),
+        )
+        self.tag = Tag.objects.create(name='urgent')
+        self.late.tags.add(self.tag)
+        self.next.assigned_to.add(self.user)
+        Comment.objects.create(task=self.done, author=self.user, content="Rollback checklist attached")
+        self.url = reverse('project-tasks-list', kwargs={'project_pk': self.project.pk})
+
+    def _names(self, **params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, 200)
+        return [task['name'] for task in response.data]
+
+    def test_filters(self):
+        self.assertEqual(self._names(status='completed,in_progress'), ["Deploy", "Plan sprint"])
+        self.assertEqual(self._names(tag=self.tag.pk), ["Write report"])
+        self.assertEqual(self._names(assigned_to='me'), ["Plan sprint"])
+        self.assertEqual(self._names(overdue='true'), ["Write report"])
+        self.assertEqual(self._names(due_after=timezone.now().date().isoformat()), ["Plan sprint"])
+
+    def test_invalid_filter_returns_400(self):
+        response = self.client.get(self.url, {'status': 'unknown'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_invalid_ids_return_400(self):
+        for value in ('²', '99999999999999999999999', 'abc'):
+            with self.subTest(value=value):
+                response = self.client.get(self.url, {'tag': value})
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(response.data, {'tag': [f'"{value}" is not a valid id.']})
+
+    def test_ordering(self):
+        self.assertEqual(self._names(ordering='-name'), ["Write report", "Plan sprint", "Deploy"])
+
+    def test_search_matches_tasks_and_comments(self):
+        self.assertEqual(self._names(search='quarterly'), ["Write report"])
+        self.assertEqual(self._names(search='rollback check'), ["Deploy"])
+
+        self.late.name = "Write summary"
+        self.late.description = ""
+        self.late.save()
+        self.assertEqual(self._names(search='quarterly'), [])
+
+        self.done.comments.all().delete()
+        self.assertEqual(self._names(search='rollback'), [])
+
+    def test_search_ignores_query_syntax(self):
+        self.assertEqual(self._names(search='report" (*'), ["Write report"])
+
+
+class PostgresSearchSQLTest(TestCase):
+    def test_search_columns_follow_query_aliases(self):
+        # Compiled without a PostgreSQL server: the expressions are the same
+        # on every backend, only the table aliases matter here
+        queryset = PostgresSearchBackend().search(Task.objects.all(), 'report')
+        sql = str(queryset.query)
+        self.assertIn(
+            """to_tsvector('english', "tasks_task"."name" || ' ' || "tasks_task"."description") """
+            "@@ websearch_to_tsquery('english', report)",
+            sql,
+        )
+        self.assertIn("""FROM "tasks_comment" U0 WHERE (to_tsvector('english', U0."content") @@""", sql)
+        self.assertNotIn('tasks_comment.content', sql)
@@ -0,0 +1,166 @@
+# tasks/tests/test_import.py
+import io
+import json
+import os
+import tempfile
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+from users.models import CustomUser
+from tasks.export import export_project
+from tasks.importer import Checkpoint, TaskImporter, read_records
+from tasks.models import Project, ProjectStats, Task, Comment, Tag
+from tasks.stats import get_project_stats
+
+
+class TaskImportTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = CustomUser.objects.create_user(
+            username='testuser',
+            password='testpassword',
+            email='testuser@example.com',
+        )
+        self.other = CustomUser.objects.create_user(
+            username='otheruser',
+            password='otherpassword',
+            email='otheruser@example.com',
+        )
+        refresh = RefreshToken.for_user(self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+        self.project = Project.objects.create(owner=self.user, name="Target")
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def _records(self, tasks=6):
+        yield {'type': 'project', 'id': 100, 'name': "Old tracker", 'owner': 'otheruser@example.com'}
+        for index in range(tasks):
+            yield {'type': 'task', 'id': 1000 + index, 'project': 100, 'name': f"Task {index}",
+                   'status': 'completed' if index % 2 else 'todo', 'tags': ['legacy', f'tag-{index % 2}'],
+                   'assigned_to': ['testuser@example.com', 'nobody@example.com']}
+            yield {'type': 'comment', 'id': 5000 + index, 'task': 1000 + index, 'author': 'otheruser@example.com',
+                   'content': f"Comment {index}"}
+
+    def _write(self, name, records):
+        path = os.path.join(self.directory.name, name)
+        with open(path, 'w', encoding='utf-8') as output:
+            output.writelines(json.dumps(record) + '\n' for record in records)
+        return path
+
+    def test_import_creates_everything_in_chunks(self):
+        report = TaskImporter(self.user, chunk_size=4).run(self._records())
+        self.assertEqual((report['rows'], report['projects'], report['tasks'], report['comments']), (13, 1, 6, 6))
+        self.assertEqual(report['tags'], 3)
+
+        project = Project.objects.get(name="Old tracker")
+        self.assertEqual(project.owner, self.other)
+        self.assertEqual(project.tasks.count(), 6)
+        task = project.tasks.get(name="Task 1")
+        self.assertEqual(sorted(task.tags.values_list('name', flat=True)), ['legacy', 'tag-1'])
+        self.assertEqual(list(task.assigned_to.all()), [self.user])
+        self.assertEqual(task.comments.get().author, self.other)
+        self.assertEqual(get_project_stats(project)['status_counts'], {'todo': 3, 'in_progress': 0, 'completed': 3})
+
+    def test_unknown_references_are_skipped(self):
+        records = [
+            {'type': 'task', 'project': 999, 'name': "Orphan"},
+            {'type': 'comment', 'task': 999, 'content': "Orphan"},
+            {'type': 'task', 'project': 999, 'name': "Bad", 'status': 'nope'},
+            {'type': 'widget'},
+        ]
+        report = TaskImporter(self.user).run(records)
+        self.assertEqual((report['tasks'], report['comments'], report['skipped']), (0, 0, 4))
+        self.assertEqual(len(report['errors']), 4)
+
+    def test_malformed_rows_are_skipped(self):
+        url = reverse('project-import-tasks', kwargs={'pk': self.project.pk})
+        records = [
+            {'type': 'task', 'id': 1, 'name': "Before"},
+            {'type': 'task', 'id': 2, 'name': 5},
+            {'type': 'task', 'id': 3, 'name': "Numeric due date", 'due_date': 20240101},
+            {'type': 'task', 'id': 4, 'name': "Dict description", 'description': {'a': 1}},
+            {'type': 'task', 'id': 5, 'name': "Bad due date", 'due_date': '2024-13-45T00:00:00Z'},
+            {'type': 'task', 'id': 6, 'name': "Bad tags", 'tags': [1]},
+            {'type': 'comment', 'id': 7, 'task': [1], 'content': "List task"},
+            {'type': ['task']},
+            {'type': 'task', 'id': 8, 'name': "After", 'due_date': '2024-01-01T00:00:00Z'},
+            {'type': 'comment', 'id': 9, 'task': 8, 'content': "Kept"},
+        ]
+        body = ''.join(json.dumps(record) + '\n' for record in records)
+        response = self.client.post(url, {'file': SimpleUploadedFile('tasks.ndjson', body.encode())})
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual((response.data['tasks'], response.data['comments'], response.data['skipped']), (2, 1, 7))
+        self.assertEqual([error['id'] for error in response.data['errors']], [2, 3, 4, 5, 6, 7, None])
+        self.assertEqual(sorted(self.project.tasks.values_list('name', flat=True)), ["After", "Before"])
+
+    def test_malformed_csv_ids_are_skipped(self):
+        lines = io.StringIO('type,id,project,name\ntask,x,100,Bad\ntask,2,100,Good\n', newline='')
+        report = TaskImporter(self.user, project=self.project).run(read_records(lines, 'csv'))
+        self.assertEqual((report['tasks'], report['skipped']), (1, 1))
+        self.assertEqual(report['errors'], [{'id': 'x', 'error': 'id must be an integer.'}])
+
+    def test_command_resumes_from_the_checkpoint(self):
+        path = self._write('tasks.ndjson', self._records())
+        checkpoint = Checkpoint(path + '.checkpoint')
+        # A run that stopped after the first two chunks
+        TaskImporter(self.user, chunk_size=4, checkpoint=checkpoint).run(list(self._records())[:8])
+
+        out = io.StringIO()
+        call_command('import_tasks', path, user='testuser@example.com', chunk_size=4, stdout=out)
+        self.assertIn('Resumed after row 8', out.getvalue())
+        self.assertEqual(Project.objects.filter(name="Old tracker").count(), 1)
+        self.assertEqual(Task.objects.count(), 6)
+        self.assertEqual(Comment.objects.count(), 6)
+
+    def test_round_trip_through_export(self):
+        # Usernames can repeat, emails cannot
+        namesake = CustomUser.objects.create_user(
+            username='otheruser', password='namesakepassword', email='namesake@example.com',
+        )
+        source = Project.objects.create(owner=self.user, name="Source")
+        task = Task.objects.create(project=source, name="Exported, with \"quotes\"", status='in_progress')
+        task.tags.add(Tag.objects.create(name="urgent"))
+        task.assigned_to.add(self.other)
+        Comment.objects.create(task=task, author=namesake, content="Line one\nline two")
+
+        for fmt in ('ndjson', 'csv'):
+            with self.subTest(format=fmt):
+                lines = io.StringIO(''.join(export_project(source, fmt)), newline='')
+                TaskImporter(self.user, project=self.project).run(read_records(lines, fmt))
+                imported = self.project.tasks.get(name=task.name)
+                self.assertEqual(imported.status, 'in_progress')
+                self.assertEqual(list(imported.tags.values_list('name', flat=True)), ['urgent'])
+                self.assertEqual(list(imported.assigned_to.all()), [self.other])
+                comment = imported.comments.get()
+                self.assertEqual((comment.author, comment.content), (namesake, "Line one\nline two"))
+                imported.delete()
+
+    def test_upload_endpoint(self):
+        url = reverse('project-import-tasks', kwargs={'pk': self.project.pk})
+        body = ''.join(json.dumps(record) + '\n' for record in self._records(tasks=2))
+        response = self.client.post(url, {'file': SimpleUploadedFile('tasks.ndjson', body.encode())})
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(response.data['tasks'], 2)
+        self.assertEqual(self.project.tasks.count(), 2)
+        self.assertTrue(ProjectStats.objects.filter(project=self.project).exists())
+
+        response = self.client.post(url, {'file': SimpleUploadedFile('tasks.ndjson', b'not json\n')})
+        self.assertEqual(response.status_code, 400)
+
+    def test_upload_cannot_post_comments_as_someone_else(self):
+        url = reverse('project-import-tasks', kwargs={'pk': self.project.pk})
+        body = ''.join(json.dumps(record) + '\n' for record in self._records(tasks=1))
+        response = self.client.post(url, {'file': SimpleUploadedFile('tasks.ndjson', body.encode())})
+        self.assertEqual(response.status_code, 200, response.data)
+        comment = Comment.objects.get(task__project=self.project)
+        self.assertEqual(comment.author, self.user)
+
+    def test_members_cannot_upload(self):
+        shared = Project.objects.create(owner=self.other, name="Shared")
+        shared.members.add(self.user)
+        url = reverse('project-import-tasks', kwargs={'pk': shared.pk})
+        response = self.client.post(url, {'file': SimpleUploadedFile('tasks.ndjson', b'')})
+        self.assertEqual(response.status_code, 403)
@@ -0,0 +1,90 @@
+# tasks/tests/test_indexes.py
+import re
+from unittest import skipUnless
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+from users.models import CustomUser
+from tasks.models import Project, Task, Comment, Tag
+
+
+@skipUnless(connection.vendor == 'sqlite', 'Query plans are checked on SQLite')
+class QueryPlanTest(APITestCase):
+    """
+    Run the main endpoints, then `EXPLAIN QUERY PLAN` every SELECT they
+    issued and fail on full table scans or temporary sort B-trees.
+    """
+    # Sorting the handful of tags prefetched for a page is acceptable
+    allowed_temp_btree_tables = ('tasks_tag',)
+
+    def setUp(self):
+        cache.clear()
+        self.user = CustomUser.objects.create_user(
+            username='testuser',
+            password='testpassword',
+            email='testuser@example.com',
+        )
+        refresh = RefreshToken.for_user(self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+
+        self.project = Project.objects.create(owner=self.user, name="Project 1")
+        self.project.members.add(
+            CustomUser.objects.create_user(username='member', password='memberpassword', email='member@example.com')
+        )
+        tag = Tag.objects.create(name='backend')
+        for index in range(3):
+            task = Task.objects.create(project=self.project, name=f"Task {index}")
+            task.tags.add(tag)
+            task.assigned_to.add(self.user)
+            Comment.objects.create(task=task, author=self.user, content="Comment")
+        Comment.objects.create(task=task, author=self.user, content="Reply")
+        self.task = task
+
+    def _plans(self, url):
+        cache.clear()  # Include the membership lookup
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200, url)
+
+        plans = []
+        with connection.cursor() as cursor:
+            for query in context.captured_queries:
+                if not query['sql'].startswith('SELECT'):
+                    continue
+                cursor.execute(f"EXPLAIN QUERY PLAN {query['sql']}")
+                plans.append((query['sql'], [row[-1] for row in cursor.fetchall()]))
+        return response, plans
+
+    def assertIndexedPlans(self, url):
+        response, plans = self._plans(url)
+        for sql, plan in plans:
+            main_table = re.search(r'FROM "(\w+)"', sql).group(1)
+            for step in plan:
+                self.assertIsNone(
+                    re.match(r'SCAN (?!CONSTANT ROW)', step),
+                    f'Full scan in {url}:\n{sql}\n{plan}',
+                )
+                if main_table not in self.allowed_temp_btree_tables:
+                    self.assertNotIn('TEMP B-TREE', step, f'Temporary sort in {url}:\n{sql}\n{plan}')
+        return response
+
+    def test_project_endpoints_use_indexes(self):
+        self.assertIndexedPlans(reverse('project-list'))
+        self.assertIndexedPlans(reverse('project-list') + '?view=summary')
+        self.assertIndexedPlans(reverse('project-detail', kwargs={'pk': self.project.pk}))
+
+    def test_task_endpoints_use_indexes(self):
+        url = reverse('project-tasks-list', kwargs={'project_pk': self.project.pk})
+        self.assertIndexedPlans(url)
+        self.assertIndexedPlans(f'{url}?status=todo')
+        response = self.assertIndexedPlans(f'{url}?page_size=2')
+        self.assertIndexedPlans(response.data['next'])
+
+    def test_comment_endpoints_use_indexes(self):
+        url = reverse('task-comments-list', kwargs={'project_pk': self.project.pk, 'task_pk': self.task.pk})
+        self.assertIndexedPlans(url)
+        response = self.assertIndexedPlans(f'{url}?page_size=1')
+        self.assertIndexedPlans(response.data['next'])
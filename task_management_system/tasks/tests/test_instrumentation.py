@@ -0,0 +1,103 @@
+# tasks/tests/test_instrumentation.py
+import json
+from django.core.cache import cache
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+from task_management_system.instrumentation import measure, query_budgets
+from users.models import CustomUser
+from tasks.models import Project, Task, Comment, Tag
+
+# Queries per request with a cold cache: the user and membership lookups
+# are included. Raise a budget only together with the change that needs it.
+QUERY_BUDGETS = {
+    'ProjectViewSet.list': 8,
+    'ProjectViewSet.retrieve': 8,
+    'ProjectViewSet.stats': 6,
+    'TaskViewSet.list': 6,
+    'TaskViewSet.retrieve': 6,
+    'CommentViewSet.list': 4,
+    'TagViewSet.list': 2,
+    'sync': 9,
+}
+
+
+class InstrumentationTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = CustomUser.objects.create_user(
+            username='testuser',
+            password='testpassword',
+            email='testuser@example.com',
+        )
+        refresh = RefreshToken.for_user(self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+        self.project = Project.objects.create(owner=self.user, name="Project 1")
+        self.project.members.add(
+            CustomUser.objects.create_user(username='member', password='memberpassword', email='member@example.com')
+        )
+        tag = Tag.objects.create(name='backend')
+        for index in range(5):
+            task = Task.objects.create(project=self.project, name=f"Task {index}")
+            task.tags.add(tag)
+            task.assigned_to.add(self.user)
+            Comment.objects.create(task=task, author=self.user, content="Comment")
+        self.task = task
+
+    def _urls(self):
+        project = {'pk': self.project.pk}
+        task = {'project_pk': self.project.pk, 'pk': self.task.pk}
+        nested = {'project_pk': self.project.pk, 'task_pk': self.task.pk}
+        return [
+            reverse('project-list'),
+            reverse('project-detail', kwargs=project),
+            reverse('project-stats', kwargs=project),
+            reverse('project-tasks-list', kwargs={'project_pk': self.project.pk}),
+            reverse('project-tasks-detail', kwargs=task),
+            reverse('task-comments-list', kwargs=nested),
+            reverse('task-tags-list', kwargs=nested),
+            reverse('sync'),
+        ]
+
+    def test_query_budgets(self):
+        for url in self._urls():
+            cache.clear()
+            with query_budgets(QUERY_BUDGETS):
+                self.assertEqual(self.client.get(url).status_code, 200, url)
+
+    def test_exceeded_budget_fails(self):
+        with self.assertRaisesMessage(AssertionError, 'TaskViewSet.list ran'):
+            with query_budgets({'TaskViewSet.list': 1}):
+                self.client.get(reverse('project-tasks-list', kwargs={'project_pk': self.project.pk}))
+
+    @override_settings(SERVER_TIMING=True)
+    def test_server_timing_header(self):
+        url = reverse('project-tasks-list', kwargs={'project_pk': self.project.pk})
+        self.client.get(url)
+        with self.assertNumQueries(4):
+            response = self.client.get(url)
+        entries = [entry.strip() for entry in response['Server-Timing'].split(',')]
+        self.assertTrue(entries[0].startswith('db;dur='))
+        self.assertIn('desc="4 queries"', entries[0])
+        self.assertEqual([entry.split(';')[0] for entry in entries[1:]], ['render', 'app', 'total'])
+
+        with override_settings(SERVER_TIMING=False):
+            self.assertNotIn('Server-Timing', self.client.get(url))
+
+    def test_log_line(self):
+        url = reverse('project-list')
+        with self.assertLogs('task_management_system.middleware', 'INFO') as logs:
+            self.client.get(url)
+        record = json.loads(logs.records[-1].getMessage())
+        self.assertEqual((record['view'], record['status'], record['path']), ('ProjectViewSet.list', 200, url))
+        self.assertGreater(record['queries'], 0)
+        self.assertLessEqual(record['db_ms'], record['total_ms'])
+
+    def test_duplicates(self):
+        with measure() as metrics:
+            for task in Task.objects.order_by('pk'):
+                list(task.tags.all())
+        self.assertEqual(metrics.queries, 6)
+        self.assertEqual(metrics.duplicates, 4)
+        self.assertIn('tasks_task_tags', metrics.most_duplicated()[0])
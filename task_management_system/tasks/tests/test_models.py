@@ -1,13 +1,19 @@
 # tasks/tests/test_models.py
 from rest_framework.test import APITestCase
 from rest_framework_simplejwt.tokens import RefreshToken
+from datetime import timedelta
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils import timezone
 from users.models import CustomUser
-from tasks.models import Project
+from tasks.models import Project, Task, Tag
 
 
 class ProjectViewSetTest(APITestCase):
     def setUp(self):
+        cache.clear()
         self.user = CustomUser.objects.create_user(
             username='testuser',
             password='testpassword',
@@ -44,3 +50,61 @@ class ProjectViewSetTest(APITestCase):
         self.assertEqual(response.status_code, 200)
         project_ids = [project['id'] for project in response.data]
         self.assertNotIn(other_project.id, project_ids)
+
+    def _add_project_tree(self, index, task_count):
+        member = CustomUser.objects.create_user(
+            username=f'member{index}',
+            password='memberpassword',
+            email=f'member{index}@example.com',
+        )
+        project = Project.objects.create(owner=self.user, name=f"Tree Project {index}")
+        project.members.add(member)
+        tag = Tag.objects.create(name=f'tag{index}')
+        for task_index in range(task_count):
+            task = Task.objects.create(project=project, name=f"Task {index}-{task_index}")
+            task.tags.add(tag)
+            task.assigned_to.add(member, self.user)
+
+    def _count_list_queries(self):
+        url = reverse('project-list')
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(context.captured_queries)
+
+    def test_project_list_query_count_is_constant(self):
+        self._count_list_queries()  # Warm the authenticated user cache
+        self._add_project_tree(0, task_count=2)
+        baseline = self._count_list_queries()
+
+        for index in range(1, 6):
+            self._add_project_tree(index, task_count=5)
+        self.assertEqual(self._count_list_queries(), baseline)
+
+    def test_project_summary_view_returns_aggregates(self):
+        member = CustomUser.objects.create_user(
+            username='member',
+            password='memberpassword',
+            email='member@example.com',
+        )
+        self.project1.members.add(member)
+        soon = timezone.now() + timedelta(days=1)
+        Task.objects.create(project=self.project1, name="Todo", due_date=soon + timedelta(days=1))
+        Task.objects.create(project=self.project1, name="Doing", status='in_progress', due_date=soon)
+        Task.objects.create(project=self.project1, name="Done", status='completed', due_date=timezone.now())
+
+        url = reverse('project-list')
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url, {'view': 'summary'})
+        self.assertEqual(response.status_code, 200)
+        # The user, their (cold) project membership, the ETag aggregate and
+        # the annotated projects
+        self.assertEqual(len(context.captured_queries), 4)
+
+        summary = {project['id']: project for project in response.data}[self.project1.id]
+        self.assertNotIn('tasks', summary)
+        self.assertEqual(summary['task_count'], 3)
+        self.assertEqual(summary['member_count'], 1)
+        self.assertEqual(summary['task_status_counts'], {'todo': 1, 'in_progress': 1, 'completed': 1})
+        self.assertEqual(summary['next_due_date'], soon.isoformat().replace('+00:00', 'Z'))
+        self.assertTrue(summary['is_owner'])
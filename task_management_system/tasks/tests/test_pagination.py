@@ -0,0 +1,66 @@
+# tasks/tests/test_pagination.py
+from datetime import timedelta
+from django.core.cache import cache
+from django.db.models import F
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+from users.models import CustomUser
+from tasks.models import Project, Task
+from tasks.pagination import KeysetPagination
+
+
+class KeysetPaginationTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = CustomUser.objects.create_user(
+            username='testuser',
+            password='testpassword',
+            email='testuser@example.com',
+        )
+        refresh = RefreshToken.for_user(self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+
+        self.project = Project.objects.create(owner=self.user, name="Project 1")
+        now = timezone.now()
+        # Duplicate names and NULL due dates exercise the tie-breakers
+        for index in range(7):
+            due_date = None if index % 3 == 0 else now + timedelta(days=index % 2)
+            Task.objects.create(project=self.project, name=f"Task {index % 2}", due_date=due_date)
+        self.url = reverse('project-tasks-list', kwargs={'project_pk': self.project.pk})
+
+    def test_list_is_unpaginated_by_default(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data), 7)
+
+    def test_pages_follow_model_ordering_without_gaps(self):
+        expected = list(self.client.get(self.url).data)
+        seen = []
+        url = f'{self.url}?page_size=3'
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertLessEqual(len(response.data['results']), 3)
+            seen.extend(response.data['results'])
+            url = response.data['next']
+
+        self.assertEqual([task['id'] for task in seen], [task['id'] for task in expected])
+
+    def test_invalid_cursor_returns_404(self):
+        response = self.client.get(f'{self.url}?cursor=not-a-cursor')
+        self.assertEqual(response.status_code, 404)
+
+    def test_seek_when_nulls_sort_largest(self):
+        # PostgreSQL's NULL order, emulated on any backend
+        pagination = KeysetPagination()
+        for ordering in (['due_date', 'name', 'pk'], ['-due_date', 'name', 'pk']):
+            order_by = [F(name[1:]).desc(nulls_first=True) if name.startswith('-') else F(name).asc(nulls_last=True)
+                        for name in ordering]
+            rows = list(Task.objects.order_by(*order_by))
+            for index, row in enumerate(rows):
+                with self.subTest(ordering=ordering, row=index):
+                    values = [pagination._value(row, name.lstrip('-')) for name in ordering]
+                    after = pagination._after(Task, ordering, values, nulls_largest=True)
+                    self.assertEqual(list(Task.objects.filter(after).order_by(*order_by)), rows[index + 1:])
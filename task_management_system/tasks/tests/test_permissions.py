@@ -0,0 +1,99 @@
+# tasks/tests/test_permissions.py
+from types import SimpleNamespace
+from django.core.cache import cache
+from django.test import TestCase
+from users.models import CustomUser
+from tasks.models import Project, Task, Comment, Tag, TaskTag
+from tasks.membership import get_membership
+from tasks.permissions import IsProjectOwnerOrMember
+
+
+class IsProjectOwnerOrMemberTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.owner = CustomUser.objects.create_user(
+            username='owner', password='ownerpassword', email='owner@example.com',
+        )
+        self.member = CustomUser.objects.create_user(
+            username='member', password='memberpassword', email='member@example.com',
+        )
+        self.outsider = CustomUser.objects.create_user(
+            username='outsider', password='outsiderpassword', email='outsider@example.com',
+        )
+        self.project = Project.objects.create(owner=self.owner, name="Project 1")
+        self.project.members.add(self.member)
+        self.task = Task.objects.create(project=self.project, name="Task 1")
+        self.comment = Comment.objects.create(task=self.task, author=self.owner, content="Hello")
+        self.permission = IsProjectOwnerOrMember()
+
+    def _check(self, user, obj, method='GET', request=None):
+        request = request or SimpleNamespace(user=user, method=method)
+        return self.permission.has_object_permission(request, None, obj)
+
+    def test_members_can_read_project_objects(self):
+        for obj in (self.project, self.task, self.comment):
+            self.assertTrue(self._check(self.owner, obj))
+            self.assertTrue(self._check(self.member, obj))
+            self.assertFalse(self._check(self.outsider, obj))
+
+    def test_only_owner_can_modify_project(self):
+        self.assertTrue(self._check(self.owner, self.project, 'PUT'))
+        self.assertFalse(self._check(self.member, self.project, 'PUT'))
+        self.assertTrue(self._check(self.member, self.task, 'PUT'))
+
+    def test_membership_is_memoized_per_request(self):
+        comment = Comment.objects.select_related('task').get(pk=self.comment.pk)
+        request = SimpleNamespace(user=self.member, method='GET')
+        with self.assertNumQueries(1):
+            self.assertTrue(self._check(self.member, self.project, request=request))
+        with self.assertNumQueries(0):
+            self.assertTrue(self._check(self.member, self.task, request=request))
+            self.assertTrue(self._check(self.member, comment, request=request))
+
+    def test_membership_cache_is_invalidated(self):
+        self.assertFalse(self._check(self.outsider, self.project))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.project.members.add(self.outsider)
+        self.assertTrue(self._check(self.outsider, self.project))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.outsider.member_projects.remove(self.project)
+        self.assertFalse(self._check(self.outsider, self.project))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            other = Project.objects.create(owner=self.outsider, name="Other")
+        self.assertIn(other.pk, get_membership(self.outsider).owned)
+        other.owner = self.owner
+        with self.captureOnCommitCallbacks(execute=True):
+            other.save()
+        self.assertNotIn(other.pk, get_membership(self.outsider).owned)
+        self.assertIn(other.pk, get_membership(self.owner).owned)
+
+    def test_membership_cache_is_invalidated_on_commit(self):
+        # A lookup before the commit must not be cached under the new version
+        self.assertFalse(self._check(self.outsider, self.project))
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.project.members.add(self.outsider)
+            self.assertFalse(self._check(self.outsider, self.project))
+        for callback in callbacks:
+            callback()
+        self.assertTrue(self._check(self.outsider, self.project))
+
+    def test_tag_check_is_one_query_regardless_of_fan_out(self):
+        # A tag used by 10k tasks, none of them in a project the user can see
+        other_owner = CustomUser.objects.create_user(
+            username='other', password='otherpassword', email='other@example.com',
+        )
+        other_project = Project.objects.create(owner=other_owner, name="Other")
+        tasks = Task.objects.bulk_create(
+            Task(project=other_project, name=f"Task {index}") for index in range(10000)
+        )
+        tag = Tag.objects.create(name='busy')
+        TaskTag.objects.bulk_create(TaskTag(tag=tag, task=task) for task in tasks)
+
+        get_membership(self.member)
+        with self.assertNumQueries(1):
+            self.assertFalse(self._check(self.member, tag))
+
+        tag.tagged_tasks.add(self.task)
+        with self.assertNumQueries(1):
+            self.assertTrue(self._check(self.member, tag))
@@ -0,0 +1,90 @@
+# tasks/tests/test_project_cache.py
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+from users.models import CustomUser
+from tasks.models import Project, Task, Tag
+from tasks.project_cache import cache_stats
+
+
+class ProjectPayloadCacheTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = CustomUser.objects.create_user(
+            username='testuser',
+            password='testpassword',
+            email='testuser@example.com',
+        )
+        self.member = CustomUser.objects.create_user(
+            username='member',
+            password='memberpassword',
+            email='member@example.com',
+        )
+        self._login(self.user)
+        self.project = Project.objects.create(owner=self.user, name="Project 1")
+        self.project.members.add(self.member)
+        self.tag = Tag.objects.create(name="urgent")
+        self.task = Task.objects.create(project=self.project, name="Task 1")
+        self.task.tags.add(self.tag)
+        self.task.assigned_to.add(self.member)
+        self.url = reverse('project-detail', kwargs={'pk': self.project.pk})
+
+    def _login(self, user):
+        refresh = RefreshToken.for_user(user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+
+    def _get(self, url=None):
+        response = self.client.get(url or self.url)
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_second_read_skips_the_task_tree(self):
+        self._get(reverse('project-list'))
+        with CaptureQueriesContext(connection) as context:
+            data = self._get(reverse('project-list'))
+        # The ETag aggregate and the projects; no prefetches
+        self.assertEqual(len(context.captured_queries), 2)
+        self.assertEqual(data[0]['tasks'][0]['tags'], [{'id': self.tag.pk, 'name': 'urgent'}])
+        self.assertEqual(cache_stats(), {'hits': 1, 'misses': 1, 'hit_ratio': 0.5})
+
+    def test_is_owner_is_patched_per_user(self):
+        self.assertTrue(self._get()['is_owner'])
+        self._login(self.member)
+        self.assertFalse(self._get()['is_owner'])
+        self.assertEqual(cache_stats()['hits'], 1)
+
+    def test_changes_invalidate_the_payload(self):
+        self._get()
+
+        self.task.name = "Renamed task"
+        self.task.save()
+        self.assertEqual(self._get()['tasks'][0]['name'], "Renamed task")
+
+        self.tag.name = "later"
+        self.tag.save()
+        self.assertEqual(self._get()['tasks'][0]['tags'][0]['name'], "later")
+
+        self.member.first_name = "Ada"
+        self.member.save()
+        self.assertEqual(self._get()['members'][0]['first_name'], "Ada")
+
+        self.project.members.remove(self.member)
+        self.assertEqual(self._get()['members'], [])
+
+        Task.objects.create(project=self.project, name="Task 2")
+        self.assertEqual(len(self._get()['tasks']), 2)
+
+    def test_stats_are_staff_only(self):
+        url = reverse('project-cache-stats')
+        self.assertEqual(self.client.get(url).status_code, 403)
+
+        self.user.is_staff = True
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.save()
+        self._get()
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['misses'], 1)
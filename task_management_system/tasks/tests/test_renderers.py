@@ -0,0 +1,111 @@
+# tasks/tests/test_renderers.py
+import gzip
+import io
+from datetime import datetime, timezone as dt_timezone
+from decimal import Decimal
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import override_settings
+from django.urls import reverse
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+from task_management_system.middleware import brotli
+from task_management_system.renderers import FastJSONParser, FastJSONRenderer
+from users.models import CustomUser
+from tasks.models import Project, Task
+
+
+class FastJSONTest(APITestCase):
+    def test_renders_what_drf_renders(self):
+        data = {
+            'when': datetime(2024, 5, 1, 12, 30, 15, 123456, tzinfo=dt_timezone.utc),
+            'amount': Decimal('1.50'),
+            'text': 'Ünïcode "quoted"\n ',
+            'lazy': gettext_lazy('Not found.'),
+            'nested': [{1: None, 'b': [True, 2.5]}],
+        }
+        self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+        # Beyond orjson's integers
+        data['big'] = 2 ** 70
+        self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+        self.assertEqual(FastJSONRenderer().render(None), b'')
+
+    def test_indented_output_uses_the_stdlib(self):
+        data = {'a': [1, 2]}
+        self.assertEqual(
+            FastJSONRenderer().render(data, 'application/json; indent=4'),
+            JSONRenderer().render(data, 'application/json; indent=4'),
+        )
+
+    def test_parser(self):
+        parser = FastJSONParser()
+        self.assertEqual(parser.parse(io.BytesIO('{"name": "Tâche"}'.encode())), {'name': 'Tâche'})
+        with self.assertRaises(ParseError):
+            parser.parse(io.BytesIO(b'{"name": '))
+
+
+class CompressionTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = CustomUser.objects.create_user(
+            username='testuser',
+            password='testpassword',
+            email='testuser@example.com',
+        )
+        refresh = RefreshToken.for_user(self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+        self.project = Project.objects.create(owner=self.user, name="Project 1")
+        for index in range(40):
+            Task.objects.create(project=self.project, name=f"Task {index}", description="Details " * 10)
+        self.url = reverse('project-list')
+
+    def test_large_responses_are_gzipped(self):
+        plain = self.client.get(self.url)
+        self.assertNotIn('Content-Encoding', plain)
+        self.assertEqual(plain.content, JSONRenderer().render(plain.data))
+
+        response = self.client.get(self.url, HTTP_ACCEPT_ENCODING='gzip, deflate')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertEqual(gzip.decompress(response.content), plain.content)
+        self.assertEqual(int(response['Content-Length']), len(response.content))
+        self.assertLess(len(response.content), len(plain.content))
+
+    def test_brotli_when_available(self):
+        response = self.client.get(self.url, HTTP_ACCEPT_ENCODING='br;q=1.0, gzip;q=0.5')
+        self.assertEqual(response['Content-Encoding'], 'br' if brotli is not None else 'gzip')
+
+    def test_gzip_is_padded_against_breach(self):
+        first = self.client.get(self.url, HTTP_ACCEPT_ENCODING='gzip')
+        second = self.client.get(self.url, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(gzip.decompress(first.content), gzip.decompress(second.content))
+        self.assertNotEqual(first.content, second.content)
+
+    @override_settings(COMPRESSION_MIN_SIZE=1)
+    def test_auth_responses_are_never_brotli(self):
+        self.client.credentials()
+        response = self.client.post(reverse('jwt-create'), {
+            'email': 'testuser@example.com', 'password': 'testpassword',
+        }, HTTP_ACCEPT_ENCODING='br, gzip')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn(b'access', gzip.decompress(response.content))
+
+    def test_not_compressed(self):
+        self.assertNotIn('Content-Encoding', self.client.get(self.url, HTTP_ACCEPT_ENCODING='gzip;q=0'))
+        with override_settings(COMPRESSION_MIN_SIZE=10 ** 7):
+            self.assertNotIn('Content-Encoding', self.client.get(self.url, HTTP_ACCEPT_ENCODING='gzip'))
+
+        url = reverse('project-export', kwargs={'pk': self.project.pk})
+        response = self.client.get(url, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertTrue(response.streaming)
+        self.assertNotIn('Content-Encoding', response)
+
+    def test_benchmark_command(self):
+        out = io.StringIO()
+        call_command('benchmark_json', self.project.pk, repeat=1, stdout=out)
+        self.assertIn('40 tasks', out.getvalue())
+        self.assertIn('gzip', out.getvalue())
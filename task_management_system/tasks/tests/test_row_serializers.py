@@ -0,0 +1,97 @@
+# tasks/tests/test_row_serializers.py
+import json
+from datetime import timedelta
+from io import StringIO
+from django.core.cache import cache
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+from rest_framework.utils.encoders import JSONEncoder
+from rest_framework_simplejwt.tokens import RefreshToken
+from users.models import CustomUser
+from tasks.models import Project, Task, Comment, Tag
+from tasks.row_serializers import CommentRowSerializer, TaskRowSerializer
+from tasks.serializers import CommentSerializer, TaskSerializer
+
+
+def as_json(data):
+    return json.loads(json.dumps(data, cls=JSONEncoder))
+
+
+class RowSerializerParityTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = CustomUser.objects.create_user(
+            username='testuser',
+            password='testpassword',
+            email='testuser@example.com',
+            first_name='Test',
+        )
+        self.other = CustomUser.objects.create_user(
+            username='otheruser',
+            password='otherpassword',
+            email='otheruser@example.com',
+        )
+        refresh = RefreshToken.for_user(self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+        self.project = Project.objects.create(owner=self.user, name="Project 1")
+        self.project.members.add(self.other)
+
+        tags = [Tag.objects.create(name=name) for name in ('b-tag', 'a-tag', 'c-tag')]
+        soon = timezone.now() + timedelta(days=1, microseconds=123)
+        for index in range(6):
+            task = Task.objects.create(
+                project=self.project,
+                name=f"Task {index % 3}",
+                description="Ünïcode \"quoted\"\nline" if index % 2 else '',
+                status=['todo', 'in_progress', 'completed'][index % 3],
+                due_date=soon if index % 2 else None,
+            )
+            task.tags.add(*tags[:index % 4])
+            task.assigned_to.add(*[self.other, self.user][:index % 3])
+            Comment.objects.create(task=task, author=[self.user, self.other][index % 2], content=f"Comment {index}")
+        self.task = task
+
+    def test_tasks_match_task_serializer(self):
+        tasks = Task.objects.filter(project=self.project).order_by('due_date', 'name', 'pk')
+        expected = as_json(TaskSerializer(tasks.with_relations(), many=True).data)
+        self.assertEqual(as_json(TaskRowSerializer(TaskRowSerializer.values(tasks)).data), expected)
+        self.assertTrue(any(len(task['tags']) > 1 and len(task['assigned_to']) > 1 for task in expected))
+
+    def test_comments_match_comment_serializer(self):
+        comments = Comment.objects.filter(task__project=self.project).order_by('created_at', 'pk')
+        expected = as_json(CommentSerializer(comments, many=True).data)
+        self.assertEqual(as_json(CommentRowSerializer(CommentRowSerializer.values(comments)).data), expected)
+
+    def test_list_endpoints(self):
+        url = reverse('project-tasks-list', kwargs={'project_pk': self.project.pk})
+        tasks = Task.objects.filter(project=self.project).order_by('-status', 'due_date', 'name').with_relations()
+        response = self.client.get(url, {'ordering': '-status,due_date,name'})
+        self.assertEqual(response.json(), as_json(TaskSerializer(tasks, many=True).data))
+
+        url = reverse('task-comments-list', kwargs={'project_pk': self.project.pk, 'task_pk': self.task.pk})
+        response = self.client.get(url)
+        self.assertEqual(response.json(), as_json(CommentSerializer(self.task.comments.all(), many=True).data))
+
+    def test_keyset_pages(self):
+        url = reverse('project-tasks-list', kwargs={'project_pk': self.project.pk})
+        names, next_url = [], url + '?page_size=4'
+        while next_url:
+            page = self.client.get(next_url).json()
+            names += [task['id'] for task in page['results']]
+            next_url = page['next']
+        expected = Task.objects.filter(project=self.project).order_by('due_date', 'name', 'pk')
+        self.assertEqual(names, list(expected.values_list('pk', flat=True)))
+
+    def test_queries_do_not_grow_with_rows(self):
+        url = reverse('project-tasks-list', kwargs={'project_pk': self.project.pk})
+        self.client.get(url)
+        with self.assertNumQueries(4):  # Validators, tasks, tags, assignees
+            self.client.get(url)
+
+    def test_benchmark_command(self):
+        out = StringIO()
+        call_command('benchmark_serializers', project=self.project.pk, repeat=1, stdout=out)
+        self.assertIn('TaskRowSerializer', out.getvalue())
+        self.assertIn('rows/s', out.getvalue())
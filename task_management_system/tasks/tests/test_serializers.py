@@ -0,0 +1,48 @@
+# tasks/tests/test_serializers.py
+from django.test import TestCase
+from users.models import CustomUser
+from tasks.models import Project, Task, Tag
+from tasks.serializers import TaskSerializer, sync_related
+
+
+class TaskSerializerWriteTest(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(
+            username='testuser',
+            password='testpassword',
+            email='testuser@example.com',
+        )
+        self.project = Project.objects.create(owner=self.user, name="Project 1")
+        self.tags = [Tag.objects.create(name=f'tag{index}') for index in range(5)]
+        self.task = Task.objects.create(project=self.project, name="Task 1")
+        self.task.tags.add(*self.tags[:3])
+        self.task.assigned_to.add(self.user)
+
+    def _update(self, data, partial=True):
+        serializer = TaskSerializer(self.task, data=data, partial=partial)
+        serializer.is_valid(raise_exception=True)
+        return serializer.save()
+
+    def test_related_ids_are_validated_in_one_query(self):
+        serializer = TaskSerializer(self.task, data={'tag_ids': [tag.pk for tag in self.tags]}, partial=True)
+        with self.assertNumQueries(1):
+            self.assertTrue(serializer.is_valid())
+
+    def test_unknown_ids_are_rejected(self):
+        serializer = TaskSerializer(self.task, data={'tag_ids': [self.tags[0].pk, 9999]}, partial=True)
+        self.assertFalse(serializer.is_valid())
+        self.assertEqual(serializer.errors['tag_ids'], ['Invalid pk "9999" - object does not exist.'])
+
+    def test_only_changed_relations_are_written(self):
+        tag_ids = [tag.pk for tag in self.tags[1:4]]
+        self._update({'tag_ids': tag_ids})
+        self.assertEqual(sorted(self.task.tags.values_list('pk', flat=True)), tag_ids)
+
+        # Unchanged ids: one read for the current rows, no writes
+        with self.assertNumQueries(1):
+            sync_related(self.task.tags, tag_ids)
+
+    def test_partial_update_leaves_relations_untouched(self):
+        self._update({'name': "Renamed"})
+        self.assertEqual(self.task.tags.count(), 3)
+        self.assertEqual(self.task.assigned_to.count(), 1)
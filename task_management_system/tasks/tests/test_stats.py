@@ -0,0 +1,101 @@
+# tasks/tests/test_stats.py
+from datetime import timedelta
+from io import StringIO
+from django.core.cache import cache
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+from users.models import CustomUser
+from tasks.models import AssigneeStats, Project, ProjectStats, Task
+from tasks.stats import get_project_stats, rebuild_project_stats
+
+
+class ProjectStatsTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = CustomUser.objects.create_user(
+            username='testuser',
+            password='testpassword',
+            email='testuser@example.com',
+        )
+        self.other = CustomUser.objects.create_user(
+            username='otheruser',
+            password='otherpassword',
+            email='otheruser@example.com',
+        )
+        refresh = RefreshToken.for_user(self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+        self.project = Project.objects.create(owner=self.user, name="Project 1")
+        self.project.members.add(self.other)
+
+        yesterday = timezone.now() - timedelta(days=1)
+        self.late = Task.objects.create(project=self.project, name="Late", due_date=yesterday)
+        self.doing = Task.objects.create(project=self.project, name="Doing", status='in_progress')
+        self.done = Task.objects.create(project=self.project, name="Done", status='completed', due_date=yesterday)
+        self.late.assigned_to.add(self.user, self.other)
+        self.done.assigned_to.add(self.other)
+
+    def _counted(self):
+        stats = get_project_stats(self.project)
+        assignees = {row['user'].pk: row['status_counts'] for row in stats['assignees']}
+        return stats['status_counts'], assignees
+
+    def _recounted(self):
+        rebuild_project_stats([self.project.pk])
+        return self._counted()
+
+    def assertCountsMatchTasks(self):
+        self.assertEqual(self._counted(), self._recounted())
+
+    def test_counts(self):
+        stats = get_project_stats(self.project)
+        self.assertEqual(stats['task_count'], 3)
+        self.assertEqual(stats['status_counts'], {'todo': 1, 'in_progress': 1, 'completed': 1})
+        self.assertEqual(stats['overdue_count'], 1)
+        other = next(row for row in stats['assignees'] if row['user'] == self.other)
+        self.assertEqual((other['status_counts']['completed'], other['open_count']), (1, 1))
+
+    def test_incremental_updates_match_a_recount(self):
+        changes = [
+            lambda: Task.objects.create(project=self.project, name="New"),
+            lambda: setattr(self.late, 'status', 'completed') or self.late.save(),
+            lambda: self.doing.assigned_to.add(self.other),
+            lambda: self.late.assigned_to.remove(self.user),
+            lambda: self.other.assigned_tasks.remove(self.done),
+            lambda: self.doing.assigned_to.clear(),
+            lambda: self.late.delete(),
+        ]
+        for change in changes:
+            change()
+            self.assertCountsMatchTasks()
+
+    def test_missing_rows_are_rebuilt(self):
+        ProjectStats.objects.all().delete()
+        AssigneeStats.objects.all().delete()
+        Task.objects.create(project=self.project, name="New")
+        self.assertEqual(self._counted()[0]['todo'], 2)
+
+        call_command('rebuild_task_stats', stdout=StringIO())
+        self.assertEqual(ProjectStats.objects.count(), 1)
+
+    def test_endpoint(self):
+        response = self.client.get(reverse('project-stats', kwargs={'pk': self.project.pk}))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['task_count'], 3)
+        self.assertEqual(response.data['assignees'][0]['user']['username'], 'testuser')
+
+        hidden = Project.objects.create(owner=self.other, name="Hidden")
+        response = self.client.get(reverse('project-stats', kwargs={'pk': hidden.pk}))
+        self.assertEqual(response.status_code, 404)
+
+    def test_bulk_endpoint_keeps_counts(self):
+        url = reverse('project-tasks-bulk', kwargs={'project_pk': self.project.pk})
+        response = self.client.post(url, {
+            'create': [{'name': "Bulk", 'status': 'completed', 'assigned_to_ids': [self.user.pk]}],
+            'update': [{'id': self.doing.pk, 'status': 'todo'}],
+            'delete': [self.late.pk],
+        }, format='json')
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertCountsMatchTasks()
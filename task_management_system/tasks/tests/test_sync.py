@@ -0,0 +1,143 @@
+# tasks/tests/test_sync.py
+from datetime import timedelta
+from django.core.cache import cache
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+from users.models import CustomUser
+from tasks.models import Project, Task, Comment, Tag, Tombstone
+from tasks.sync import encode_cursor
+
+
+class SyncTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = CustomUser.objects.create_user(
+            username='testuser',
+            password='testpassword',
+            email='testuser@example.com',
+        )
+        self.other = CustomUser.objects.create_user(
+            username='otheruser',
+            password='otherpassword',
+            email='otheruser@example.com',
+        )
+        refresh = RefreshToken.for_user(self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+        self.url = reverse('sync')
+
+        self.project = Project.objects.create(owner=self.user, name="Project 1")
+        self.project.members.add(self.other)
+        self.task = Task.objects.create(project=self.project, name="Task 1")
+        self.comment = Comment.objects.create(task=self.task, author=self.user, content="First")
+        self.quiet = Project.objects.create(owner=self.user, name="Quiet")
+        Task.objects.create(project=self.quiet, name="Untouched")
+        self.hidden = Project.objects.create(owner=self.other, name="Hidden")
+        Task.objects.create(project=self.hidden, name="Secret")
+
+    def _sync(self, since=None):
+        response = self.client.get(self.url, {'since': since} if since else {})
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def _since_now(self):
+        # A cursor without the overlap, so that only the changes below are seen
+        return encode_cursor(timezone.now())
+
+    def _ids(self, rows):
+        return sorted(row['id'] for row in rows)
+
+    def test_full_sync_without_cursor(self):
+        data = self._sync()
+        self.assertTrue(data['reset'])
+        self.assertEqual(self._ids(data['projects']), sorted([self.project.pk, self.quiet.pk]))
+        self.assertEqual([task['name'] for task in data['tasks']], ["Task 1", "Untouched"])
+        self.assertEqual(self._ids(data['comments']), [self.comment.pk])
+        self.assertEqual([(row['project'], row['user']['id']) for row in data['members']],
+                         [(self.project.pk, self.other.pk)])
+        self.assertTrue(data['cursor'])
+
+    def test_only_changes_since_the_cursor(self):
+        since = self._since_now()
+        new_task = Task.objects.create(project=self.project, name="Task 2")
+        self.comment.content = "Edited"
+        self.comment.save()
+
+        data = self._sync(since)
+        self.assertFalse(data['reset'])
+        self.assertEqual(self._ids(data['projects']), [self.project.pk])
+        self.assertEqual(self._ids(data['tasks']), [new_task.pk])
+        self.assertEqual([comment['content'] for comment in data['comments']], ["Edited"])
+        self.assertEqual(data['tags'], [])
+
+    def test_deletions_are_tombstoned(self):
+        tag = Tag.objects.create(name="urgent")
+        since = self._since_now()
+        task_id, comment_id, tag_id = self.task.pk, self.comment.pk, tag.pk
+        self.comment.delete()
+        self.task.delete()
+        tag.delete()
+        self.project.members.remove(self.other)
+
+        deleted = self._sync(since)['deleted']
+        self.assertEqual(deleted['tasks'], [task_id])
+        self.assertEqual(deleted['comments'], [comment_id])
+        self.assertEqual(deleted['tags'], [tag_id])
+        self.assertEqual(deleted['members'], [{'project': self.project.pk, 'user': self.other.pk}])
+        self.assertEqual(deleted['projects'], [])
+
+    def test_cascades_are_covered_by_the_parent(self):
+        since = self._since_now()
+        self.task.delete()
+        self.assertEqual(Tombstone.objects.filter(kind=Tombstone.COMMENT).count(), 0)
+
+        project_id = self.project.pk
+        self.project.delete()
+        self.assertEqual(Tombstone.objects.filter(kind__in=[Tombstone.TASK, Tombstone.MEMBER]).count(), 1)
+        deleted = self._sync(since)['deleted']
+        self.assertEqual(deleted['projects'], [project_id])
+
+        # Members see the deletion too
+        self.client.force_authenticate(self.other)
+        self.assertEqual(self._sync(since)['deleted']['projects'], [project_id])
+
+    def test_comments_of_a_deleted_user_are_tombstoned(self):
+        comment = Comment.objects.create(task=self.task, author=self.other, content="Second")
+        since = self._since_now()
+        other_id = self.other.pk
+        self.other.delete()
+
+        data = self._sync(since)
+        self.assertEqual(self._ids(data['projects']), [self.project.pk])
+        self.assertEqual(data['deleted']['comments'], [comment.pk])
+        self.assertEqual(data['deleted']['members'], [{'project': self.project.pk, 'user': other_id}])
+        # The tasks of the user's own project go with it
+        self.assertFalse(Tombstone.objects.filter(kind=Tombstone.TASK).exists())
+
+    def test_new_member_gets_the_whole_project(self):
+        self.client.force_authenticate(self.other)
+        since = self._since_now()
+        self.hidden.members.add(self.user)
+        self.quiet.members.add(self.other)
+
+        data = self._sync(since)
+        self.assertEqual(self._ids(data['projects']), sorted([self.quiet.pk, self.hidden.pk]))
+        self.assertEqual([task['name'] for task in data['tasks']], ["Untouched"])
+
+    def test_lost_access_drops_the_project(self):
+        self.client.force_authenticate(self.other)
+        since = self._since_now()
+        self.project.members.clear()
+
+        data = self._sync(since)
+        self.assertEqual(data['deleted']['projects'], [self.project.pk])
+        self.assertEqual(data['tasks'], [])
+
+    def test_old_or_invalid_cursor(self):
+        data = self._sync(encode_cursor(timezone.now() - timedelta(days=365)))
+        self.assertTrue(data['reset'])
+
+        response = self.client.get(self.url, {'since': 'nope'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('since', response.data)
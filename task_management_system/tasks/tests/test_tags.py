@@ -0,0 +1,41 @@
+# tasks/tests/test_tags.py
+from io import StringIO
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from users.models import CustomUser
+from tasks.models import Project, Task, Tag, TaskTag
+
+
+class MergeTagLinksTest(TestCase):
+    def setUp(self):
+        user = CustomUser.objects.create_user(
+            username='testuser',
+            password='testpassword',
+            email='testuser@example.com',
+        )
+        project = Project.objects.create(owner=user, name="Project 1")
+        self.task1 = Task.objects.create(project=project, name="Task 1")
+        self.task2 = Task.objects.create(project=project, name="Task 2")
+        self.tag = Tag.objects.create(name='backend')
+        self.task1.tags.add(self.tag)
+
+        # The table of the removed `Tag.tasks` relation, as older databases have it
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'CREATE TABLE tasks_tag_tasks (id integer PRIMARY KEY, tag_id bigint, task_id bigint)'
+            )
+            cursor.executemany(
+                'INSERT INTO tasks_tag_tasks (tag_id, task_id) VALUES (%s, %s)',
+                [(self.tag.pk, self.task1.pk), (self.tag.pk, self.task2.pk)],
+            )
+
+    def test_legacy_links_are_merged_without_duplicates(self):
+        call_command('merge_tag_links', '--drop-legacy', stdout=StringIO())
+
+        self.assertEqual(
+            sorted(TaskTag.objects.values_list('task_id', flat=True)),
+            [self.task1.pk, self.task2.pk],
+        )
+        self.assertEqual(list(self.tag.tagged_tasks.order_by('pk')), [self.task1, self.task2])
+        self.assertNotIn('tasks_tag_tasks', connection.introspection.table_names())
@@ -0,0 +1,59 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from django.utils import timezone
+from .models import Project, Task
+
+# Project and task ids collected while inside `deferred_touches()`
+_pending = ContextVar('tasks_pending_touches', default=None)
+
+
+def touch_projects(project_ids):
+    """
+    Bump `updated_at` of the given projects, so the project-level ETag and
+    Last-Modified change whenever anything below the project changes.
+    """
+    project_ids = {pk for pk in project_ids if pk is not None}
+    if not project_ids:
+        return
+    pending = _pending.get()
+    if pending is not None:
+        pending['projects'].update(project_ids)
+        return
+    Project.objects.filter(pk__in=project_ids).update(updated_at=timezone.now())
+
+
+def touch_tasks(task_ids):
+    """
+    Bump `updated_at` of the given tasks and of their projects.
+    """
+    task_ids = {pk for pk in task_ids if pk is not None}
+    if not task_ids:
+        return
+    pending = _pending.get()
+    if pending is not None:
+        pending['tasks'].update(task_ids)
+        return
+    now = timezone.now()
+    Task.objects.filter(pk__in=task_ids).update(updated_at=now)
+    Project.objects.filter(tasks__in=task_ids).update(updated_at=now)
+
+
+@contextmanager
+def deferred_touches():
+    """
+    Collect touches made inside the block (e.g. from signal handlers firing
+    once per deleted row) and flush them as a single update per model.
+    """
+    if _pending.get() is not None:
+        # Already collecting, the outermost block flushes
+        yield
+        return
+
+    pending = {'projects': set(), 'tasks': set()}
+    token = _pending.set(pending)
+    try:
+        yield
+    finally:
+        _pending.reset(token)
+    touch_tasks(pending['tasks'])
+    touch_projects(pending['projects'])
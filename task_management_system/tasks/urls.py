@@ -1,7 +1,7 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from rest_framework_nested.routers import NestedDefaultRouter
-from .views import check_permission, ProjectViewSet, TaskViewSet, CommentViewSet, TagViewSet, AllTagsViewSet
+from .views import check_permission, sync, ProjectViewSet, TaskViewSet, CommentViewSet, TagViewSet, AllTagsViewSet
 
 # Create a router and register our ViewSets with it.
 router = DefaultRouter()
@@ -23,4 +23,5 @@ urlpatterns = [
     path('', include(projects_router.urls)),
     path('', include(tasks_router.urls)),
     path('projects/<int:project_id>/check_permission/', check_permission, name='check-permission'),
+    path('sync/', sync, name='sync'),
 ]
@@ -1,21 +1,42 @@
+import csv
+import io
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404
-from django.db.models import Q
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.http import parse_etags
 from .models import Project, Task, Comment, Tag
 from .serializers import (
     ProjectSerializer,
+    ProjectStatsSerializer,
+    ProjectSummarySerializer,
+    TaskBulkSerializer,
     TaskSerializer,
     CommentSerializer,
     TagSerializer,
 )
-from .permissions import IsProjectOwnerOrMember, IsProjectOwner, IsProjectOwnerCheck
-from rest_framework import viewsets, permissions, status
-from rest_framework.decorators import api_view, permission_classes, authentication_classes
+from .export import CONTENT_TYPES, aiter_chunks, export_project
+from .filters import TaskFilter, TaskSearchFilter
+from .importer import IMPORT_FORMATS, TaskImporter, read_records
+from .membership import get_membership
+from .stats import get_project_stats
+from .sync import decode_cursor, get_changes
+from .mixins import ConditionalGetMixin, ValuesListMixin, next_due_aggregate, weak_etag
+from . import project_cache
+from .permissions import IsProjectOwnerCheck, IsProjectOwnerOrMember, IsProjectOwner
+from .renderers import CSVRenderer, NDJSONRenderer
+from .row_serializers import CommentRowSerializer, TaskRowSerializer
+from rest_framework import filters, viewsets, permissions, status
+from rest_framework.exceptions import ValidationError
+from rest_framework.parsers import MultiPartParser
+from rest_framework.decorators import action, api_view, permission_classes, authentication_classes
 from rest_framework.response import Response
 from rest_framework.throttling import UserRateThrottle
-from rest_framework_simplejwt.authentication import JWTAuthentication
+from task_management_system.fieldsets import Fieldset
+from users.authentication import CachedJWTAuthentication
 
 
-class ProjectViewSet(viewsets.ModelViewSet):
+class ProjectViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     """
     This ViewSet automatically provides `list`, `create`,
     `retrieve`, `update` and `destroy` actions.
@@ -25,72 +46,239 @@ class ProjectViewSet(viewsets.ModelViewSet):
     permission_classes = [
         permissions.IsAuthenticated,
     ]
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [CachedJWTAuthentication]
     throttle_classes = [UserRateThrottle]
 
     def get_permissions(self):
         if self.action in ['create', 'update', 'destroy']:
             self.permission_classes = [permissions.IsAuthenticated, IsProjectOwner]
+        elif self.action == 'import_tasks':
+            self.permission_classes = [permissions.IsAuthenticated, IsProjectOwnerCheck]
+        elif self.action == 'cache_stats':
+            self.permission_classes = [permissions.IsAdminUser]
         else:
             self.permission_classes = [permissions.IsAuthenticated, IsProjectOwnerOrMember]
         return super().get_permissions()
 
+    def get_serializer_class(self):
+        if self._is_summary_view():
+            return ProjectSummarySerializer
+        return super().get_serializer_class()
+
     def get_queryset(self):
-        user = self.request.user
-        return Project.objects.filter(Q(owner=user) | Q(members=user)).distinct()
+        membership = get_membership(self.request.user, self.request)
+        queryset = Project.objects.filter(pk__in=membership.visible)
+        if self._is_summary_view():
+            return queryset.with_summary()
+        if self.action in ['list', 'retrieve']:
+            fieldset = Fieldset.from_request(self.request)
+            if fieldset is not None:
+                return queryset.with_fieldset(fieldset)
+            # The task tree is only fetched for projects missing from the
+            # payload cache (see tasks.project_cache)
+            queryset = queryset.select_related('owner')
+        return queryset
+
+    def get_conditional_queryset(self):
+        # Validators only need the visible projects, not the task tree or
+        # the summary aggregates
+        queryset = Project.objects.filter(pk__in=get_membership(self.request.user, self.request).visible)
+        if self.action == 'retrieve':
+            queryset = queryset.filter(pk=self.kwargs['pk'])
+        return queryset
+
+    def get_conditional_aggregates(self, queryset):
+        if self._is_summary_view():
+            return {'next_due_date': next_due_aggregate(queryset.values('pk'))}
+        return {}
+
+    def _is_summary_view(self):
+        # `?view=summary` swaps the nested task tree for per-project aggregates
+        return self.action == 'list' and self.request.query_params.get('view') == 'summary'
 
     def perform_create(self, serializer):
         serializer.save(owner=self.request.user)
 
+    # Not named check_permissions(), which would shadow APIView's own
+    @action(detail=False, methods=['post'], url_path='check_permissions', url_name='check-permissions')
+    def batch_check_permissions(self, request):
+        """
+        Resolve several permission checks in one round trip:
+        `{"project_ids": [1, 2], "actions": ["view", "edit"]}` returns
+        `{"1": {"view": true, "edit": true}, "2": {...}}`.
+        """
+        project_ids = request.data.get('project_ids')
+        actions = request.data.get('actions') or ['edit']
+        if not isinstance(project_ids, list) or not all(isinstance(pk, int) for pk in project_ids):
+            return Response({'project_ids': ['A list of project ids is required.']},
+                            status=status.HTTP_400_BAD_REQUEST)
+        if not isinstance(actions, list):
+            return Response({'actions': ['A list of actions is required.']},
+                            status=status.HTTP_400_BAD_REQUEST)
+        unknown = [name for name in actions if name not in PERMISSION_ACTIONS]
+        if unknown:
+            return Response({'actions': [f'"{name}" is not a valid action.' for name in unknown]},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        membership = get_membership(request.user, request)
+        results = {
+            str(pk): {name: pk in getattr(membership, PERMISSION_ACTIONS[name]) for name in actions}
+            for pk in project_ids
+        }
+        return Response(results, status=status.HTTP_200_OK)
+
+    @action(detail=False, methods=['get'])
+    def cache_stats(self, request):
+        """
+        Hit and miss counters of the project payload cache (staff only).
+        """
+        return Response(project_cache.cache_stats(), status=status.HTTP_200_OK)
+
+    @action(detail=True, methods=['get'])
+    def stats(self, request, pk=None):
+        """
+        Task counts by status, overdue and per assignee (see tasks.stats).
+        """
+        project = self.get_object()
+        return Response(ProjectStatsSerializer(get_project_stats(project)).data, status=status.HTTP_200_OK)
+
+    @action(detail=True, methods=['get'], renderer_classes=[NDJSONRenderer, CSVRenderer])
+    def export(self, request, pk=None, format=None):
+        """
+        Stream the project, its tasks and comments as `?format=ndjson`
+        (the default) or `?format=csv`, see tasks.export.
+        """
+        project = self.get_object()
+        fmt = request.accepted_renderer.format
+        chunks = export_project(project, fmt)
+        if isinstance(request._request, ASGIRequest):
+            chunks = aiter_chunks(chunks)
+        response = StreamingHttpResponse(chunks, content_type=CONTENT_TYPES[fmt])
+        response['Content-Disposition'] = f'attachment; filename="project-{project.pk}.{fmt}"'
+        return response
+
+    @action(detail=True, methods=['post'], url_path='import', parser_classes=[MultiPartParser])
+    def import_tasks(self, request, pk=None):
+        """
+        Import the tasks and comments of an uploaded `file` (NDJSON, or CSV
+        by its `.csv` name or a `format` field) into the project, as
+        `manage.py import_tasks --project` does; `project` records are ignored
+        and comments are posted as the requesting user, like any other.
+        """
+        project = self.get_object()
+        upload = request.data.get('file')
+        if upload is None or isinstance(upload, str):
+            raise ValidationError({'file': ['No file was submitted.']})
+        fmt = request.data.get('format') or ('csv' if upload.name.endswith('.csv') else 'ndjson')
+        if fmt not in IMPORT_FORMATS:
+            raise ValidationError({'format': [f'Expected one of {", ".join(IMPORT_FORMATS)}.']})
+
+        lines = io.TextIOWrapper(upload.file, encoding='utf-8', newline='')
+        try:
+            report = TaskImporter(request.user, project, author=request.user).run(read_records(lines, fmt))
+        except (ValueError, UnicodeDecodeError, csv.Error) as exc:
+            # Unparseable input; the chunks before it stay imported
+            raise ValidationError({'file': [str(exc)]})
+        return Response(report, status=status.HTTP_200_OK)
+
     def perform_destroy(self, instance):
-        # Ensure tasks are deleted before deleting the project
-        instance.tasks.all().delete()
+        # Tasks and comments go in the cascade, whose signal handlers leave
+        # the touches, tombstones and statistics to the project
         instance.delete()
 
 
-class TaskViewSet(viewsets.ModelViewSet):
+class TaskViewSet(ConditionalGetMixin, ValuesListMixin, viewsets.ModelViewSet):
     queryset = Task.objects.all()
     serializer_class = TaskSerializer
+    list_row_serializer_class = TaskRowSerializer
     permission_classes = [
         permissions.IsAuthenticated,
         IsProjectOwnerOrMember,
         IsProjectOwner
     ]
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [CachedJWTAuthentication]
+    filter_backends = [TaskFilter, TaskSearchFilter, filters.OrderingFilter]
+    ordering_fields = ['due_date', 'name', 'status', 'created_at', 'updated_at']
+    ordering = ['due_date', 'name']
 
     def get_queryset(self):
         project_id = self.kwargs.get('project_pk')
         task_id = self.kwargs.get('pk')
+        visible = get_membership(self.request.user, self.request).visible
+        queryset = Task.objects.filter(project_id__in=visible)
+        fieldset = Fieldset.from_request(self.request)
+        if fieldset is None:
+            queryset = queryset.with_relations()
+        else:
+            # Ordering and keyset cursors read the ordering columns
+            ordering = filters.OrderingFilter().get_ordering(self.request, queryset, self)
+            queryset = queryset.with_fieldset(fieldset, extra=[name.lstrip('-') for name in ordering])
 
         if project_id and task_id:
-            return Task.objects.filter(project_id=project_id, id=task_id)
+            return queryset.filter(project_id=project_id, id=task_id)
         if project_id:
-            return Task.objects.filter(project_id=project_id)
-        return Task.objects.all()
+            return queryset.filter(project_id=project_id)
+        return queryset
 
     def perform_create(self, serializer):
         project_id = self.request.data.get('project')
         project = get_object_or_404(Project, id=project_id)
         serializer.save(project=project)
 
+    @action(detail=False, methods=['post'])
+    def bulk(self, request, project_pk=None):
+        """
+        Create, update and delete many tasks of the project in one request:
+        `{"create": [...], "update": [{"id": ..., ...}], "delete": [ids]}`.
+        """
+        membership = get_membership(request.user, request)
+        project = get_object_or_404(Project, pk=project_pk, pk__in=membership.visible)
+        if project.pk not in membership.owned:
+            return Response({'detail': 'Permission denied.'}, status=status.HTTP_403_FORBIDDEN)
+
+        serializer = TaskBulkSerializer(data=request.data, context={'project': project})
+        serializer.is_valid(raise_exception=True)
+        results = serializer.save()
+        context = self.get_serializer_context()
+        return Response({
+            'created': TaskSerializer(results['created'], many=True, context=context).data,
+            'updated': TaskSerializer(results['updated'], many=True, context=context).data,
+            'deleted': results['deleted'],
+        }, status=status.HTTP_200_OK)
+
     def perform_destroy(self, instance):
         instance.delete()
 
 
-class CommentViewSet(viewsets.ModelViewSet):
+class CommentViewSet(ConditionalGetMixin, ValuesListMixin, viewsets.ModelViewSet):
     queryset = Comment.objects.all()
     serializer_class = CommentSerializer
+    list_row_serializer_class = CommentRowSerializer
     permission_classes = [
         permissions.IsAuthenticated,
         IsProjectOwnerOrMember
     ]
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [CachedJWTAuthentication]
 
     def get_queryset(self):
         task_id = self.kwargs.get('task_pk')
+        visible = get_membership(self.request.user, self.request).visible
+        queryset = Comment.objects.filter(task__project_id__in=visible)
+        fieldset = Fieldset.from_request(self.request)
+        if fieldset is None:
+            queryset = queryset.select_related('task', 'author')
+        elif fieldset.includes('author'):
+            # Permission checks read `task.project_id`
+            queryset = queryset.select_related('task', 'author').only(
+                'task__project_id', 'author__username', *fieldset.columns('content', 'created_at', 'updated_at'),
+            )
+        else:
+            queryset = queryset.select_related('task').only(
+                'task__project_id', *fieldset.columns('content', 'created_at', 'updated_at'),
+            )
         if task_id:
-            return Comment.objects.filter(task_id=task_id)
-        return Comment.objects.all()
+            return queryset.filter(task_id=task_id)
+        return queryset
 
     def perform_create(self, serializer):
         task_id = self.kwargs.get('task_pk')
@@ -105,18 +293,19 @@ class TagViewSet(viewsets.ModelViewSet):
         permissions.IsAuthenticated,
         IsProjectOwnerOrMember
     ]
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [CachedJWTAuthentication]
 
     def get_queryset(self):
         task_id = self.kwargs.get('task_pk')
         if task_id:
-            return Tag.objects.filter(task_id=task_id)
+            return Tag.objects.filter(tagged_tasks=task_id)
         return Tag.objects.all()
 
     def perform_create(self, serializer):
         task_id = self.kwargs.get('task_pk')
         task = get_object_or_404(Task, id=task_id)
-        serializer.save(task=task)
+        tag = serializer.save()
+        task.tags.add(tag)
 
 
 class AllTagsViewSet(viewsets.ModelViewSet):
@@ -126,7 +315,7 @@ class AllTagsViewSet(viewsets.ModelViewSet):
         permissions.IsAuthenticated,
         IsProjectOwnerOrMember
     ]
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [CachedJWTAuthentication]
 
     # This method allows the creation of tags
     def create(self, request, *args, **kwargs):
@@ -140,18 +329,64 @@ class AllTagsViewSet(viewsets.ModelViewSet):
         serializer.save()
 
 
+# Browsers and the Next.js middleware may reuse a permission answer this long
+PERMISSION_CHECK_MAX_AGE = 30
+
+# What each action of a permission check requires
+PERMISSION_ACTIONS = {
+    'view': 'visible',
+    'edit': 'owned',
+    'delete': 'owned',
+    'create_task': 'owned',
+}
+
+
+def permission_answer(user, owner_id):
+    """
+    The body and status of a `check_permission` answer for a project owned
+    by `owner_id` (None when the project does not exist).
+    """
+    if owner_id is None:
+        return {'detail': 'Project not found.'}, status.HTTP_404_NOT_FOUND
+    if owner_id != user.pk:
+        return {'detail': 'Permission denied.'}, status.HTTP_403_FORBIDDEN
+    return {'detail': 'Permission granted.'}, status.HTTP_200_OK
+
+
+def cacheable_permission_response(request, data, status_code, *etag_parts, response_class=Response):
+    """
+    Attach a weak ETag and a private Cache-Control to a permission answer,
+    replying 304 Not Modified when the client already holds it.
+    """
+    etag = weak_etag(*etag_parts)
+    if etag in parse_etags(request.headers.get('If-None-Match', '')):
+        response = response_class(status=status.HTTP_304_NOT_MODIFIED)
+    else:
+        response = response_class(data, status=status_code)
+    response['ETag'] = etag
+    patch_cache_control(response, private=True, max_age=PERMISSION_CHECK_MAX_AGE)
+    patch_vary_headers(response, ['Authorization'])
+    return response
+
+
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated])
-@authentication_classes([JWTAuthentication])
+@authentication_classes([CachedJWTAuthentication])
 def check_permission(request, project_id):
-    # Ensure user has permission before accessing the endpoint
-    try:
-        project = Project.objects.get(id=project_id)
-
-        if not IsProjectOwnerCheck().has_object_permission(request, None, project):
-            return Response({'detail': 'Permission denied.'}, status=status.HTTP_403_FORBIDDEN)
+    # Ensure user has permission before accessing the endpoint.
+    # A single primary key lookup answers all of 200, 403 and 404.
+    owner_id = Project.objects.filter(id=project_id).values_list('owner_id', flat=True).first()
+    data, status_code = permission_answer(request.user, owner_id)
+    return cacheable_permission_response(request, data, status_code, request.user.pk, project_id, status_code)
 
-        return Response({'detail': 'Permission granted.'}, status=status.HTTP_200_OK)
 
-    except Project.DoesNotExist:
-        return Response({'detail': 'Project not found.'}, status=status.HTTP_404_NOT_FOUND)
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+@authentication_classes([CachedJWTAuthentication])
+def sync(request):
+    """
+    Changes since `?since=<cursor>` (everything without it) and the cursor
+    to send next time, see tasks.sync.
+    """
+    since = request.query_params.get('since')
+    return Response(get_changes(request, decode_cursor(since) if since else None))
@@ -0,0 +1,69 @@
+import time
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.test import APIRequestFactory
+from rest_framework.views import APIView
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.tokens import RefreshToken
+from users.authentication import CachedJWTAuthentication, invalidate_cached_user
+from users.models import CustomUser
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = ('Compare requests/sec of the stock JWTAuthentication with '
+            'CachedJWTAuthentication on an otherwise empty view.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        # The benchmark user only exists inside a rolled back transaction
+        try:
+            with transaction.atomic():
+                self._run(options['requests'])
+                raise _Rollback
+        except _Rollback:
+            pass
+
+    def _run(self, count):
+        user = CustomUser.objects.create_user(
+            username='bench-auth', email='bench-auth@example.invalid', password=None,
+        )
+        token = str(RefreshToken.for_user(user).access_token)
+        factory = APIRequestFactory()
+        invalidate_cached_user(user.pk)
+
+        for auth_class in (JWTAuthentication, CachedJWTAuthentication):
+            view = self._view(auth_class)
+            # One warm-up request fills the cache for the cached class
+            view(factory.get('/', HTTP_AUTHORIZATION=f'Bearer {token}'))
+
+            with CaptureQueriesContext(connection) as context:
+                started = time.perf_counter()
+                for _ in range(count):
+                    response = view(factory.get('/', HTTP_AUTHORIZATION=f'Bearer {token}'))
+                elapsed = time.perf_counter() - started
+            assert response.status_code == 200, response.status_code
+
+            self.stdout.write(
+                f'{auth_class.__name__:<26} {count / elapsed:>10.0f} req/s  '
+                f'{len(context.captured_queries) / count:.2f} queries/request'
+            )
+
+    def _view(self, auth_class):
+        class BenchView(APIView):
+            authentication_classes = [auth_class]
+            permission_classes = [IsAuthenticated]
+            throttle_classes = []
+
+            def get(self, request):
+                return Response({'id': request.user.pk})
+
+        return BenchView.as_view()
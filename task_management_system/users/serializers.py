@@ -1,4 +1,5 @@
 from djoser import serializers
+from task_management_system.fieldsets import SparseFieldsMixin
 from .models import CustomUser
 
 
@@ -16,7 +17,7 @@ class UserCreateSerializer(serializers.UserCreateSerializer):
         )
 
 
-class UserSerializer(serializers.UserCreateSerializer):
+class UserSerializer(SparseFieldsMixin, serializers.UserCreateSerializer):
     class Meta(serializers.UserCreateSerializer):
         model = CustomUser
         fields = (
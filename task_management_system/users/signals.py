@@ -0,0 +1,14 @@
+from functools import partial
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from .authentication import invalidate_cached_user
+from .models import CustomUser
+
+
+@receiver(post_save, sender=CustomUser)
+@receiver(post_delete, sender=CustomUser)
+def invalidate_authenticated_user(sender, instance, **kwargs):
+    # Covers profile edits, deactivation and password changes. Dropped on
+    # commit, or a concurrent request could cache the old row again.
+    transaction.on_commit(partial(invalidate_cached_user, instance.pk))
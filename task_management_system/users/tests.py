@@ -1,4 +1,8 @@
+from django.core.cache import cache
 from django.test import TestCase
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+from .models import CustomUser
 
 
 # Test (TBC)
@@ -8,3 +12,50 @@ class UserTestCase(TestCase):
 
     def test_users_can_register(self):
         pass
+
+
+class CachedJWTAuthenticationTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = CustomUser.objects.create_user(
+            username='testuser',
+            password='testpassword',
+            email='testuser@example.com',
+        )
+        refresh = RefreshToken.for_user(self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+        self.url = '/api/v1/users/'
+
+    def test_user_is_looked_up_once(self):
+        self.assertEqual(self.client.get(self.url).status_code, 200)
+        with self.assertNumQueries(1):  # The user list itself
+            self.assertEqual(self.client.get(self.url).status_code, 200)
+
+    def test_deactivation_applies_immediately(self):
+        self.assertEqual(self.client.get(self.url).status_code, 200)
+        self.user.is_active = False
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.save()
+        self.assertEqual(self.client.get(self.url).status_code, 401)
+
+    def test_cached_user_is_dropped_on_commit(self):
+        self.assertEqual(self.client.get(self.url).status_code, 200)
+        self.user.is_active = False
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.user.save()
+            self.assertEqual(self.client.get(self.url).status_code, 200)
+        for callback in callbacks:
+            callback()
+        self.assertEqual(self.client.get(self.url).status_code, 401)
+
+    def test_deleted_user_is_rejected(self):
+        self.assertEqual(self.client.get(self.url).status_code, 200)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.delete()
+        self.assertEqual(self.client.get(self.url).status_code, 401)
+
+    def test_sparse_fieldset(self):
+        self.assertEqual(self.client.get(self.url).status_code, 200)
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url, {'fields': 'id,username'})
+        self.assertEqual(response.json(), [{'id': self.user.pk, 'username': 'testuser'}])
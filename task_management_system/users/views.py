@@ -4,8 +4,9 @@ from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated
 from rest_framework import status, viewsets, permissions
 from rest_framework.response import Response
-from rest_framework_simplejwt.authentication import JWTAuthentication
+from .authentication import CachedJWTAuthentication
 from django.core.exceptions import ObjectDoesNotExist
+from task_management_system.fieldsets import Fieldset
 from .models import CustomUser
 from .serializers import UserSerializer
 
@@ -14,7 +15,14 @@ class UserViewSet(viewsets.ModelViewSet):
     queryset = CustomUser.objects.all()
     serializer_class = UserSerializer
     permission_classes = [IsAuthenticated]
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [CachedJWTAuthentication]
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        fieldset = Fieldset.from_request(self.request)
+        if fieldset is not None:
+            queryset = queryset.only('id', *fieldset.columns(*UserSerializer.Meta.fields))
+        return queryset
 
 
 class LogoutView(APIView):
@@ -22,7 +30,7 @@ class LogoutView(APIView):
     This APIView provides logout action.
     """
     permission_classes = [permissions.IsAuthenticated]
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [CachedJWTAuthentication]
 
     def post(self, request):
         try: